@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 """A base chat agent that extends DialogAgent."""
-from typing import Optional
+from typing import Any, List, Optional
 
 from loguru import logger
 from agentscope.message import Msg
 from agentscope.agents.dialog_agent import DialogAgent
+from utils.chat_memory import MemoryPolicy, SummarizingMemory, SlidingWindow, message_text
+from utils.model_call import call_model
 
 class BaseChatAgent(DialogAgent):
     """A base chat agent used for specific dialogue tasks with contextual reflection capabilities."""
@@ -16,6 +18,8 @@ class BaseChatAgent(DialogAgent):
             model_config_name: str,
             use_memory: bool = True,
             memory_config: Optional[dict] = None,
+            memory_policy: Optional[MemoryPolicy] = None,
+            max_context: int = 10,
     ) -> None:
         """Initialize the base chat agent.
 
@@ -25,6 +29,9 @@ class BaseChatAgent(DialogAgent):
             model_config_name (`str`): The model configuration name.
             use_memory (`bool`, defaults to `True`): Whether the agent has memory.
             memory_config (`Optional[dict]`): Configuration for memory.
+            memory_policy (`Optional[MemoryPolicy]`): Which memory goes into the prompt;
+                defaults to a token budget with a rolling summary of older turns.
+            max_context (`int`, defaults to `10`): Context entries kept (0 keeps none).
         """
         super().__init__(
             name=name,
@@ -34,15 +41,19 @@ class BaseChatAgent(DialogAgent):
             memory_config=memory_config,
         )
 
-        self.context = [] 
+        self.context = []
+        self.max_context = max_context
+        self.memory_policy = memory_policy or SummarizingMemory(self._summarize)
+        self.context_policy = SlidingWindow(max_context)
+
     def set_context(self, context: list) -> None:
-        """Update the context with the given information."""
-        self.context = context
+        """Update the context with the given information; only the latest `max_context` entries are kept."""
+        self.context = self.context_policy.select(context)
 
     def process_input(self, user_input: str) -> str:
         """Process user input and generate a response."""
 
-        self.context.append({"role": "user", "content": user_input})
+        self.set_context(self.context + [{"role": "user", "content": user_input}])
 
         response = self.reply({"content": user_input})
         return response['content']  
@@ -57,14 +68,14 @@ class BaseChatAgent(DialogAgent):
         if self.memory:
             self.memory.add(x)
 
-        # prepare prompt with added context
+        # prepare prompt with added context; the policies keep its size bounded
         prompt = self.model.format(
             Msg("system", self.sys_prompt, role="system"),
-            self.memory.get_memory() if self.memory else x,
-            *self.context 
+            self.memory_policy.select(self.memory.get_memory()) if self.memory else x,
+            *self.context
         )
 
-        response = self.model(prompt).text
+        response = call_model(self.model, prompt).text
         msg = Msg(self.name, response, role="assistant")
 
         self.speak(msg)
@@ -73,3 +84,17 @@ class BaseChatAgent(DialogAgent):
             self.memory.add(msg)
 
         return msg
+
+    def _summarize(self, summary: str, messages: List[Any]) -> str:
+        """Fold `messages` into the running summary; runs on the memory policy's background thread."""
+        turns = "\n".join(f"{getattr(m, 'name', None) or 'user'}: {message_text(m)}" for m in messages)
+        prompt = self.model.format(
+            Msg(
+                "system",
+                "Summarize the conversation so far in a few sentences. Keep decisions, requirements, "
+                "names and open questions; drop greetings and repetition.",
+                role="system",
+            ),
+            Msg("user", f"Summary so far:\n{summary or '(none)'}\n\nNew turns:\n{turns}", role="user"),
+        )
+        return call_model(self.model, prompt).text.strip()
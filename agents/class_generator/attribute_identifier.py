@@ -1,13 +1,14 @@
 # File: agents/attribute_identifier.py
 """RAG-enhanced Attribute Identifier"""
-import re
-import json
 from typing import Dict, List, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 
 class AttributeIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "attributes"
 
     def __init__(
             self,
@@ -21,7 +22,7 @@ class AttributeIdentifier(LlamaIndexAgent):
         If you are a professional system designer, please base on:
         1. List of identified classes
         2. Attribute specifications in the knowledge base
-        The RESULT must be in JSON format: RESULT\n{" class name ":[" Attribute 1"," attribute 2"]}```"""
+        The RESULT must be a JSON object: {"class name": ["attribute 1", "attribute 2"]}"""
 
         super().__init__(
             name=name,
@@ -43,7 +44,9 @@ class AttributeIdentifier(LlamaIndexAgent):
             "list the properties of all classes："
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
 
     def _extract_query(self, x: Union[Msg, List[Msg]]) -> str:
@@ -70,20 +73,4 @@ class AttributeIdentifier(LlamaIndexAgent):
     def _parse_response(self, content: str) -> Dict[str, List[str]]:
         print('.....................attr:：.............................');
         print(content);
-        try:
-            if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-                return json.loads(match.group(1))
-        except Exception:
-            pass
-
-
-        attributes = {}
-        current_class = None
-        for line in content.split('\n'):
-            if "attr" in line and "：" in line:
-                current_class = line.split("：")[0].strip()
-                attributes[current_class] = []
-            elif line.strip().startswith("- "):
-                attributes[current_class].append(line.strip()[2:].split(":")[0])
-        # return attributes
-        return content
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
@@ -1,13 +1,15 @@
 # File: agents/class_identifier.py
 """RAG-enhanced Class Identifier"""
-import re
 from typing import List, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 
 
 class ClassIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "classes"
 
     def __init__(
             self,
@@ -22,7 +24,7 @@ class ClassIdentifier(LlamaIndexAgent):
             If you are a professional system architect, please follow the following:
             1. The service scenario entered by the user
             2. Class definition specifications in the knowledge base
-            The results must be in the format:```RESULT\nClassName1\nClassName2\n...```"""
+            The results must be a JSON object: {"classes": ["ClassName1", "ClassName2", ...]}"""
 
         super().__init__(
             name=name,
@@ -44,7 +46,9 @@ class ClassIdentifier(LlamaIndexAgent):
             "list all class names:"
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
 
     def _extract_query(self, x: Union[Msg, List[Msg]]) -> str:
@@ -71,7 +75,4 @@ class ClassIdentifier(LlamaIndexAgent):
 
         print('.....................class：.............................');
         print(content)
-        # if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-        #     return [x.strip() for x in match.group(1).split('\n') if x.strip()]
-        # return list(set(re.findall(r'\b[A-Z][a-zA-Z]+\b', content))) 
-        return content
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
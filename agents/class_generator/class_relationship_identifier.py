@@ -1,14 +1,16 @@
 # File: agents/relationship_identifier.py
 """RAG-enhanced Relationship Identifier"""
 import json
-import re
 from typing import List, Union, Dict
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
 import utils.util_function as uf
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 
 class ClassRelationshipIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "class_relationships"
 
     def __init__(
             self,
@@ -22,7 +24,7 @@ class ClassRelationshipIdentifier(LlamaIndexAgent):
             If you are a professional architect, please base on:
             1. Classes and their methods
             2. Relational mode in the knowledge base
-            The RESULT must use the format: RESULT\n Class A-- relation type --> Class B\n... ` ` `"""
+            The RESULT must be a JSON object: {"relationships": ["Class A --relation type--> Class B", ...]}"""
 
         super().__init__(
             name=name,
@@ -44,7 +46,9 @@ class ClassRelationshipIdentifier(LlamaIndexAgent):
             "list all relationship of class："
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
 
     def identify_relationships(self, functions: Dict[str, List[str]], context: str) -> List[str]:
@@ -55,7 +59,4 @@ class ClassRelationshipIdentifier(LlamaIndexAgent):
     def _parse_response(self, content: str) -> List[str]:
         print('.....................relationship：.............................');
         print(content);
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return [x.strip() for x in match.group(1).split('\n') if x.strip()]
-        # return list(set(re.findall(r'.+?--.+?-->.*', content)))  
-        return content
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
@@ -1,13 +1,15 @@
 # File: agents/function_identifier.py
 """RAG-enhanced Function Identifier"""
-import re
 import json
 from typing import Dict, List, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
 import utils.util_function as uf
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 class FunctionIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "functions"
 
     def __init__(
             self,
@@ -21,7 +23,7 @@ class FunctionIdentifier(LlamaIndexAgent):
         If you are a professional system designer, please base on:
         1. Classes and their attributes
         2. Method specifications in the knowledge base
-        Results must be using JSON format: ` ` ` RESULT \ n {" name of the class ": [1 ()" method ", "method 2 ()"]} ` ` `"""
+        Results must be a JSON object: {"name of the class": ["method1()", "method2()"]}"""
 
         super().__init__(
             name=name,
@@ -44,7 +46,9 @@ class FunctionIdentifier(LlamaIndexAgent):
             "list all function of class："
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
     def identify_functions(self, attributes: Dict[str, List[str]], context: str) -> Dict[str, List[str]]:
         analysis_input = f"attribute：{json.dumps(attributes, ensure_ascii=False)}\ncontext：{context}"
@@ -54,20 +58,4 @@ class FunctionIdentifier(LlamaIndexAgent):
     def _parse_response(self, content: str) -> Dict[str, List[str]]:
         print('.....................function：.............................');
         print(content)
-        try:
-            if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-                return json.loads(match.group(1))
-        except Exception:
-            pass
-
-
-        functions = {}
-        current_class = None
-        for line in content.split('\n'):
-            if "function" in line and "：" in line:
-                current_class = line.split("：")[0].strip()
-                functions[current_class] = []
-            elif line.strip().startswith("- ") and "()" in line:
-                functions[current_class].append(line.strip()[2:].split("(")[0] + "()")
-        # return functions
-        return content
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
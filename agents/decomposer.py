@@ -1,15 +1,25 @@
 import glob
+import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Tuple, Union
 
-import agentscope
 from agentscope.agents import LlamaIndexAgent
+from agentscope.manager import ModelManager
 from agentscope.message import Msg
 from agentscope.rag import KnowledgeBank
 
 import utils.util_function as uf
+from utils.agent_factory import build_agents
+from utils.requirement_dedup import deduplicate_requirements
+from utils.model_call import call_model
+from utils.runtime import get_runtime
+
+REQUEST_NUMBER_FIELD = "Request Number"
+ORIGINAL_REQUIREMENT_FIELD = "Original Requirement"
+SUB_REQUIREMENTS_FIELD = "Sub-Requirements/Constraints"
 
 
 class DemandDecomposer(LlamaIndexAgent):
@@ -50,13 +60,106 @@ class DemandDecomposer(LlamaIndexAgent):
             f"[User input:]\n{query}\n\n"
             "Break down the requirements according to the rules:"
         )
-        response_text = self.model(full_prompt).text
+        response_text = call_model(self.model, full_prompt).text
         return Msg(self.name, response_text, role="assistant")
 
     def decompose_demands(self, raw_demand: str) -> List[Dict]:
         response = self.reply(Msg("user", raw_demand, role="user"))
         return self._parse_response(response.content)
 
+    def decompose_demands_sharded(
+            self,
+            raw_demand: str,
+            max_shard_chars: int = 4000,
+            max_workers: int = 4,
+    ) -> List[Dict]:
+        """Split the document into section shards, decompose them concurrently and merge the results."""
+        shards = uf.split_into_shards(raw_demand, max_shard_chars)
+        if len(shards) <= 1:
+            return self._renumber_demands(self.decompose_demands(raw_demand))
+
+        print(f"Decomposing {len(shards)} shards with {min(max_workers, len(shards))} workers")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(shards))) as pool:
+            shard_results = list(pool.map(self.decompose_demands, shards))
+        return self._merge_shard_demands(shard_results)
+
+    def _merge_shard_demands(self, shard_results: List[List[Dict]]) -> List[Dict]:
+        """Merge per-shard results in document order, dropping cross-shard duplicates."""
+        merged = []
+        seen = {}
+        for shard_idx, demands in enumerate(shard_results, 1):
+            for demand in demands:
+                fingerprint = _demand_fingerprint(demand)
+                if fingerprint in seen:
+                    print(f"Shard {shard_idx}: duplicate of requirement {seen[fingerprint] + 1} dropped")
+                    continue
+                seen[fingerprint] = len(merged)
+                merged.append(demand)
+        return self._renumber_demands(merged)
+
+    def _renumber_demands(self, demands: List[Dict]) -> List[Dict]:
+        """Assign stable global request numbers in list order."""
+        renumbered = []
+        for idx, demand in enumerate(demands, 1):
+            number_key = uf.find_field(demand, REQUEST_NUMBER_FIELD) or REQUEST_NUMBER_FIELD
+            fields = {number_key: f"REQ-{idx:03d}"}
+            fields.update((k, v) for k, v in demand.items() if k != number_key)
+            renumbered.append(fields)
+        return renumbered
+
+    def deduplicate_demands(
+            self,
+            demands: List[Dict],
+            emb_model_config_name: Optional[str] = None,
+            **thresholds,
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """Merge near-duplicate requirements; thresholds are passed to `deduplicate_requirements`."""
+        embed = None
+        if emb_model_config_name:
+            emb_model = ModelManager.get_instance().get_model_by_config_name(emb_model_config_name)
+            embed = lambda text: call_model(emb_model, text).embedding[0]
+
+        texts = [_demand_text(demand) for demand in demands]
+        kept, report = deduplicate_requirements(texts, embed=embed, **thresholds)
+
+        merged_into = {entry["kept"]: entry["merged"] for entry in report}
+        result = []
+        for idx in kept:
+            demand = dict(demands[idx])
+            sub_key = uf.find_field(demand, SUB_REQUIREMENTS_FIELD)
+            if sub_key and isinstance(demand[sub_key], list):
+                for dup in merged_into.get(idx, []):
+                    dup_key = uf.find_field(demands[dup], SUB_REQUIREMENTS_FIELD)
+                    extra = demands[dup].get(dup_key, []) if dup_key else []
+                    demand[sub_key] = demand[sub_key] + [v for v in extra if v not in demand[sub_key]]
+            result.append(demand)
+
+        for entry in report:
+            entry["kept_text"] = texts[entry["kept"]]
+            entry["merged_text"] = [texts[i] for i in entry["merged"]]
+        print(f"Deduplication: {len(demands)} -> {len(result)} requirements ({len(report)} merges)")
+        return self._renumber_demands(result), report
+
+    def save_to_jsonl(self, demands: List[Dict], output_dir: str) -> None:
+        file_path = os.path.join(output_dir, "demands.jsonl")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for demand in demands:
+                f.write(json.dumps(uf.to_requirement_record(demand), ensure_ascii=False) + "\n")
+
+    def save_dedup_report(self, report: List[Dict], output_dir: str) -> None:
+        file_path = os.path.join(output_dir, "dedup_report.md")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write("# Requirement deduplication report\n\n")
+            if not report:
+                f.write("No near-duplicate requirements found.\n")
+            for entry in report:
+                f.write(f"## Kept: {entry['kept_text']}\n")
+                for text in entry["merged_text"]:
+                    f.write(f"- Merged: {text}\n")
+                for evidence in entry["evidence"]:
+                    f.write(f"- Evidence: {evidence['pair']} {evidence['method']} = {evidence['score']}\n")
+                f.write("\n")
+
     def _parse_response(self, content: str) -> List[Dict]:
         demands = []
         entries = re.split(r'\n(?=\d+\. )', content.strip())
@@ -69,7 +172,7 @@ class DemandDecomposer(LlamaIndexAgent):
                 clean_line = re.sub(r'^\d+\.\s*', '', line)
                 if ':' in clean_line:
                     key, value = map(str.strip, clean_line.split(':', 1))
-                    if key == "Sub-Requirements/Constraints":
+                    if key == SUB_REQUIREMENTS_FIELD:
                         value = [v.strip() for v in value.split('- ') if v]
                     demand[key] = value
 
@@ -102,6 +205,20 @@ class DemandDecomposer(LlamaIndexAgent):
                 f.write("\n")
 
 
+def _demand_text(demand: Dict) -> str:
+    """The requirement statement, or all field values except the number if it is missing."""
+    key = uf.find_field(demand, ORIGINAL_REQUIREMENT_FIELD)
+    if key:
+        return str(demand[key])
+    number_key = uf.find_field(demand, REQUEST_NUMBER_FIELD)
+    return " ".join(str(v) for k, v in demand.items() if k != number_key)
+
+
+def _demand_fingerprint(demand: Dict) -> str:
+    """Normalized text used to detect the same requirement emitted by different shards."""
+    return " ".join(re.sub(r"[^\w]+", " ", _demand_text(demand).lower()).split())
+
+
 def get_next_version_num(target_dir: str, date_str: str) -> int:
     pattern = os.path.join(target_dir, f"class-{date_str}-*")
     existing_dirs = glob.glob(pattern)
@@ -115,29 +232,51 @@ def get_next_version_num(target_dir: str, date_str: str) -> int:
     return max_num + 1
 
 
-def main():
-    agents = agentscope.init(
-        model_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\model_configs.json",
-        agent_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\decomposer_agent.json"
-    )
+def _init_decomposer_agents(knowledge_config: str = "rest_knowledge_config.json") -> list:
+    """Create the decomposer and equip its classification rules; reusable across runs"""
+    runtime = get_runtime()
+    agents = build_agents("decomposer_agent.json")
 
-    knowledge_bank = KnowledgeBank(configs="../configs/rest_knowledge_config.json")
+    knowledge_bank = KnowledgeBank(configs=runtime.knowledge_configs(knowledge_config))
     knowledge_bank.equip(agents[0], ["classificaiton_rules"])
-    decomposer = agents[0]
+    return agents
 
-    input_path = "../data/case.docx"
-    test_demand = uf.read_docx(input_path)
 
-    output_base = "./output"
+def run_decomposition(
+        raw_demand: str,
+        output_base: Optional[str] = None,
+        dedup_config: Optional[str] = "dedup_config.json",
+        knowledge_config: str = "rest_knowledge_config.json",
+        agents: Optional[list] = None,
+) -> Tuple[List[Dict], str]:
+    """Decompose, deduplicate and save the requirements; returns them with the version directory"""
+    decomposer = (agents or _init_decomposer_agents(knowledge_config))[0]
+    output_base = output_base or str(get_runtime().requirements_dir)
+
     today = datetime.now().strftime("%Y-%m-%d")
     version_num = get_next_version_num(output_base, today)
     version_dir = os.path.join(output_base, f"class-{today}-{version_num}")
     os.makedirs(version_dir, exist_ok=True)
 
-    demands = decomposer.decompose_demands(test_demand)
+    demands = decomposer.decompose_demands_sharded(raw_demand)
+
+    if dedup_config:
+        with open(get_runtime().config_path(dedup_config), 'r', encoding='utf-8') as f:
+            thresholds = json.load(f)
+        demands, dedup_report = decomposer.deduplicate_demands(demands, **thresholds)
+        decomposer.save_dedup_report(dedup_report, version_dir)
 
     decomposer.save_to_md(demands, version_dir)
     decomposer.save_to_doc(demands, version_dir)
+    decomposer.save_to_jsonl(demands, version_dir)
+    return demands, version_dir
+
+
+def main():
+    input_path = get_runtime().data_path("case.docx")
+    test_demand = uf.read_docx(input_path)
+
+    demands, version_dir = run_decomposition(test_demand)
 
     print("Decomposed requirements:")
     for idx, demand in enumerate(demands, 1):
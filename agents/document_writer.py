@@ -1,11 +1,68 @@
+import json
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
-from docx import Document
-import re
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.document_tree import DocumentTree, save_document
+from utils.map_reduce import fan_out
+from utils.model_call import call_model
+from utils.parsing import result_block, result_blocks, strip_list_marker
+from utils.runtime import get_runtime
+from utils.srs_cache import SUBSYSTEMS_KIND, VERSIONS_KIND, SectionCache, render_inputs, subsystem_inputs
+
+REQUIREMENTS = ("requirements", "non_functional")
+
+
+class SrsSection(NamedTuple):
+    key: str  # srs_content key read by save_to_doc
+    instructions: str
+    kind: str = "text"  # text | glossary | matrix
+    depends: tuple = REQUIREMENTS  # input kinds the section is written from (structured input only)
+
+
+# Sections generated one per model call in sectioned mode, in document order
+SRS_SECTIONS = [
+    SrsSection("1.1 Purpose", "the purpose, scope and intended readers of this specification"),
+    SrsSection(
+        "1.2 Glossary", "domain terms used in the requirements, one `term: definition` per line", "glossary",
+        REQUIREMENTS + ("classes", "attributes"),
+    ),
+    SrsSection(
+        "1.3 Stakeholder Model", "the stakeholders, their roles and their interests in the system",
+        depends=REQUIREMENTS + ("actors",),
+    ),
+    SrsSection("1.4 Objectives Model", "the business objectives and how the system supports them"),
+    SrsSection("1.7 References", "documents, standards and sources referred to by the requirements"),
+    SrsSection(
+        "1.8 Document Structure", "a short description of the chapters of this specification",
+        depends=(SUBSYSTEMS_KIND,),
+    ),
+    SrsSection(
+        "2.1 Context Model", "the system boundary, external actors and systems and what they exchange",
+        depends=("actors", "use_cases", "relationships", "objects"),
+    ),
+    SrsSection("2.3 Assumptions", "assumptions the requirements rely on"),
+    SrsSection("2.4 Constraints", "technical, regulatory and organisational constraints"),
+    SrsSection(
+        "Global Non-functional Requirements", "non-functional requirements that apply to the whole system",
+        depends=("non_functional",),
+    ),
+    SrsSection("Concerns Integration", "cross-cutting concerns (security, logging, error handling) and where they apply"),
+    SrsSection("Document Versions", "the version history of this specification", depends=(VERSIONS_KIND,)),
+    SrsSection(
+        "Requirements Traceability Matrix",
+        "one row per requirement: `Requirement ID | Description | Test Case | Status`",
+        "matrix",
+        ("requirements", "use_cases"),
+    ),
+]
+SUBSYSTEM_FIELDS = [
+    "Information Entities", "Actors", "Functional Requirements", "Use Cases", "Subsystem-Level NFRs",
+]
+MATRIX_FIELDS = ["id", "description", "test_case", "status"]
 
 
 class DocumentWriter(LlamaIndexAgent):
@@ -35,9 +92,9 @@ class DocumentWriter(LlamaIndexAgent):
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
 
-        query = self._extract_query(x)
+        query = uf._extract_query(x)
 
-        related_knowledge = self._retrieve_knowledge(query)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
 
         full_prompt = (
             f"{self.sys_prompt}\n\n"
@@ -46,16 +103,151 @@ class DocumentWriter(LlamaIndexAgent):
             "Generate the requirements specification according to the rules:"
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(self.model, full_prompt).text
         return Msg(self.name, response_text, role="assistant")
 
-    def generate_srs(self, input_data: str) -> Dict[str, Any]:
+    def generate_srs(
+            self,
+            input_data: Union[str, Dict[str, List[str]]],
+            sectioned: bool = False,
+            max_workers: int = 4,
+            cache: Optional[SectionCache] = None,
+    ) -> Dict[str, Any]:
+        if sectioned or cache is not None or not isinstance(input_data, str):
+            return self.generate_srs_sectioned(input_data, max_workers, cache)
         response = self.reply(Msg("user", input_data, role="user"))
         return self._parse_response(response.content)
 
+    def generate_srs_sectioned(
+            self,
+            input_data: Union[str, Dict[str, List[str]]],
+            max_workers: int = 4,
+            cache: Optional[SectionCache] = None,
+    ) -> Dict[str, Any]:
+        """Generate each chapter and subsystem with its own prompt and retrieval, concurrently.
+
+        The subsystems are identified first; the sections are then assembled in
+        document order into the structure `save_to_doc` expects. `input_data` is
+        either the full input text or item lists per kind (see utils.srs_cache),
+        in which case each section only sees the kinds it depends on. With a
+        cache, sections whose input did not change are reused as they are.
+        """
+        cache = cache or SectionCache()
+        subsystems = cache.get_or_generate(
+            "subsystems", self._section_input(input_data), lambda: self.identify_subsystems(input_data)
+        )
+        if not isinstance(input_data, str):
+            input_data = {**input_data, SUBSYSTEMS_KIND: subsystems}
+        tasks = [(section, None) for section in SRS_SECTIONS] + [(None, name) for name in subsystems]
+        print(f"Generating {len(tasks)} SRS sections ({len(subsystems)} subsystems) with {max_workers} workers")
+        results = fan_out(lambda task: self._generate_task(input_data, cache, *task), tasks, max_workers)
+        cache.save(keep=["subsystems"] + [self._section_id(*task) for task in tasks])
+
+        srs_content: Dict[str, Any] = {}
+        for (section, _), result in zip(tasks, results):
+            if section is not None:
+                srs_content[section.key] = result
+        srs_content["Subsystem Descriptions"] = results[len(SRS_SECTIONS):]
+        return srs_content
+
+    def identify_subsystems(self, input_data: Union[str, Dict[str, List[str]]]) -> List[str]:
+        instructions = (
+            "the subsystems the system is divided into, one name per line "
+            "(a single line with the system name if it is not divided)"
+        )
+        content = self._section_reply("Subsystems", instructions, self._section_input(input_data))
+        names = [strip_list_marker(line) for line in self._section_lines(content)]
+        return list(dict.fromkeys(name for name in names if name))
+
+    def _section_input(self, input_data: Union[str, Dict[str, List[str]]], kinds: Optional[tuple] = None) -> str:
+        if isinstance(input_data, str):
+            return input_data
+        if kinds is None:
+            kinds = [kind for kind in input_data if kind != VERSIONS_KIND]
+        return render_inputs(input_data, kinds)
+
+    def _section_id(self, section: Optional[SrsSection], subsystem: Optional[str]) -> str:
+        return section.key if section is not None else f"subsystem:{subsystem}"
+
+    def _generate_task(
+            self,
+            input_data: Union[str, Dict[str, List[str]]],
+            cache: SectionCache,
+            section: Optional[SrsSection],
+            subsystem: Optional[str],
+    ) -> Any:
+        if section is None:
+            if not isinstance(input_data, str):
+                input_data = subsystem_inputs(input_data, subsystem)
+            section_input = self._section_input(input_data)
+            return cache.get_or_generate(
+                self._section_id(None, subsystem), section_input,
+                lambda: self._generate_subsystem(section_input, subsystem),
+            )
+        section_input = self._section_input(input_data, section.depends)
+        return cache.get_or_generate(
+            section.key, [section.instructions, section_input],
+            lambda: self._generate_section(section_input, section),
+        )
+
+    def _generate_section(self, section_input: str, section: SrsSection) -> Any:
+        content = self._section_reply(section.key, section.instructions, section_input)
+        lines = self._section_lines(content)
+        if section.kind == "glossary":
+            return dict(self._field_pairs(lines))
+        if section.kind == "matrix":
+            return self._parse_matrix(lines)
+        return "\n".join(lines)
+
+    def _generate_subsystem(self, section_input: str, subsystem: str) -> Dict[str, str]:
+        instructions = (
+            f"the description of the subsystem '{subsystem}', one `Field: content` line for each of: "
+            + ", ".join(SUBSYSTEM_FIELDS)
+        )
+        content = self._section_reply(f"Subsystem {subsystem}", instructions, section_input)
+        fields = {"Name": subsystem}
+        for key, value in self._field_pairs(self._section_lines(content)):
+            fields[key] = f"{fields[key]}\n{value}" if key in fields else value
+        return fields
+
+    def _section_reply(self, title: str, instructions: str, input_data: str) -> str:
+        related_knowledge = uf._retrieve_knowledge(
+            f"{title}: {instructions}", self.knowledge_list, self.similarity_top_k
+        )
+        full_prompt = (
+            f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content]\n{related_knowledge}\n\n"
+            f"[User input]\n{input_data}\n\n"
+            f"Write only the section '{title}' of the requirements specification: {instructions}.\n"
+            "Put the section content in a ```RESULT block without the section title:"
+        )
+        return call_model(self.model, full_prompt).text
+
+    def _section_lines(self, content: str) -> List[str]:
+        block = result_block(content)
+        text = block if block is not None else content
+        return [line.strip() for line in text.split('\n') if line.strip()]
+
+    def _field_pairs(self, lines: List[str]) -> List[tuple]:
+        pairs = []
+        for line in lines:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                pairs.append((strip_list_marker(key), value.strip()))
+        return pairs
+
+    def _parse_matrix(self, lines: List[str]) -> List[Dict[str, str]]:
+        rows = []
+        for line in lines:
+            cells = [cell.strip() for cell in line.strip('|').split('|')]
+            if len(cells) < 2 or set(cells[0]) <= set("-: ") or cells[0].lower() == "requirement id":
+                continue
+            rows.append(dict(zip(MATRIX_FIELDS, cells + [""] * (len(MATRIX_FIELDS) - len(cells)))))
+        return rows
+
     def _parse_response(self, content: str) -> Dict[str, Any]:
         srs_content = {}
-        if match := re.findall(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
+        if match := result_blocks(content):
             for section in match:
                 lines = [line.strip() for line in section.split('\n') if line.strip()]
                 for line in lines:
@@ -64,8 +256,8 @@ class DocumentWriter(LlamaIndexAgent):
                         srs_content[key.strip()] = value.strip()
         return srs_content
 
-    def save_to_doc(self, srs_content: Dict[str, Any], output_path: str) -> None:
-        doc = Document()
+    def build_document(self, srs_content: Dict[str, Any]) -> DocumentTree:
+        doc = DocumentTree()
 
         self._add_business_level(doc, srs_content)
 
@@ -73,24 +265,29 @@ class DocumentWriter(LlamaIndexAgent):
 
         self._add_appendixes(doc, srs_content)
 
-        doc.save(output_path)
+        return doc
+
+    def save_document(self, srs_content: Dict[str, Any], output_path: str, streaming: bool = False) -> None:
+        """Render the SRS as .md, .html or .docx depending on the output file suffix.
+
+        `streaming` only applies to .docx: table rows are written while the file is saved.
+        """
+        save_document(self.build_document(srs_content), output_path, streaming=streaming)
         print(f"Requirement specifications are generated and saved to {output_path}")
 
-    def _add_heading(self, doc: Document, text: str, level: int):
+    def save_to_doc(self, srs_content: Dict[str, Any], output_path: str, streaming: bool = False) -> None:
+        self.save_document(srs_content, output_path, streaming=streaming)
+
+    def _add_heading(self, doc: DocumentTree, text: str, level: int):
         doc.add_heading(text, level=level)
 
-    def _add_paragraph(self, doc: Document, text: str):
+    def _add_paragraph(self, doc: DocumentTree, text: str):
         doc.add_paragraph(text)
 
-    def _add_table(self, doc: Document, headers: List[str], rows: List[List[str]]):
-        table = doc.add_table(rows=len(rows) + 1, cols=len(headers))
-        for i, header in enumerate(headers):
-            table.cell(0, i).text = header
-        for i, row in enumerate(rows):
-            for j, cell_value in enumerate(row):
-                table.cell(i + 1, j).text = str(cell_value)
+    def _add_table(self, doc: DocumentTree, headers: List[str], rows: Iterable[List[str]]):
+        doc.add_table(headers, rows)
 
-    def _add_business_level(self, doc: Document, srs_content: Dict[str, Any]):
+    def _add_business_level(self, doc: DocumentTree, srs_content: Dict[str, Any]):
         self._add_heading(doc, "Chapter 1: Introduction", level=1)
 
         # 1.1 Purpose 
@@ -101,107 +298,183 @@ class DocumentWriter(LlamaIndexAgent):
         # 1.2 Glossary 
         self._add_heading(doc, "1.2 Glossary", level=2)
         glossary = srs_content.get("1.2 Glossary", {})
-        if glossary:
+        if isinstance(glossary, str):
+            self._add_paragraph(doc, glossary)
+        elif glossary:
             headers = ["term", "definition"]
             rows = [[term, definition] for term, definition in glossary.items()]
             self._add_table(doc, headers, rows)
         else:
             self._add_paragraph(doc, "Glossary not provided.")
 
-# 1.3 Stakeholders 
-self._add_heading(doc, "1.3 Stakeholder Model", level=2)
-stakeholders = srs_content.get("1.3 Stakeholder Model", "")
-self._add_paragraph(doc, stakeholders if stakeholders else "No stakeholder model provided.")
-
-# 1.4 Goals Objectives Model
-self._add_heading(doc, "1.4 Objectives Model", level=2)
-goals = srs_content.get("1.4 Objectives Model", "")
-self._add_paragraph(doc, goals if goals else "No objectives model provided.")
-
-# 1.7-1.8 References and Document Structure
-self._add_heading(doc, "1.7 References", level=2)
-references = srs_content.get("1.7 References", "")
-self._add_paragraph(doc, references if references else "No references provided.")
-
-self._add_heading(doc, "1.8 Document Structure", level=2)
-structure = srs_content.get("1.8 Document Structure", "")
-self._add_paragraph(doc, structure if structure else "No document structure description provided.")
-
-def _add_system_level(self, doc: Document, srs_content: Dict[str, Any]):
-    """Add system-level content"""
-    self._add_heading(doc, "Chapter 2: System Overview", level=1)
-
-    # 2.1 Context Model
-    self._add_heading(doc, "2.1 Context Model", level=2)
-    context_model = srs_content.get("2.1 Context Model", "")
-    self._add_paragraph(doc, context_model if context_model else "No context model provided.")
-
-    # 2.3 Assumptions
-    self._add_heading(doc, "2.3 Assumptions", level=2)
-    assumptions = srs_content.get("2.3 Assumptions", "")
-    self._add_paragraph(doc, assumptions if assumptions else "No assumptions provided.")
-
-    # 2.4 Constraints
-    self._add_heading(doc, "2.4 Constraints", level=2)
-    constraints = srs_content.get("2.4 Constraints", "")
-    self._add_paragraph(doc, constraints if constraints else "No constraints provided.")
-
-    # Chapters 3~N-1: Subsystem Descriptions
-    subsystems = srs_content.get("Subsystem Descriptions", [])
-    if subsystems:
-        for i, subsystem in enumerate(subsystems, start=1):
-            self._add_heading(doc, f"Chapter 3.{i}: Subsystem Description", level=1)
-            self._add_heading(doc, f"3.{i}.1 Information Entities", level=2)
-            entities = subsystem.get("Information Entities", "")
-            self._add_paragraph(doc, entities if entities else "No information entities provided.")
-
-            self._add_heading(doc, f"3.{i}.2 Actors", level=2)
-            actors = subsystem.get("Actors", "")
-            self._add_paragraph(doc, actors if actors else "No actors provided.")
-
-            self._add_heading(doc, f"3.{i}.3 Functional Requirements", level=2)
-            frs = subsystem.get("Functional Requirements", "")
-            self._add_paragraph(doc, frs if frs else "No functional requirements provided.")
-
-            self._add_heading(doc, f"3.{i}.4 Use Cases", level=2)
-            use_cases = subsystem.get("Use Cases", "")
-            self._add_paragraph(doc, use_cases if use_cases else "No use cases provided.")
-
-            self._add_heading(doc, f"3.{i}.5 Subsystem-Level NFRs", level=2)
-            nfrs = subsystem.get("Subsystem-Level NFRs", "")
-            self._add_paragraph(doc, nfrs if nfrs else "No subsystem-level non-functional requirements provided.")
-
-    # Chapter N: Global Non-functional Requirements
-    self._add_heading(doc, "Chapter N: Global Non-functional Requirements", level=1)
-    global_nfrs = srs_content.get("Global Non-functional Requirements", "")
-    self._add_paragraph(doc, global_nfrs if global_nfrs else "No global non-functional requirements provided.")
-
-    # Chapter N+1: Concerns Integration
-    self._add_heading(doc, "Chapter N+1: Concerns Integration", level=1)
-    concerns = srs_content.get("Concerns Integration", "")
-    self._add_paragraph(doc, concerns if concerns else "No concerns integration content provided.")
-
-def _add_appendixes(self, doc: Document, srs_content: Dict[str, Any]):
-    """Add appendix content"""
-    self._add_heading(doc, "Appendices", level=1)
-
-    # Document Versions
-    self._add_heading(doc, "A. Document Versions", level=2)
-    versions = srs_content.get("Document Versions", "")
-    self._add_paragraph(doc, versions if versions else "No document version information provided.")
-
-    # Requirements Traceability Matrix
-    self._add_heading(doc, "B. Requirements Traceability Matrix", level=2)
-    traceability_matrix = srs_content.get("Requirements Traceability Matrix", [])
-    if traceability_matrix:
-        headers = ["Requirement ID", "Description", "Test Case", "Status"]
-        rows = [
-            [item["id"], item["description"], item["test_case"], item["status"]]
-            for item in traceability_matrix
-        ]
-        self._add_table(doc, headers, rows)
-    else:
-        self._add_paragraph(doc, "No requirements traceability matrix provided.")
+        # 1.3 Stakeholders 
+        self._add_heading(doc, "1.3 Stakeholder Model", level=2)
+        stakeholders = srs_content.get("1.3 Stakeholder Model", "")
+        self._add_paragraph(doc, stakeholders if stakeholders else "No stakeholder model provided.")
+
+        # 1.4 Goals Objectives Model
+        self._add_heading(doc, "1.4 Objectives Model", level=2)
+        goals = srs_content.get("1.4 Objectives Model", "")
+        self._add_paragraph(doc, goals if goals else "No objectives model provided.")
+
+        # 1.7-1.8 References and Document Structure
+        self._add_heading(doc, "1.7 References", level=2)
+        references = srs_content.get("1.7 References", "")
+        self._add_paragraph(doc, references if references else "No references provided.")
+
+        self._add_heading(doc, "1.8 Document Structure", level=2)
+        structure = srs_content.get("1.8 Document Structure", "")
+        self._add_paragraph(doc, structure if structure else "No document structure description provided.")
+
+    def _add_system_level(self, doc: DocumentTree, srs_content: Dict[str, Any]):
+        """Add system-level content"""
+        self._add_heading(doc, "Chapter 2: System Overview", level=1)
+
+        # 2.1 Context Model
+        self._add_heading(doc, "2.1 Context Model", level=2)
+        context_model = srs_content.get("2.1 Context Model", "")
+        self._add_paragraph(doc, context_model if context_model else "No context model provided.")
+
+        # 2.3 Assumptions
+        self._add_heading(doc, "2.3 Assumptions", level=2)
+        assumptions = srs_content.get("2.3 Assumptions", "")
+        self._add_paragraph(doc, assumptions if assumptions else "No assumptions provided.")
+
+        # 2.4 Constraints
+        self._add_heading(doc, "2.4 Constraints", level=2)
+        constraints = srs_content.get("2.4 Constraints", "")
+        self._add_paragraph(doc, constraints if constraints else "No constraints provided.")
+
+        # Chapters 3~N-1: Subsystem Descriptions
+        subsystems = srs_content.get("Subsystem Descriptions", [])
+        if subsystems:
+            for i, subsystem in enumerate(subsystems, start=1):
+                name = subsystem.get("Name") or "Subsystem Description"
+                self._add_heading(doc, f"Chapter 3.{i}: {name}", level=1)
+                self._add_heading(doc, f"3.{i}.1 Information Entities", level=2)
+                entities = subsystem.get("Information Entities", "")
+                self._add_paragraph(doc, entities if entities else "No information entities provided.")
+
+                self._add_heading(doc, f"3.{i}.2 Actors", level=2)
+                actors = subsystem.get("Actors", "")
+                self._add_paragraph(doc, actors if actors else "No actors provided.")
+
+                self._add_heading(doc, f"3.{i}.3 Functional Requirements", level=2)
+                frs = subsystem.get("Functional Requirements", "")
+                self._add_paragraph(doc, frs if frs else "No functional requirements provided.")
+
+                self._add_heading(doc, f"3.{i}.4 Use Cases", level=2)
+                use_cases = subsystem.get("Use Cases", "")
+                self._add_paragraph(doc, use_cases if use_cases else "No use cases provided.")
+
+                self._add_heading(doc, f"3.{i}.5 Subsystem-Level NFRs", level=2)
+                nfrs = subsystem.get("Subsystem-Level NFRs", "")
+                self._add_paragraph(doc, nfrs if nfrs else "No subsystem-level non-functional requirements provided.")
+
+        # Chapter N: Global Non-functional Requirements
+        self._add_heading(doc, "Chapter N: Global Non-functional Requirements", level=1)
+        global_nfrs = srs_content.get("Global Non-functional Requirements", "")
+        self._add_paragraph(doc, global_nfrs if global_nfrs else "No global non-functional requirements provided.")
+
+        # Chapter N+1: Concerns Integration
+        self._add_heading(doc, "Chapter N+1: Concerns Integration", level=1)
+        concerns = srs_content.get("Concerns Integration", "")
+        self._add_paragraph(doc, concerns if concerns else "No concerns integration content provided.")
+
+    def _add_appendixes(self, doc: DocumentTree, srs_content: Dict[str, Any]):
+        """Add appendix content"""
+        self._add_heading(doc, "Appendices", level=1)
+
+        # Document Versions
+        self._add_heading(doc, "A. Document Versions", level=2)
+        versions = srs_content.get("Document Versions", "")
+        self._add_paragraph(doc, versions if versions else "No document version information provided.")
+
+        # Requirements Traceability Matrix
+        self._add_heading(doc, "B. Requirements Traceability Matrix", level=2)
+        traceability_matrix = srs_content.get("Requirements Traceability Matrix", [])
+        if traceability_matrix:
+            headers = ["Requirement ID", "Description", "Test Case", "Status"]
+            rows = (
+                [item["id"], item["description"], item["test_case"], item["status"]]
+                for item in traceability_matrix
+            )
+            self._add_table(doc, headers, rows)
+        else:
+            self._add_paragraph(doc, "No requirements traceability matrix provided.")
+
+
+def _init_srs_agents(model_config_name: str, knowledge_config: str = "srs_knowledge.json") -> list:
+    """Create the SRS writer on `model_config_name` and equip the SRS rules each section retrieves from"""
+    from agentscope.rag import KnowledgeBank
+    from utils.agent_factory import build_agents
+
+    runtime = get_runtime()
+    with open(runtime.config_path("document_writer_agent.json"), 'r', encoding='utf-8') as f:
+        agent_configs = json.load(f)
+    for config in agent_configs:
+        config["args"]["model_config_name"] = model_config_name
+    agents = build_agents(agent_configs)
+
+    knowledge_bank = KnowledgeBank(configs=runtime.knowledge_configs(knowledge_config))
+    for agent, config in zip(agents, agent_configs):
+        knowledge_bank.equip(agent, config["args"]["knowledge_id_list"])
+    return agents
+
+
+def run_srs_generation(
+        output_path: str,
+        input_data: str = "",
+        requirements_path: Optional[str] = None,
+        model_versions: Optional[List[str]] = None,
+        cache_path: Optional[str] = None,
+        formats: Optional[List[str]] = None,
+        model_config_name: str = "my_ollama_generate_config",
+        knowledge_config: str = "srs_knowledge.json",
+        sectioned: bool = True,
+        streaming: bool = False,
+        agents: Optional[list] = None,
+) -> Dict[str, Any]:
+    """Generate the SRS sections and save them; returns the sections.
+
+    The format follows the suffix of `output_path` (.md, .html or .docx); `formats`
+    lists further suffixes rendered next to it from the same document tree. Text
+    formats are written here; a .docx rendered alongside them goes to the shared
+    render worker process meanwhile.
+
+    With `requirements_path` and/or `model_versions` the sections are written from
+    the structured requirements and model snapshots instead of `input_data`, and
+    only the sections whose inputs changed since the last run are regenerated
+    (cached next to the output unless `cache_path` is given).
+    """
+    from utils.render_pool import shared_process_pool
+    from utils.srs_cache import SectionCache, load_srs_inputs
+
+    writer = (agents or _init_srs_agents(model_config_name, knowledge_config))[0]
+    cache = None
+    if requirements_path or model_versions:
+        input_data = load_srs_inputs(requirements_path, model_versions or [])
+        cache = SectionCache(cache_path or Path(output_path).with_suffix(".sections.json"))
+    elif cache_path:
+        cache = SectionCache(cache_path)
+    srs_content = writer.generate_srs(input_data, sectioned=sectioned, cache=cache)
+    tree = writer.build_document(srs_content)
+    paths = [output_path] + [str(Path(output_path).with_suffix(suffix)) for suffix in formats or []]
+    offloaded = []
+    if len(paths) > 1:
+        tree.materialize()  # rendered more than once
+        offloaded = [path for path in paths if Path(path).suffix.lower() == ".docx"]
+        if len(offloaded) == len(paths):
+            offloaded = []  # nothing to overlap with
+    renders = [shared_process_pool().submit(save_document, tree, path, streaming=streaming) for path in offloaded]
+    for path in paths:
+        if path not in offloaded:
+            save_document(tree, path, streaming=streaming)
+    for render in renders:
+        render.result()
+    for path in paths:
+        print(f"SRS written to: {path}")
+    return srs_content
 
 
 if __name__ == "__main__":
@@ -211,13 +484,8 @@ if __name__ == "__main__":
     print("\n" + "=" * 50)
     print("Starting example execution of generating Software Requirements Specification...")
 
-    # Initialize generator
-    test_writer = DocumentWriter(
-        name="Example Generator",
-        model_config_name="dummy_model",
-        sys_prompt="Testing prompt",
-        knowledge_id_list=["sample_knowledge"],
-    )
+    # Initialize generator with the SRS writing rules
+    test_writer = _init_srs_agents("my_ollama_generate_config")[0]
 
     # Sample input data
     sample_input = """
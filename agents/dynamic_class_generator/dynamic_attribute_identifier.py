@@ -1,9 +1,12 @@
 # File: agents/class_diagram_generator/dynamic_attribute_identifier.py
 """RAG-enhanced Dynamic Attribute Identifier for Class Diagrams"""
-import re
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.model_call import call_model
+from utils.model_context import merge_scoped, scope_for, scoped_prompt
+from utils.parsing import result_block
 
 
 class DynamicAttributeIdentifier(LlamaIndexAgent):
@@ -19,7 +22,7 @@ class DynamicAttributeIdentifier(LlamaIndexAgent):
         sys_prompt = """## Final attribute list generation rule
         If you are a professional system analyst, please follow the change requirements and the latest class attribute model in the knowledge base:
         1. Identify the properties involved in the change (new/modified/deleted)
-        2. Generate the complete list of properties after the change (format: class name. Stats)
+        2. Generate the complete list of the given properties after the change (format: class name. Stats)
         3. Results must be in a strict format:```RESULT\nClass name. Attribute 1\n class name. Attribute 2\n... ` ` ` """
 
         super().__init__(
@@ -32,23 +35,29 @@ class DynamicAttributeIdentifier(LlamaIndexAgent):
         )
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
+        query = uf._extract_query(x)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
         full_prompt = (
             f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content:]\n{related_knowledge}\n\n"
+            f"[User input:]\n{query}\n\n"
             "Generate the final attribute list for the format specification:"
         )
-        return Msg(self.name, self.model(full_prompt).text, role="assistant")
+        return Msg(self.name, call_model(self.model, full_prompt).text, role="assistant")
 
-    def get_final_attributes(self, original_attributes: List[str], change_request: str) -> List[str]:
-        combined_attrs = list(set(original_attributes))
-        return self._extract_attributes(
-            self.reply(
-                Msg("user",
-                    f"Refer to the following properties to generate the latest list:{str(combined_attrs)}; Change requirements:{change_request}",
-                    role="assistant")
-            ).content
-        )
+    def get_final_attributes(
+            self,
+            original_attributes: List[str],
+            change_request: str,
+            model: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        scope = scope_for(change_request, "attributes", original_attributes, model)
+        relevant, untouched = scope.split("attributes", original_attributes)
+        prompt = scoped_prompt("attributes", relevant, len(untouched), change_request)
+        updated = self._extract_attributes(self.reply(Msg("user", prompt, role="assistant")).content)
+        return merge_scoped(untouched, updated)
 
     def _extract_attributes(self, content: str) -> List[str]:
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return list({x.strip() for x in match.group(1).split('\n') if x.strip() and '.' in x})
+        if (block := result_block(content)) is not None:
+            return list({x.strip() for x in block.split('\n') if x.strip() and '.' in x})
         return []
\ No newline at end of file
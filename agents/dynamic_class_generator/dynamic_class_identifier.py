@@ -1,9 +1,12 @@
 # File: agents/use_case_generator/dynamic_class_identifier.py
 """RAG-enhanced Dynamic Class Identifier for Class Diagrams"""
-import re
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.model_call import call_model
+from utils.model_context import merge_scoped, scope_for, scoped_prompt
+from utils.parsing import result_block
 
 
 class DynamicClassIdentifier(LlamaIndexAgent):
@@ -19,7 +22,7 @@ class DynamicClassIdentifier(LlamaIndexAgent):
         sys_prompt = """## Final class list generation rule
             If you are a professional system analyst, please follow the change requirements and the latest class model in the knowledge base:
             1. Identify the class involved in the change (new/modified/deleted)
-            2. Generate the complete class list after the change
+            2. Generate the complete list of the given classes after the change
             3. Results must be in a strict format:```RESULT\nclass1\nclass2\n...```"""
 
         super().__init__(
@@ -32,23 +35,29 @@ class DynamicClassIdentifier(LlamaIndexAgent):
         )
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
+        query = uf._extract_query(x)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
         full_prompt = (
             f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content:]\n{related_knowledge}\n\n"
+            f"[User input:]\n{query}\n\n"
             "Generate the final class list of the format specification:"
         )
-        return Msg(self.name, self.model(full_prompt).text, role="assistant")
+        return Msg(self.name, call_model(self.model, full_prompt).text, role="assistant")
 
-    def get_final_classes(self, original_classes: List[str], change_request: str) -> List[str]:
-        combined_classes = list(set(original_classes))
-        return self._extract_classes(
-            self.reply(
-                Msg("user",
-                    f"Refer to the following classes to generate an up-to-date list of classes:{str(combined_classes)}; Collecting and changing the requirements:{change_request}",
-                    role="assistant")
-            ).content
-        )
+    def get_final_classes(
+            self,
+            original_classes: List[str],
+            change_request: str,
+            model: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        scope = scope_for(change_request, "classes", original_classes, model)
+        relevant, untouched = scope.split("classes", original_classes)
+        prompt = scoped_prompt("classes", relevant, len(untouched), change_request)
+        updated = self._extract_classes(self.reply(Msg("user", prompt, role="assistant")).content)
+        return merge_scoped(untouched, updated)
 
     def _extract_classes(self, content: str) -> List[str]:
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return list({x.strip() for x in match.group(1).split('\n') if x.strip()})
+        if (block := result_block(content)) is not None:
+            return list({x.strip() for x in block.split('\n') if x.strip()})
         return []
\ No newline at end of file
@@ -1,14 +1,20 @@
 # File: agents/class_diagram_generator/dynamic_relation_identifier.py
 """RAG-enhanced Dynamic Relation Identifier for Class Diagrams"""
-import re
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.model_call import call_model
+from utils.model_context import merge_scoped, scope_for, scoped_prompt
+from utils.parsing import parse_relation, result_block
 
 
 class DynamicRelationIdentifier(LlamaIndexAgent):
 
-    RELATION_PATTERN = r"^\w+\s*(<|:)\s*\w+\s*(>|:)\s*\w+$"  # 支持 <继承> 和 :association> 两种格式
+    RELATION_KINDS = {  # 统一为 <:kind> 格式
+        "extend": "inheritance",
+        "correlation": "association",
+    }
 
     def __init__(
             self,
@@ -21,7 +27,7 @@ class DynamicRelationIdentifier(LlamaIndexAgent):
         sys_prompt = """## Final relationship list generation rule
             If you are a professional system architect, please follow the change requirements and the latest class relationship model in the knowledge base:
             1. Identify the class relationship involved in the change (new/modified/deleted)
-            2. Generate a complete list of changed relationships (format: class name 1 < Relationship type > Class name 2)
+            2. Generate the complete list of the given relationships after the change (format: class name 1 < Relationship type > Class name 2)
             3. Supported relationship types :inheritance (<:inheritance>), composition (<:composition>), aggregation (<:aggregation>), association (<:association>), dependency (<:dependency>)
             4. Results must be in a strict format:```RESULT\nrelationship1\nrelationship2\n...```"""
 
@@ -35,43 +41,40 @@ class DynamicRelationIdentifier(LlamaIndexAgent):
         )
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
+        query = uf._extract_query(x)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
         full_prompt = (
             f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content:]\n{related_knowledge}\n\n"
+            f"[User input:]\n{query}\n\n"
             "Generate a standardized list of class relationships:"
         )
-        return Msg(self.name, self.model(full_prompt).text, role="assistant")
+        return Msg(self.name, call_model(self.model, full_prompt).text, role="assistant")
 
-    def get_final_relations(self, original_relations: List[str], change_request: str) -> List[str]:
-        combined_relations = list(set(original_relations))
-        return self._extract_relations(
-            self.reply(
-                Msg("user",
-                    f"Refer to the following relationships to generate the latest list:{str(combined_relations)}; Change requirements:{change_request}",
-                    role="assistant")
-            ).content
-        )
+    def get_final_relations(
+            self,
+            original_relations: List[str],
+            change_request: str,
+            model: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        scope = scope_for(change_request, "relations", original_relations, model)
+        relevant, untouched = scope.split("relations", original_relations)
+        prompt = scoped_prompt("relations", relevant, len(untouched), change_request)
+        updated = self._extract_relations(self.reply(Msg("user", prompt, role="assistant")).content)
+        return merge_scoped(untouched, updated)
 
     def _extract_relations(self, content: str) -> List[str]:
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
+        if (block := result_block(content)) is not None:
             valid_relations = []
-            for item in match.group(1).split('\n'):
-                item = self._normalize_relation(item.strip())
-                if item and re.match(self.RELATION_PATTERN, item):
-                    valid_relations.append(item)
+            for item in block.split('\n'):
+                if relation := parse_relation(item):
+                    valid_relations.append(self._normalize_relation(relation))
             return list(set(valid_relations))
         return []
 
-    def _normalize_relation(self, relation: str) -> str:
-        replacements = {
-            "<extend>": "<:inheritance>",
-            "<composition>": "<:composition>",
-            "<aggregation>": "<:aggregation>",
-            "<correlation>": "<:association>",
-            "<Dependency>": "<:dependency>"
-        }
-        for chi, eng in replacements.items():
-            relation = relation.replace(chi, eng)
-        return relation.replace(" ", "")  
+    def _normalize_relation(self, relation) -> str:
+        kind = self.RELATION_KINDS.get(relation.kind, relation.kind)
+        return f"{relation.source}<:{kind}>{relation.target}".replace(" ", "")
 
 
 if __name__ == "__main__":
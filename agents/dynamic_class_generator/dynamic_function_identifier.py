@@ -1,9 +1,12 @@
 # File: agents/class_diagram_generator/dynamic_method_identifier.py
 """RAG-enhanced Dynamic Method Identifier for Class Diagrams"""
-import re
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.model_call import call_model
+from utils.model_context import merge_scoped, scope_for, scoped_prompt
+from utils.parsing import METHOD_SIGNATURE, result_block
 
 
 class DynamicMethodIdentifier(LlamaIndexAgent):
@@ -19,7 +22,7 @@ class DynamicMethodIdentifier(LlamaIndexAgent):
         sys_prompt = """## Final method list generation rule
         If you are a professional system analyst, please follow the change requirements and the latest class method model in the knowledge base:
         1. Identify the method involved in the change (add/modify parameters/rename/delete)
-        2. Generate the complete list of changed methods (format: class name. Method name (parameter))
+        2. Generate the complete list of the given methods after the change (format: class name. Method name (parameter))
         3. The method signature must contain the required parameter types
         4. Results must be in a strict format:```RESULT\nclass.function1\nclass.function2\n...```"""
 
@@ -33,31 +36,37 @@ class DynamicMethodIdentifier(LlamaIndexAgent):
         )
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
+        query = uf._extract_query(x)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
         full_prompt = (
             f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content:]\n{related_knowledge}\n\n"
+            f"[User input:]\n{query}\n\n"
             "Generate a final list of methods with full method signatures:"
         )
-        return Msg(self.name, self.model(full_prompt).text, role="assistant")
-
-    def get_final_methods(self, original_methods: List[str], change_request: str) -> List[str]:
-        combined_methods = list(set(original_methods))
-        return self._extract_methods(
-            self.reply(
-                Msg("user",
-                    f"Refer to the following method to generate the latest list:{str(combined_methods)}; Collecting and changing the requirements:{change_request}",
-                    role="assistant")
-            ).content
-        )
+        return Msg(self.name, call_model(self.model, full_prompt).text, role="assistant")
+
+    def get_final_methods(
+            self,
+            original_methods: List[str],
+            change_request: str,
+            model: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        scope = scope_for(change_request, "methods", original_methods, model)
+        relevant, untouched = scope.split("methods", original_methods)
+        prompt = scoped_prompt("methods", relevant, len(untouched), change_request)
+        updated = self._extract_methods(self.reply(Msg("user", prompt, role="assistant")).content)
+        return merge_scoped(untouched, updated)
 
     def _extract_methods(self, content: str) -> List[str]:
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
+        if (block := result_block(content)) is not None:
             valid_methods = []
-            for item in match.group(1).split('\n'):
+            for item in block.split('\n'):
                 item = item.strip()
                 if not item:
                     continue
 
-                if re.match(r"^\w+\.\w+$([\w: ,]*)$$", item):
+                if METHOD_SIGNATURE.match(item):
                     valid_methods.append(item)
             return list(set(valid_methods))
         return []
\ No newline at end of file
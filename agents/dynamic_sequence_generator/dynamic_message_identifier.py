@@ -1,15 +1,16 @@
 # File: agents/sequence_modeling/dynamic_message_identifier.py
 """RAG-enhanced Dynamic Message Identifier for Sequence Diagrams"""
-import re
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.model_call import call_model
+from utils.model_context import merge_scoped, scope_for, scoped_prompt
+from utils.parsing import parse_message, result_block
 
 
 class DynamicMessageIdentifier(LlamaIndexAgent):
 
-    MESSAGE_PATTERN = r"^\w+\s*->\s*\w+\s*:\s*.+$"  
-
     def __init__(
             self,
             name: str,
@@ -21,7 +22,7 @@ class DynamicMessageIdentifier(LlamaIndexAgent):
         sys_prompt = """## Final message list generation rule
             You are a professional system architect, based on the change requirements and the latest sequence diagram model in the knowledge base:
             1. Identify the message flow involved in the change (new/modified/deleted)
-            2. Generate the complete message list after the change (format: send object -> Receive object: message content)
+            2. Generate the complete list of the given messages after the change (format: send object -> Receive object: message content)
             3. Supported message types: synchronous call, asynchronous message, return message
             4. Results must be in a strict format:```RESULT\nmessage1\nmessage2\n...```"""
 
@@ -35,36 +36,38 @@ class DynamicMessageIdentifier(LlamaIndexAgent):
         )
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
+        query = uf._extract_query(x)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
         full_prompt = (
             f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content:]\n{related_knowledge}\n\n"
+            f"[User input:]\n{query}\n\n"
             "Generate a UML-compliant message flow list:"
         )
-        return Msg(self.name, self.model(full_prompt).text, role="assistant")
-
-    def get_final_messages(self, original_messages: List[str], change_request: str) -> List[str]:
+        return Msg(self.name, call_model(self.model, full_prompt).text, role="assistant")
 
-        combined_msgs = list(set(original_messages))
-        return self._extract_messages(
-            self.reply(
-                Msg("user",
-                    f"Refer to the following message flow to generate the latest list:{str(combined_msgs)}; change requirement:{change_request}",
-                    role="assistant")
-            ).content
-        )
+    def get_final_messages(
+            self,
+            original_messages: List[str],
+            change_request: str,
+            model: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        scope = scope_for(change_request, "messages", original_messages, model)
+        relevant, untouched = scope.split("messages", original_messages)
+        prompt = scoped_prompt("messages", relevant, len(untouched), change_request)
+        updated = self._extract_messages(self.reply(Msg("user", prompt, role="assistant")).content)
+        return merge_scoped(untouched, updated)
 
     def _extract_messages(self, content: str) -> List[str]:
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
+        if (block := result_block(content)) is not None:
             valid_messages = []
-            for item in match.group(1).split('\n'):
-                item = item.strip()
-                if item and re.match(self.MESSAGE_PATTERN, item):
-                    valid_messages.append(self._normalize_message(item))
+            for item in block.split('\n'):
+                message = parse_message(item)
+                if message and message.text:
+                    valid_messages.append(str(message))
             return list(set(valid_messages))
         return []
 
-    def _normalize_message(self, message: str) -> str:
-        return re.sub(r'\s*->\s*', '->', message).replace(' : ', ': ')
-
 
 
 if __name__ == "__main__":
@@ -1,16 +1,18 @@
 # File: agents/sequence_modeling/dynamic_message_order_identifier.py
 """RAG-enhanced Dynamic Message Order Identifier for Sequence Diagrams"""
-import re
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.model_call import call_model
+from utils.model_context import flow_window, scope_for
+from utils.parsing import result_block
+from utils.sequence_flow import build_flow, serialize_flow
 
 
 class DynamicMessageOrderIdentifier(LlamaIndexAgent):
     """Agent supporting knowledge retrieval for message order changes identification"""
 
-    MESSAGE_ORDER_PATTERN = r"^(?:\s*(?:alt|loop|opt)\s+.+?\|?\s*)?\w+\s*->\s*\w+\s*:.*$"
-
     def __init__(
             self,
             name: str,
@@ -21,7 +23,7 @@ class DynamicMessageOrderIdentifier(LlamaIndexAgent):
     ) -> None:
         sys_prompt = """## Message Order Adjustment Rules
             You are a professional system architect. Please adjust the message order based on change requests and the logical flow in the knowledge base:
-            1. Identify positions where message order needs adjustment (before/after/in parallel)
+            1. Identify positions where message order needs adjustment (before/after/in parallel) within the given steps
             2. Generate new message order complying with business logic (keep original message content)
             3. Support types of order adjustments:
                - Insert new steps
@@ -41,61 +43,55 @@ class DynamicMessageOrderIdentifier(LlamaIndexAgent):
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
         """Process input and generate an adjustment plan"""
+        query = uf._extract_query(x)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
         full_prompt = (
             f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content:]\n{related_knowledge}\n\n"
+            f"[User input:]\n{query}\n\n"
             "Please generate a message order list that complies with UML standards:"
         )
-        return Msg(self.name, self.model(full_prompt).text, role="assistant")
+        return Msg(self.name, call_model(self.model, full_prompt).text, role="assistant")
 
-    def get_final_message_order(self, original_messages: List[str], change_request: str) -> List[str]:
-        """Public interface: Get adjusted message order"""
-        return self._extract_message_order(
-            self.reply(
-                Msg("user",
-                    f"Current message order:\n{chr(10).join(original_messages)}\nChange request:{change_request}",
-                    role="assistant")
-            ).content
+    def get_final_message_order(
+            self,
+            original_messages: List[str],
+            change_request: str,
+            model: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        """Public interface: Get adjusted message order
+
+        Only the window of top-level steps around the touched participants is sent;
+        the steps before and after it are kept as they are.
+        """
+        scope = scope_for(change_request, "flow", original_messages, model)
+        before, window, after = flow_window(original_messages, scope)
+        if before or after:
+            current = (
+                f"Excerpt of the current message order ({len(before)} lines before and "
+                f"{len(after)} lines after it are unchanged and not shown; return only the "
+                f"adjusted excerpt):\n{chr(10).join(window)}"
+            )
+        else:
+            current = f"Current message order:\n{chr(10).join(window)}"
+        adjusted = self._extract_message_order(
+            self.reply(Msg("user", f"{current}\nChange request:{change_request}", role="assistant")).content
         )
+        return before + adjusted + after if adjusted else []
 
     def _extract_message_order(self, content: str) -> List[str]:
-        """Parse structured control messages order"""
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            processed = []
-            indent_level = 0
-            for line in match.group(1).split('\n'):
-                line = line.rstrip()
-                if not line:
-                    continue
-
-                # Handle structured control tags
-                if re.match(r"^\s*(alt|loop|opt)\s+", line):
-                    processed.append(line)
-                    indent_level += 2
-                elif re.match(r"^\s*else\s*", line):
-                    processed.append(line)
-                elif re.match(r"^\s*end\s*", line):
-                    indent_level = max(0, indent_level - 2)
-                    processed.append(line)
-                else:
-                    processed.append((" " * indent_level) + line)
-            return processed
+        """Parse structured control messages order into canonical flow lines"""
+        if (block := result_block(content)) is not None:
+            flow = build_flow(block.split('\n'), strict=False)
+            for error in flow.errors:
+                print(f"Flow repaired: {error}")
+            return serialize_flow(flow)
         return []
 
     def validate_message_flow(self, messages: List[str]) -> bool:
-        """Validate the rationality of the message order"""
-        stack = []
-        for idx, line in enumerate(messages):
-            if re.match(r"^\s*alt\s+", line):
-                stack.append(("alt", idx))
-            elif re.match(r"^\s*loop\s+", line):
-                stack.append(("loop", idx))
-            elif re.match(r"^\s*opt\s+", line):
-                stack.append(("opt", idx))
-            elif "end" in line:
-                if not stack:
-                    raise ValueError(f"Extra end tag at line {idx + 1}")
-                stack.pop()
-        return len(stack) == 0
+        """Validate the rationality of the message order; raises FlowError (a ValueError)"""
+        build_flow(messages)
+        return True
 
 
 # Example usage
@@ -143,6 +139,3 @@ if __name__ == "__main__":
             print("Message order validation passed")
     except ValueError as e:
         print(f"Process error: {str(e)}")
-    ``` 
-
-This version keeps the structure and functionality of the original code but replaces all the Chinese comments and strings with their English equivalents.
\ No newline at end of file
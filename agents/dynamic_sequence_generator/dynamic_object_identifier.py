@@ -1,9 +1,12 @@
 # File: agents/sequence_modeling/dynamic_object_identifier.py
 """RAG-enhanced Dynamic Object Identifier for Sequence Diagrams"""
-import re
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.model_call import call_model
+from utils.model_context import merge_scoped, scope_for, scoped_prompt
+from utils.parsing import OBJECT_DECLARATION, result_block
 
 
 class DynamicObjectIdentifier(LlamaIndexAgent):
@@ -20,7 +23,7 @@ class DynamicObjectIdentifier(LlamaIndexAgent):
         sys_prompt = """## Final Object List Generation Rules
             You are a professional system architect. Based on the change request and the latest sequence diagram model in the knowledge base:
             1. Identify objects involved in the changes (addition/rename/deletion)
-            2. Generate a complete list of objects after the change (format: object_name:type)
+            2. Generate the complete list of the given objects after the change (format: object_name:type)
             3. Supported object types: Actor, System, Database, Service, Component
             4. The result must use the strict format: ```RESULT\nobject1\nobject2\n...```"""
 
@@ -35,30 +38,36 @@ class DynamicObjectIdentifier(LlamaIndexAgent):
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
         """Process input and generate the final object list"""
+        query = uf._extract_query(x)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
         full_prompt = (
             f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content:]\n{related_knowledge}\n\n"
+            f"[User input:]\n{query}\n\n"
             "Please generate a list of objects with type annotations:"
         )
-        return Msg(self.name, self.model(full_prompt).text, role="assistant")
+        return Msg(self.name, call_model(self.model, full_prompt).text, role="assistant")
 
-    def get_final_objects(self, original_objects: List[str], change_request: str) -> List[str]:
+    def get_final_objects(
+            self,
+            original_objects: List[str],
+            change_request: str,
+            model: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
         """Public interface: Get the list of objects after changes"""
-        combined_objs = list(set(original_objects))
-        return self._extract_objects(
-            self.reply(
-                Msg("user",
-                    f"Refer to the following objects to generate the latest list:{str(combined_objs)}; Change request:{change_request}",
-                    role="assistant")
-            ).content
-        )
+        scope = scope_for(change_request, "objects", original_objects, model)
+        relevant, untouched = scope.split("objects", original_objects)
+        prompt = scoped_prompt("objects", relevant, len(untouched), change_request)
+        updated = self._extract_objects(self.reply(Msg("user", prompt, role="assistant")).content)
+        return merge_scoped(untouched, updated)
 
     def _extract_objects(self, content: str) -> List[str]:
         """Parse standardized responses and validate object formats"""
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
+        if (block := result_block(content)) is not None:
             valid_objects = []
-            for item in match.group(1).split('\n'):
+            for item in block.split('\n'):
                 item = item.strip()
-                if item and re.match(r"^\w+:(\w+)(\s*#\w+)?$", item):
+                if item and OBJECT_DECLARATION.match(item):
                     valid_objects.append(item)
             return list(set(valid_objects))
         return []
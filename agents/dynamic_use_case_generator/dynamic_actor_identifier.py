@@ -1,9 +1,12 @@
 # File: agents/use_case_generator/updated_actor_lister.py
 """RAG-enhanced Updated Actor Lister"""
-import re
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+import utils.util_function as uf
+from utils.model_call import call_model
+from utils.model_context import merge_scoped, scope_for, scoped_prompt
+from utils.parsing import result_block
 
 
 class DynamicActorIdentifier(LlamaIndexAgent):
@@ -18,7 +21,7 @@ class DynamicActorIdentifier(LlamaIndexAgent):
     ) -> None:
         sys_prompt = """## Final participant list generation rule
         You are a professional requirements analyst, based on the change requirements and the latest participant model in the knowledge base:
-        1. Generate a complete list of participants after the change
+        1. Generate the complete list of the given participants after the change
         2. Results must be in a strict format:```RESULT\nparticipant 1\nparticipant 2\n...```"""
 
         super().__init__(
@@ -31,20 +34,29 @@ class DynamicActorIdentifier(LlamaIndexAgent):
         )
 
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
-
+        query = uf._extract_query(x)
+        related_knowledge = uf._retrieve_knowledge(query, self.knowledge_list, self.similarity_top_k)
         full_prompt = (
             f"{self.sys_prompt}\n\n"
+            f"[Knowledge base content:]\n{related_knowledge}\n\n"
+            f"[User input:]\n{query}\n\n"
             "Generate a list of final participants for the format specification:"
         )
 
-        return Msg(self.name, self.model(full_prompt).text, role="assistant")
-
-    def get_final_actors(self, original_actors: List[str], change_request: str) -> List[str]:
+        return Msg(self.name, call_model(self.model, full_prompt).text, role="assistant")
 
-        combined_actors = list(set(original_actors))
-        return self._extract_actors(self.reply(Msg("user", "Refer to the following to generate an updated list of participants:" + str(combined_actors) + ";Collecting and changing the requirements:" + change_request, role="assistant")).content)
+    def get_final_actors(
+            self,
+            original_actors: List[str],
+            change_request: str,
+            model: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        scope = scope_for(change_request, "actors", original_actors, model)
+        relevant, untouched = scope.split("actors", original_actors)
+        prompt = scoped_prompt("participants", relevant, len(untouched), change_request)
+        return merge_scoped(untouched, self._extract_actors(self.reply(Msg("user", prompt, role="assistant")).content))
 
     def _extract_actors(self, content: str) -> List[str]:
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return list({x.strip() for x in match.group(1).split('\n') if x.strip()})
+        if (block := result_block(content)) is not None:
+            return list({x.strip() for x in block.split('\n') if x.strip()})
         return []
\ No newline at end of file
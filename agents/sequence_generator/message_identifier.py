@@ -1,13 +1,15 @@
 # File: agents/message_identifier.py
 
-import re
 from typing import List, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
 import utils.util_function as uf
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 
 class MessageIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "messages"
 
     def __init__(
             self,
@@ -22,7 +24,7 @@ class MessageIdentifier(LlamaIndexAgent):
             1. Object list
             2. Interaction modes in the knowledge base
             3. Enter a scenario
-            The results must be in the format:```RESULT\nobjectA->objectB:message\n...```"""
+            The results must be a JSON object: {"messages": ["objectA->objectB:message", ...]}"""
 
         super().__init__(
             name=name,
@@ -44,7 +46,9 @@ class MessageIdentifier(LlamaIndexAgent):
             "Lists all messages:"
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
     def identify_messages(self, objects: List[str], context: str) -> List[str]:
         analysis_input = f"object list:{', '.join(objects)}\ncontext:{context}"
@@ -54,7 +58,4 @@ class MessageIdentifier(LlamaIndexAgent):
     def _parse_response(self, content: str) -> List[str]:
         print('.....................message:.............................')
         print(content)
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return [x.strip() for x in match.group(1).split('\n') if x.strip()]
-        # return list(set(re.findall(r'.+?->.+?:.+', content)))
-        return content
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
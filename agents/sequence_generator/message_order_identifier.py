@@ -1,13 +1,15 @@
 # File: agents/message_order_identifier.py
 
-import re
 from typing import List, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
 import utils.util_function as uf
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 
 class MessageOrderIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "message_order"
 
     def __init__(
             self,
@@ -21,7 +23,7 @@ class MessageOrderIdentifier(LlamaIndexAgent):
             1. Message list
             2. Process specifications in the knowledge base
             3. Enter a scenario
-            Results must be formatted:```RESULT\n1. message1\n2. message2\n...```"""
+            Results must be a JSON object: {"steps": ["1. message1", "2. message2", ...]}"""
 
         super().__init__(
             name=name,
@@ -43,7 +45,9 @@ class MessageOrderIdentifier(LlamaIndexAgent):
             "Determines the order in which messages are executed:"
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
 
     def identify_sequence(self, messages: List[str], context: str) -> List[str]:
@@ -55,7 +59,4 @@ class MessageOrderIdentifier(LlamaIndexAgent):
     def _parse_response(self, content: str) -> List[str]:
         print('.....................results:.............................');
         print(content);
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return [x.strip() for x in match.group(1).split('\n') if x.strip()]
-        # return list(set(re.findall(r'\d+\.\s*.+', content)))
-        return content
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
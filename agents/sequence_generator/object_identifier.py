@@ -1,14 +1,16 @@
 # File: agents/object_identifier.py
 """对象识别智能体"""
-import re
 from typing import List, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
 import utils.util_function as uf
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 
 class ObjectIdentifier(LlamaIndexAgent):
     """支持知识检索的对象识别智能体"""
+    OUTPUT_SCHEMA = "objects"
 
     def __init__(
             self,
@@ -21,7 +23,7 @@ class ObjectIdentifier(LlamaIndexAgent):
         sys_prompt = """## Object recognition rules
             You are a professional demand analyst, based on user input and knowledge base:
             1. Identify system interaction objects (classes, entities, components, etc.)
-            2. The RESULT must use the format: RESULT\n object 1\n object 2\n... ` ` `"""
+            2. The RESULT must be a JSON object: {"objects": ["object 1", "object 2", ...]}"""
 
         super().__init__(
             name=name,
@@ -43,16 +45,16 @@ class ObjectIdentifier(LlamaIndexAgent):
             "list all object:"
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
 
     def identify_objects(self, context: str) -> List[str]:
         response = self.reply(Msg("user", context, role="assistant"))
         return self._parse_response(response.content)
 
-    def _parse_response(self, content: str) -> List[str]:"
+    def _parse_response(self, content: str) -> List[str]:
         print('.....................object:.............................');
         print(content)
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return [x.strip() for x in match.group(1).split('\n') if x.strip()]
-        return list(set(re.findall(r'\d+\.\s*(.*?)(?:\n|$)', content)))
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
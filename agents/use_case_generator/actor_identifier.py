@@ -1,13 +1,17 @@
 # File: agents/use_case_generator/actor_identifier.py
 """RAG-enhanced Actor Identifier"""
-import re
-from typing import List, Union
+from typing import Dict, List, Tuple, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
 import utils.util_function as uf
+from utils.map_reduce import fan_out, group_requirements, reduce_names
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 
 class ActorIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "actors"
+
     def __init__(
             self,
             name: str,
@@ -20,7 +24,7 @@ class ActorIdentifier(LlamaIndexAgent):
             You are a professional requirements analyst. Based on user input and the rules from the knowledge base:
             
             Identify all user roles and external systems.
-            The result must use the format: RESULT\nActor 1\nActor 2\n..."""
+            The result must be a JSON object: {"actors": ["Actor 1", "Actor 2", ...]}"""
 
         super().__init__(
             name=name,
@@ -43,7 +47,9 @@ class ActorIdentifier(LlamaIndexAgent):
             "list all actor:"
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
 
     def identify_actors(self, background: str) -> List[str]:
@@ -51,9 +57,24 @@ class ActorIdentifier(LlamaIndexAgent):
 
         return self._extract_actors(response.content)
 
+    def identify_actors_map_reduce(
+            self,
+            requirements: List[Dict],
+            group_size: int = 1,
+            max_workers: int = 4,
+    ) -> Tuple[List[str], Dict[str, List[str]]]:
+        """Identify actors per requirement group concurrently, then merge the names.
+
+        Returns the canonical names and, for each name, the requirement ids it came from.
+        """
+        def _map(group: List[Dict]) -> Tuple[List[str], List[str]]:
+            names = self.identify_actors(uf.requirements_to_background(group, "use_case"))
+            return [r["id"] for r in group], names if isinstance(names, list) else []
+
+        groups = group_requirements(uf.select_requirements(requirements, "use_case"), group_size)
+        return reduce_names(fan_out(_map, groups, max_workers))
+
     def _extract_actors(self, content: str) -> List[str]:
         print('.....................actor:.............................');
         print(content);
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return [x.strip() for x in match.group(1).split('\n') if x.strip()]
-        return list(set(re.findall(r'\d+\.\s*(.*?)(?:\n|$)', content)))
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
@@ -1,12 +1,14 @@
 # File: agents/use_case_generator/uc_relationship_identifier.py
 """RAG-enhanced Relationship Identifier"""
-import re
 from typing import List, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
 import utils.util_function as uf
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 class UCRelationshipIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "uc_relationships"
 
     def __init__(
             self,
@@ -21,13 +23,12 @@ class UCRelationshipIdentifier(LlamaIndexAgent):
             1. Identify association relationships between actors and use cases.
             2. Identify include/extend relationships between use cases.
             3. Output the type of relationships in the result!
-            3. The result must be returned in the following format:
-            ```RESULT
-            Actor --association--> UseCase1  type:association
-            UseCase1 --include--> UseCase2   type:include
-            UseCase3 --extend--> UseCase4    type:extend
-            ...
-            ```"""
+            3. The result must be a JSON object in the following format:
+            {"relationships": [
+                "Actor --association--> UseCase1  type:association",
+                "UseCase1 --include--> UseCase2   type:include",
+                "UseCase3 --extend--> UseCase4    type:extend"
+            ]}"""
 
         super().__init__(
             name=name,
@@ -47,10 +48,12 @@ class UCRelationshipIdentifier(LlamaIndexAgent):
             f"{self.sys_prompt}\n\n"
             f"[relationship rules:]\n{related_rules}\n\n"
             f"[analytic target]\n{query}\n\n"
-            "List all the relationships in the use case model in the analysis:The result must be returned in the following format:RESULTActor --association--> UseCase1  type:associationUseCase1 --include--> UseCase2   type:includeUseCase3 --extend--> UseCase4    type:extend"
+            "List all the relationships in the use case model in the analysis:"
         )
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
 
     def identify_relationships(
@@ -74,8 +77,4 @@ class UCRelationshipIdentifier(LlamaIndexAgent):
     def _extract_relationships(self, content: str) -> List[str]:
         print('.....................relationship:.............................');
         print(content)
-
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return [x.strip() for x in match.group(1).split('\n') if x.strip()]
-
-        return list(set(re.findall(r'.+?(?:-->|—).+', content)))
\ No newline at end of file
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
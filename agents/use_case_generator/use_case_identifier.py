@@ -1,13 +1,16 @@
 # File: agents/use_case_generator/use_case_identifier.py
 """RAG-enhanced UseCase Identifier"""
-import re
-from typing import List, Union
+from typing import Dict, List, Tuple, Union
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
 import utils.util_function as uf
+from utils.map_reduce import fan_out, group_requirements, reduce_names
+from utils.model_call import call_model
+from utils.structured_output import generation_kwargs, parse_with_repair
 
 
 class UseCaseIdentifier(LlamaIndexAgent):
+    OUTPUT_SCHEMA = "use_cases"
 
     def __init__(
             self,
@@ -21,7 +24,7 @@ class UseCaseIdentifier(LlamaIndexAgent):
                 You are a professional requirements analyst. Based on user input and patterns from the knowledge base:
                 
                 Identify all functional use cases of the system.
-                The result must use the format: RESULT\nUse Case 1\nUse Case 2\n..."""
+                The result must be a JSON object: {"use_cases": ["Use Case 1", "Use Case 2", ...]}"""
 
         super().__init__(
             name=name,
@@ -46,7 +49,9 @@ class UseCaseIdentifier(LlamaIndexAgent):
         )
 
 
-        response_text = self.model(full_prompt).text
+        response_text = call_model(
+            self.model, full_prompt, **generation_kwargs(self.model, self.OUTPUT_SCHEMA)
+        ).text
         return Msg(self.name, response_text, role="assistant")
 
     def _retrieve_knowledge(self, query: str) -> str:
@@ -64,13 +69,25 @@ class UseCaseIdentifier(LlamaIndexAgent):
 
         return self._extract_use_cases(response.content)
 
-    def _extract_use_cases(self, content: str) -> List[str]:
+    def identify_use_cases_map_reduce(
+            self,
+            requirements: List[Dict],
+            group_size: int = 1,
+            max_workers: int = 4,
+    ) -> Tuple[List[str], Dict[str, List[str]]]:
+        """Identify use cases per requirement group concurrently, then merge the names.
 
-        print('.....................the result of usecase:.............................');
-        print(content);
+        Returns the canonical names and, for each name, the requirement ids it came from.
+        """
+        def _map(group: List[Dict]) -> Tuple[List[str], List[str]]:
+            names = self.identify_use_cases(uf.requirements_to_background(group, "use_case"))
+            return [r["id"] for r in group], names if isinstance(names, list) else []
 
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
-            return [x.strip() for x in match.group(1).split('\n') if x.strip()]
+        groups = group_requirements(uf.select_requirements(requirements, "use_case"), group_size)
+        return reduce_names(fan_out(_map, groups, max_workers))
 
+    def _extract_use_cases(self, content: str) -> List[str]:
 
-        return list(set(re.findall(r'\d+\.\s*(.*?)(?:\n|$)', content)))
\ No newline at end of file
+        print('.....................the result of usecase:.............................');
+        print(content);
+        return parse_with_repair(self.model, content, self.OUTPUT_SCHEMA)
\ No newline at end of file
@@ -0,0 +1,63 @@
+# File: benchmarks/bench_parsing.py
+"""Parsing throughput on large model outputs: utils.parsing vs. the previous inline regexes
+
+Run from the repository root: python -m benchmarks.bench_parsing [lines]
+"""
+import random
+import re
+import sys
+import time
+
+from utils.parsing import parse_message, parse_relation, result_lines
+
+KINDS = ["inheritance", "association", "composition", "dependency", "include", "extend"]
+
+
+def _make_output(n_lines: int, seed: int = 7) -> tuple:
+    rng = random.Random(seed)
+    relations = [
+        f"Class{rng.randrange(500)} --{rng.choice(KINDS)}--> Class{rng.randrange(500)}"
+        for _ in range(n_lines)
+    ]
+    messages = [
+        f"Service{rng.randrange(50)}->Service{rng.randrange(50)}: call operation {i}"
+        for i in range(n_lines)
+    ]
+    wrap = lambda lines: "Analysis...\n```RESULT\n" + "\n".join(lines) + "\n```\n"
+    return wrap(relations), wrap(messages)
+
+
+def _legacy_relations(content: str) -> list:
+    if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
+        lines = [x.strip() for x in match.group(1).split('\n') if x.strip()]
+        return [re.split(r"\s*--\s*|\s*-->\s*", line) for line in lines]
+    return []
+
+
+def _legacy_messages(content: str) -> list:
+    if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
+        lines = [x.strip() for x in match.group(1).split('\n') if x.strip()]
+        return [re.split(r"\s*->\s*|\s*:\s*", line) for line in lines]
+    return []
+
+
+def _time(label: str, func, content: str, repeat: int = 3) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(content)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<32} {best * 1000:9.1f} ms  ({len(result)} items)")
+
+
+def main(n_lines: int = 50000) -> None:
+    relation_output, message_output = _make_output(n_lines)
+    print(f"{n_lines} lines per output\n")
+    _time("relations, inline re.split", _legacy_relations, relation_output)
+    _time("relations, tokenizer", lambda c: [parse_relation(l) for l in result_lines(c)], relation_output)
+    _time("messages, inline re.split", _legacy_messages, message_output)
+    _time("messages, tokenizer", lambda c: [parse_message(l) for l in result_lines(c)], message_output)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
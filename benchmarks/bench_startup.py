@@ -0,0 +1,62 @@
+# File: benchmarks/bench_startup.py
+"""CLI startup time for the lightweight commands, and which heavy modules they import
+
+Run from the repository root: python -m benchmarks.bench_startup [repeat]
+"""
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from utils.model_diff import save_snapshot
+
+HEAVY_MODULES = ("agentscope", "llama_index", "docx", "loguru")
+
+
+def _make_versions(base: Path) -> tuple:
+    old, new = base / "2025-01-01-1", base / "2025-01-02-1"
+    for version_dir in (old, new):
+        version_dir.mkdir(parents=True)
+    classes = [f"Class{i}" for i in range(200)]
+    save_snapshot(old, "class", classes=classes, attributes=[f"{c}.id" for c in classes], methods=[], relations=[])
+    save_snapshot(new, "class", classes=classes + ["Invoice"], attributes=[f"{c}.id" for c in classes],
+                  methods=[], relations=["Invoice --association--> Class1"])
+    return str(old), str(new)
+
+
+def _heavy_imports(args: list) -> list:
+    """Heavy top-level packages imported by a command, from `python -X importtime`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args], capture_output=True, text=True)
+    imported = {line.rsplit("|", 1)[-1].strip().split(".")[0] for line in result.stderr.splitlines() if "|" in line}
+    return sorted(imported & set(HEAVY_MODULES))
+
+
+def _time(label: str, args: list, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", *args], capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    heavy = _heavy_imports(args)
+    print(f"{label:<12} {best * 1000:9.1f} ms  heavy imports: {json.dumps(heavy) if heavy else 'none'}")
+
+
+def main(repeat: int = 5) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        old, new = _make_versions(Path(tmp))
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+            best = min(best, time.perf_counter() - start)
+        print(f"{'python -c':<12} {best * 1000:9.1f} ms  (interpreter baseline)")
+        _time("--help", ["--help"], repeat)
+        _time("versions", ["versions", tmp], repeat)
+        _time("render", ["render", new], repeat)
+        _time("diff", ["diff", old, new], repeat)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,210 @@
+# File: dynamic_workflow/batch_change_workflow.py
+"""Batch change processing: one agent setup and model load for a queue of change requests
+
+Requests are applied in order to the in-memory model. With coalescing, consecutive
+requests whose change scopes do not overlap are sent to the agents as one numbered
+request. The resulting versions are written together at the end, each one diffed
+against the version before it. With `pipelined`, each version is written in a
+worker process as soon as it is produced, while the agents work on the next request;
+a failed save stops the batch before the next request is sent to the agents.
+
+Usage: python -m dynamic_workflow.batch_change_workflow {class,sequence,use_case} REQUESTS [--coalesce] [--pipelined] [--no-resume]
+"""
+import argparse
+import json
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Union
+
+from dynamic_workflow import dynamic_class_modeling_workflow as class_change
+from dynamic_workflow import dynamic_sequence_modeling_workflow as sequence_change
+from dynamic_workflow import dynamic_use_case_modeling_workflow as use_case_change
+from utils.checkpoint import WorkflowCheckpoint
+from utils.model_context import change_scope
+from utils.render_pool import RenderQueue
+from utils.runtime import get_runtime
+
+
+class ChangeWorkflow(NamedTuple):
+    checkpoint_name: str
+    knowledge_config: str
+    init_agents: Callable[[str], list]
+    find_latest: Callable[[str], Optional[str]]
+    load_model: Callable[[str], Dict]
+    apply_change: Callable
+    save_version: Callable[..., str]
+
+
+WORKFLOWS = {
+    "class": ChangeWorkflow(
+        "class_change", "class_knowledge.json",
+        class_change._init_class_change_agents, class_change._find_latest_class_version,
+        class_change._load_existing_class_model, class_change._apply_class_change,
+        class_change._save_class_version,
+    ),
+    "sequence": ChangeWorkflow(
+        "sequence_change", "sequence_knowledge.json",
+        sequence_change._init_sequence_change_agents, sequence_change._find_latest_sequence_version,
+        sequence_change._load_existing_sequence_model, sequence_change._apply_sequence_change,
+        sequence_change._save_sequence_version,
+    ),
+    "use_case": ChangeWorkflow(
+        "use_case_change", "uc_knowledge.json",
+        use_case_change._init_change_agents, use_case_change._find_latest_version,
+        use_case_change._load_existing_model, use_case_change._apply_change,
+        use_case_change._save_versioned_results,
+    ),
+}
+
+
+def load_change_requests(path: str) -> List[str]:
+    """Read a request queue: JSONL (strings or {"change_request": ...}), a JSON list, or blank-line separated text."""
+    text = Path(path).read_text(encoding="utf-8")
+    if path.endswith(".jsonl"):
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    elif path.endswith(".json"):
+        items = json.loads(text)
+    else:
+        items = [block.strip() for block in text.split("\n\n")]
+    requests = [item["change_request"] if isinstance(item, dict) else item for item in items]
+    return [request.strip() for request in requests if request and request.strip()]
+
+
+def coalesce_requests(change_requests: List[str], model: Optional[Dict]) -> List[List[str]]:
+    """Group consecutive requests whose change scopes are disjoint.
+
+    A request whose scope cannot be determined (it names nothing in the model,
+    e.g. it only adds new elements) always gets a group of its own.
+    """
+    groups: List[List[str]] = []
+    claimed: Optional[Set[str]] = None
+    for request in change_requests:
+        scope = change_scope(request, model or {})
+        names = scope.seeds | scope.neighbours
+        if groups and claimed is not None and scope.seeds and not names & claimed:
+            groups[-1].append(request)
+            claimed |= names
+        else:
+            groups.append([request])
+            claimed = names if scope.seeds else None
+    return groups
+
+
+def _combined_request(group: List[str]) -> str:
+    if len(group) == 1:
+        return group[0]
+    return "\n".join(f"{idx}. {request}" for idx, request in enumerate(group, 1))
+
+
+def run_change_batch(
+        model_type: str,
+        change_requests: List[str],
+        knowledge_config: Optional[str] = None,
+        model_base: Optional[str] = None,
+        coalesce: bool = False,
+        resume: bool = True,
+        agents: Optional[list] = None,
+        pipelined: bool = False
+) -> List[str]:
+    """Apply the change requests in order and return the new version directories.
+
+    By default nothing is written until every request has been applied; with
+    `resume`, a failed batch replays the finished agent steps from their
+    checkpoints. With `pipelined`, versions are saved while the batch runs, so a
+    failure leaves the versions saved so far and the rerun should start after them.
+    """
+    workflow = WORKFLOWS[model_type]
+    knowledge_config = knowledge_config or workflow.knowledge_config
+    model_base = model_base or get_runtime().model_base(model_type)
+
+    agents = agents or workflow.init_agents(knowledge_config)
+    latest_version = workflow.find_latest(model_base)
+    model = workflow.load_model(latest_version) if latest_version else None
+
+    groups = coalesce_requests(change_requests, model) if coalesce else [[request] for request in change_requests]
+    print(f"[batch] {len(change_requests)} change requests in {len(groups)} agent runs")
+
+    with RenderQueue(processes=pipelined) as renders:
+        pending, checkpoints = [], []
+        try:
+            for idx, group in enumerate(groups, 1):
+                if pipelined:
+                    _raise_failed_save(renders.futures)
+                change_request = _combined_request(group)
+                print(f"[batch] Applying change {idx}/{len(groups)} ({len(group)} request(s))")
+                checkpoint = WorkflowCheckpoint(workflow.checkpoint_name, change_request, model, enabled=resume)
+                model, _ = workflow.apply_change(agents, model, change_request, checkpoint)
+                pending.append((change_request, model))
+                checkpoints.append(checkpoint)
+                if pipelined:
+                    latest_version = _queue_save(renders, workflow, change_request, model, latest_version, model_base)
+        finally:
+            if pipelined:
+                saved = [future for future in renders.futures if future.exception() is None]
+                for checkpoint in checkpoints[:len(saved)]:
+                    checkpoint.clear()
+                if len(saved) < len(groups):
+                    print(f"[batch] Saved {len(saved)} of {len(groups)} versions before stopping")
+
+        if not pipelined:
+            for change_request, final_model in pending:
+                latest_version = _queue_save(renders, workflow, change_request, final_model, latest_version, model_base)
+        version_dirs = renders.results()
+    for checkpoint in checkpoints:
+        checkpoint.clear()
+
+    print(f"\n[batch] Saved {len(version_dirs)} versions to: {model_base}")
+    return version_dirs
+
+
+def _queue_save(
+        renders: RenderQueue,
+        workflow: ChangeWorkflow,
+        change_request: str,
+        final_model: Dict,
+        previous_version: Union[str, Future, None],
+        model_base: str
+) -> Future:
+    """Queue one version; `previous_version` may be the future of the version queued before it."""
+    return renders.submit(
+        workflow.save_version,
+        change_request=change_request,
+        final_model=final_model,
+        original_version=previous_version,
+        output_base=model_base
+    )
+
+
+def _raise_failed_save(saves: List[Future]) -> None:
+    """Stop a pipelined batch on the first queued save that has already failed."""
+    for save in saves:
+        if save.done() and save.exception() is not None:
+            raise save.exception()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Apply a queue of change requests to a model")
+    parser.add_argument("model_type", choices=sorted(WORKFLOWS))
+    parser.add_argument("requests", help="JSONL, JSON list or blank-line separated text file")
+    parser.add_argument("--knowledge-config")
+    parser.add_argument("--model-base")
+    parser.add_argument("--coalesce", action="store_true", help="merge requests with disjoint scopes into one agent run")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="save each version in a worker process while the next request is applied")
+    parser.add_argument("--no-resume", action="store_true")
+    args = parser.parse_args(argv)
+
+    for version_dir in run_change_batch(
+            args.model_type,
+            load_change_requests(args.requests),
+            knowledge_config=args.knowledge_config,
+            model_base=args.model_base,
+            coalesce=args.coalesce,
+            resume=not args.no_resume,
+            pipelined=args.pipelined,
+    ):
+        print(version_dir)
+
+
+if __name__ == "__main__":
+    main()
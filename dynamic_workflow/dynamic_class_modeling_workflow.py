@@ -1,88 +1,51 @@
 # File: workflows/change_class_modeling.py
 """RAG-enhanced Class Model Change Workflow"""
-import json
 import os
 import re
 from datetime import datetime
 from typing import Tuple, Dict, List, Optional, Union
 from pathlib import Path
 
-import agentscope
-from agentscope.rag import KnowledgeBank
-from agentscope.msghub import msghub
-from agentscope.message import Msg
+from utils.checkpoint import WorkflowCheckpoint
+from utils.model_diff import SNAPSHOT_FILE, diff_versions, load_snapshot, save_snapshot
+from utils.pipeline import init_pipeline_agents, load_pipeline_spec, run_pipeline
+from utils.parsing import parse_relation
+from utils.runtime import get_runtime
+from utils.versions import latest_version
 
 
 def run_class_change_workflow(
         change_request: str,
-        knowledge_config: str = "../configs/class_knowledge.json",
-        model_base: str = "../workflow/class_versions"
+        knowledge_config: str = "class_knowledge.json",
+        model_base: Optional[str] = None,
+        resume: bool = True,
+        agents: Optional[list] = None
 ) -> Tuple[Dict, Dict, Dict, Dict]:
     """Class Model Change Modeling Workflow (Fixed Type Error Version)"""
+    model_base = model_base or get_runtime().model_base("class")
+    agents = agents or _init_class_change_agents(knowledge_config)
+    outputs = run_pipeline("class_change", {"change_request": change_request, "model_base": model_base},
+                           agents=agents, knowledge_config=knowledge_config, resume=resume)
+    print(f"\nClass model change results saved to: {outputs['version_dir']}")
+    return outputs["classes"], outputs["attributes"], outputs["methods"], outputs["relations"]
 
-    agents = agentscope.init(
-        model_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\model_configs.json",
-        agent_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\dynamic_class_agent_configs.json"
-    )
-
-    latest_version = _find_latest_class_version(model_base)
-    original_data = _load_existing_class_model(latest_version) if latest_version else None
-
-    knowledge_bank = KnowledgeBank(configs=knowledge_config)
-    knowledge_bank.equip(agents[0], ["class_rules"])  
-    knowledge_bank.equip(agents[1], ["attribute_rules"])  
-    knowledge_bank.equip(agents[2], ["function_rules"]) 
-    knowledge_bank.equip(agents[3], ["class_relationship_rules"])  
 
-    with msghub(agents) as hub:
-        hub.broadcast(Msg("Host", "Starting class model change process", role="system"))
-        hub.broadcast(Msg("Host", f"Change request: {change_request}", role="user"))
+def _init_class_change_agents(knowledge_config: str) -> list:
+    """Create the four class change agents and equip their knowledge"""
+    return init_pipeline_agents(load_pipeline_spec("class_change"), knowledge_config)
 
-        # Step 1: Class list changes
-        original_classes = original_data["classes"] if original_data else []
-        new_classes = _ensure_dict_format(
-            agents[0].get_final_classes(original_classes, change_request),
-            agent_name="ClassAgent"
-        )
-
-        # Step 2: Class attribute changes
-        original_attributes = original_data["attributes"] if original_data else []
-        changed_attributes = _ensure_dict_format(
-            agents[1].get_final_attributes(original_attributes, change_request),
-            agent_name="AttributeAgent"
-        )
 
-        # Step 3: Class method changes
-        original_methods = original_data["methods"] if original_data else []
-        changed_methods = _ensure_dict_format(
-            agents[2].get_final_methods(original_methods, change_request),
-            agent_name="MethodAgent"
-        )
-
-        # Step 4: Class relationship changes
-        original_relations = original_data["relations"] if original_data else []
-        changed_relations = _ensure_dict_format(
-            agents[3].get_final_relations(original_relations, change_request),
-            agent_name="RelationAgent"
-        )
-
-    final_model = _merge_class_changes(
-        original_data,
-        new_classes,
-        changed_attributes,
-        changed_methods,
-        changed_relations
-    )
-
-    version_dir = _save_class_version(
-        change_request=change_request,
-        final_model=final_model,
-        original_version=latest_version,
-        output_base=model_base
-    )
-
-    print(f"\nClass model change results saved to: {version_dir}")
-    return new_classes, changed_attributes, changed_methods, changed_relations
+def _apply_class_change(
+        agents: list,
+        original_data: Optional[Dict],
+        change_request: str,
+        checkpoint: WorkflowCheckpoint
+) -> Tuple[Dict, Tuple[Dict, Dict, Dict, Dict]]:
+    """Run the change agents on an in-memory model; returns the merged model and the per-agent changes"""
+    outputs = run_pipeline("class_change", {"change_request": change_request, "original": original_data},
+                           agents=agents, checkpoint=checkpoint,
+                           outputs=["final_model", "classes", "attributes", "methods", "relations"])
+    return outputs["final_model"], (outputs["classes"], outputs["attributes"], outputs["methods"], outputs["relations"])
 
 
 def _ensure_dict_format(
@@ -100,27 +63,15 @@ def _ensure_dict_format(
 
 
 def _find_latest_class_version(base_dir: str) -> Optional[str]:
-    """Find the latest class model version (unchanged)"""
     """Find the latest class model version"""
-    version_dirs = []
-    for d in Path(base_dir).iterdir():
-        if d.is_dir() and re.match(r"\d{4}-\d{2}-\d{2}-\d+", d.name):
-            try:
-                date_part, num = d.name.rsplit("-", 1)
-                dt = datetime.strptime(date_part, "%Y-%m-%d")
-                version_dirs.append((dt, int(num), d))
-            except ValueError:
-                continue
-
-    if not version_dirs:
-        return None
-
-    version_dirs.sort(key=lambda x: (x[0], x[1]), reverse=True)
-    return str(version_dirs[0][2])
+    return latest_version(base_dir)
 
 
 def _load_existing_class_model(version_dir: str) -> Dict:
     """Load class model data (added null handling)"""
+    if (Path(version_dir) / SNAPSHOT_FILE).exists():
+        return load_snapshot(version_dir).elements
+
     model_data = {
         "classes": [],
         "attributes": [],
@@ -148,9 +99,10 @@ def _load_existing_class_model(version_dir: str) -> Dict:
 
     rel_path = Path(version_dir) / "relations.md"
     if rel_path.exists():
-        model_data["relations"] = list(set(
-            re.findall(r"(\w+\s*<:[\w\s]+:>\s*\w+)", rel_path.read_text(encoding="utf-8"))
-        ))
+        model_data["relations"] = list({
+            line.strip() for line in rel_path.read_text(encoding="utf-8").splitlines()
+            if not line.startswith("#") and parse_relation(line)
+        })
 
     return model_data
 
@@ -289,6 +241,9 @@ def _save_class_version(
         output_dir=version_dir
     )
 
+    if original_version:
+        (version_dir / "DIFF.md").write_text(diff_versions(original_version, version_dir).to_markdown(), encoding="utf-8")
+
     return str(version_dir)
 
 def _save_class_artifacts(
@@ -330,6 +285,8 @@ def _save_class_artifacts(
         for rel in relations:
             f.write(f"{rel}\n")
 
+    save_snapshot(output_dir, "class", classes=classes, attributes=attributes, methods=methods, relations=relations)
+
 
 if __name__ == "__main__":
 
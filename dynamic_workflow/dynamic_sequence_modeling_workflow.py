@@ -7,89 +7,59 @@ from datetime import datetime
 from typing import Tuple, List, Dict, Optional
 from pathlib import Path
 
-import agentscope
-from agentscope.rag import KnowledgeBank
-from agentscope.msghub import msghub
-from agentscope.message import Msg
+from utils.checkpoint import WorkflowCheckpoint
+from utils.pipeline import init_pipeline_agents, load_pipeline_spec, run_pipeline
+from utils.parsing import parse_message
+from utils.model_diff import SNAPSHOT_FILE, diff_versions, load_snapshot, save_snapshot
+from utils.runtime import get_runtime
+from utils.sequence_flow import build_flow, read_flow_md, serialize_flow, to_plantuml
+from utils.versions import latest_version
 
 
 def run_sequence_change_workflow(
         change_request: str,
-        knowledge_config: str = "../configs/sequence_knowledge.json",
-        model_base: str = "../workflow/sequence_versions"
+        knowledge_config: str = "sequence_knowledge.json",
+        model_base: Optional[str] = None,
+        resume: bool = True,
+        agents: Optional[list] = None
 ) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], List[str]]:
     """Sequence Model Change Workflow"""
+    model_base = model_base or get_runtime().model_base("sequence")
+    agents = agents or _init_sequence_change_agents(knowledge_config)
+    outputs = run_pipeline("sequence_change", {"change_request": change_request, "model_base": model_base},
+                           agents=agents, knowledge_config=knowledge_config, resume=resume)
+    print(f"\nSequence model change results saved to: {outputs['version_dir']}")
+    return outputs["objects"], outputs["messages"], outputs["flow"]
 
-    agents = agentscope.init(
-        model_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\model_configs.json",
-        agent_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\dynamic_sequence_agent_configs.json"
-    )
 
-    latest_version = _find_latest_sequence_version(model_base)
-    original_data = _load_existing_sequence_model(latest_version) if latest_version else None
-
-    knowledge_bank = KnowledgeBank(configs=knowledge_config)
-    knowledge_bank.equip(agents[0], ["sequence_change_rules"]) 
-    knowledge_bank.equip(agents[1], ["sequence_change_rules"])
-    knowledge_bank.equip(agents[2], ["sequence_change_rules"])
-
-    knowledge_bank.equip(agents[0], ["object_rules"])  
-    knowledge_bank.equip(agents[1], ["message_rules"])  
-    knowledge_bank.equip(agents[2], ["sequence_rules"])  
-
-    with msghub(agents) as hub:
-        hub.broadcast(Msg("Host", "Start sequence model change process", role="system"))
-        hub.broadcast(Msg("Host", f"Change request: {change_request}", role="user"))
-
-        # Step 1: Object changes
-        original_objects = original_data["objects"] if original_data else []
-        new_objects = agents[0].get_final_objects(original_objects, change_request)
-        hub.broadcast(Msg("ObjectAgent", json.dumps(new_objects, ensure_ascii=False), role="assistant"))
-
-        # Step 2: Message changes
-        original_messages = original_data["messages"] if original_data else []
-        changed_messages = agents[1].get_final_messages(original_messages, change_request)
-        hub.broadcast(Msg("MessageAgent", json.dumps(changed_messages, ensure_ascii=False), role="assistant"))
-
-        # Step 3: Flow order adjustment
-        original_flow = original_data["flow"] if original_data else []
-        changed_flow = agents[2].get_final_message_order(original_flow, change_request)
-        hub.broadcast(Msg("FlowAgent", json.dumps(changed_flow, ensure_ascii=False), role="assistant"))
-
-    final_model = _merge_sequence_changes(
-        original_data,
-        new_objects,
-        changed_messages,
-        changed_flow
-    )
+def _init_sequence_change_agents(knowledge_config: str) -> list:
+    """Create the three sequence change agents and equip their knowledge"""
+    return init_pipeline_agents(load_pipeline_spec("sequence_change"), knowledge_config)
 
-    version_dir = _save_sequence_version(
-        change_request=change_request,
-        final_model=final_model,
-        original_version=latest_version,
-        output_base=model_base
-    )
 
-    print(f"\nSequence model change results saved to: {version_dir}")
-    return new_objects, changed_messages, changed_flow
+def _apply_sequence_change(
+        agents: list,
+        original_data: Optional[Dict],
+        change_request: str,
+        checkpoint: WorkflowCheckpoint
+) -> Tuple[Dict, Tuple[List[str], List[str], List[str]]]:
+    """Run the change agents on an in-memory model; returns the merged model and the per-agent results"""
+    outputs = run_pipeline("sequence_change", {"change_request": change_request, "original": original_data},
+                           agents=agents, checkpoint=checkpoint,
+                           outputs=["final_model", "objects", "messages", "flow"])
+    return outputs["final_model"], (outputs["objects"], outputs["messages"], outputs["flow"])
 
 
 def _find_latest_sequence_version(base_dir: str) -> Optional[str]:
     """Find the latest sequence model version (same as use case version lookup)"""
-    version_dirs = []
-    for d in Path(base_dir).iterdir():
-        if d.is_dir() and re.match(r"\d{4}-\d{2}-\d{2}-\d+", d.name):
-            try:
-                date_part, num = d.name.rsplit("-", 1)
-                dt = datetime.strptime(date_part, "%Y-%m-%d")
-                version_dirs.append((dt, int(num), d))
-            except ValueError:
-                continue
-    return str(version_dirs[0][2]) if version_dirs else None
+    return latest_version(base_dir)
 
 
 def _load_existing_sequence_model(version_dir: str) -> Dict:
     """Load sequence model data (fix encoding issues)"""
+    if (Path(version_dir) / SNAPSHOT_FILE).exists():
+        return load_snapshot(version_dir).elements
+
     model_data = {"objects": [], "messages": [], "flow": []}
     version_path = Path(version_dir)
 
@@ -105,7 +75,7 @@ def _load_existing_sequence_model(version_dir: str) -> Dict:
 
     flow_path = version_path / "flow.md"
     if flow_path.exists():
-        model_data["flow"] = flow_path.read_text(encoding='utf-8').splitlines()
+        model_data["flow"] = read_flow_md(flow_path.read_text(encoding='utf-8'))
 
     return model_data
 
@@ -123,7 +93,8 @@ def _merge_sequence_changes(
     original_msgs = original["messages"] if original else []
     final_msgs = _merge_messages(original_msgs, changed_messages)
 
-    final_flow = changed_flow if changed_flow else original.get("flow", [])
+    original_flow = original.get("flow", []) if original else []
+    final_flow = serialize_flow(build_flow(changed_flow, strict=False)) if changed_flow else original_flow
 
     return {
         "objects": final_objects,
@@ -136,13 +107,10 @@ def _merge_messages(original: List[str], changes: List[str]) -> List[str]:
     """Intelligently merge message changes"""
     msg_signatures = {}
 
-    for msg in original:
-        sig = re.split(r"\s*:\s*", msg, 1)[0]
+    for msg in original + changes:
+        message = parse_message(msg)
+        sig = (message.source, message.target) if message else msg
         msg_signatures[sig] = msg
-
-    for change_msg in changes:
-        sig = re.split(r"\s*:\s*", change_msg, 1)[0]
-        msg_signatures[sig] = change_msg
     return list(msg_signatures.values())
 
 
@@ -174,6 +142,7 @@ def _save_sequence_version(
 
     if original_version:
         (version_dir / "previous_version.txt").write_text(original_version, encoding='utf-8')
+        (version_dir / "DIFF.md").write_text(diff_versions(original_version, version_dir).to_markdown(), encoding='utf-8')
 
     return str(version_dir)
 
@@ -201,7 +170,8 @@ def _save_sequence_artifacts(
     with open(output_dir / "messages.md", 'w', encoding='utf-8') as f:
         f.write("# Detailed Message List\n\n")
         for idx, msg in enumerate(messages, 1):
-            clean_msg = re.sub(r"\s*->\s*", "→", msg)
+            message = parse_message(msg)
+            clean_msg = f"{message.source}→{message.target}: {message.text}" if message else msg
             f.write(f"{idx}. ​**{clean_msg}**\n")
             f.write(f"   - Type: Synchronous Message\n   - Technical Protocol: REST API\n\n")
 
@@ -226,10 +196,7 @@ def _save_sequence_artifacts(
             f.write(f"{uml_type} \"{name}\" as {name.replace(' ', '_')}\n")
 
         f.write("\n")
-        for line in flow:
-            line = line.replace("alt", "alt").replace("loop", "loop")
-            line = line.replace("opt", "opt").replace("par", "par")
-            line = line.replace("else", "else").replace("end", "end")
+        for line in to_plantuml(build_flow(flow, strict=False), lambda name: name.replace(' ', '_')):
             f.write(f"{line}\n")
         f.write("@enduml\n")
 
@@ -241,6 +208,8 @@ def _save_sequence_artifacts(
             "flow_steps": len(flow)
         }, f, ensure_ascii=False, indent=2)
 
+    save_snapshot(output_dir, "sequence", objects=objects, messages=messages, flow=flow)
+
 
 if __name__ == "__main__":
     change1 = "Add payment timeout retry mechanism, up to 3 retries"
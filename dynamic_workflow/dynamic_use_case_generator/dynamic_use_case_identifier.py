@@ -4,6 +4,8 @@ import re
 from typing import List, Union, Dict
 from agentscope.agents import LlamaIndexAgent
 from agentscope.message import Msg
+from utils.model_call import call_model
+from utils.parsing import result_block
 
 
 class DynamicUseCaseIdentifier(LlamaIndexAgent):
@@ -34,7 +36,7 @@ class DynamicUseCaseIdentifier(LlamaIndexAgent):
     def reply(self, x: Union[Msg, List[Msg]]) -> Msg:
         return Msg(
             self.name,
-            self._format_response(self.model(self._build_prompt(x)).text),
+            self._format_response(call_model(self.model, self._build_prompt(x)).text),
             role="assistant"
         )
 
@@ -83,10 +85,10 @@ class DynamicUseCaseIdentifier(LlamaIndexAgent):
         return result
 
     def _extract_use_cases(self, content: str) -> List[str]:
-        if match := re.search(r'```RESULT\n(.*?)\n```', content, re.DOTALL):
+        if (block := result_block(content)) is not None:
             return list({
                 self._clean_use_case_name(line.strip())
-                for line in match.group(1).split('\n')
+                for line in block.split('\n')
                 if line.strip()
             })
         return []
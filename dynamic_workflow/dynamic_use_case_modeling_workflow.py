@@ -1,4 +1,3 @@
-import json
 import os
 import glob
 import re
@@ -6,80 +5,52 @@ from datetime import datetime
 from typing import Tuple, List, Dict, Optional
 from pathlib import Path
 
-import agentscope
-from agentscope.rag import KnowledgeBank
-from agentscope.msghub import msghub
-from agentscope.message import Msg
+from utils.checkpoint import WorkflowCheckpoint
+from utils.model_diff import SNAPSHOT_FILE, diff_versions, load_snapshot, save_snapshot
+from utils.pipeline import init_pipeline_agents, load_pipeline_spec, run_pipeline
+from utils.runtime import get_runtime
+from utils.versions import latest_version
+
 
 def run_change_workflow(
         change_request: str,
-        knowledge_config: str = "../configs/uc_knowledge.json",
-        model_base: str = "../workflow/versions"
+        knowledge_config: str = "uc_knowledge.json",
+        model_base: Optional[str] = None,
+        resume: bool = True,
+        agents: Optional[list] = None
 ) -> Tuple[List[str], Dict[str, List[str]], Dict[str, List[str]]]:
-    agents = agentscope.init(
-        model_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\model_configs.json",
-        agent_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\dynamic_usecase_agent_configs.json"
-    )
-    latest_version = _find_latest_version(model_base)
-    original_data = _load_existing_model(latest_version) if latest_version else None
-    knowledge_bank = KnowledgeBank(configs=knowledge_config)
-    knowledge_bank.equip(agents[0], ["uc_change_rules"])
-    knowledge_bank.equip(agents[0], ["actor_rules"])
-    knowledge_bank.equip(agents[1], ["uc_rules"])
-    knowledge_bank.equip(agents[2], ["uc_rel_rules"])
-    with msghub(agents) as hub:
-        hub.broadcast(Msg("Host", "Start change modeling process", role="system"))
-        hub.broadcast(Msg("Host", f"Change request: {change_request}", role="user"))
-        if original_data:
-            new_actors = agents[0].get_final_actors(original_data["actors"], change_request)
-        else:
-            new_actors = agents[0].get_final_actors(change_request)
-        hub.broadcast(Msg("ActorAgent", json.dumps(new_actors, ensure_ascii=False), role="assistant"))
-        if original_data:
-            changed_cases = agents[1].get_final_use_cases(original_data["use_cases"], change_request)
-        else:
-            changed_cases = agents[1].get_final_use_cases(change_request)
-        hub.broadcast(Msg("UseCaseAgent", json.dumps(changed_cases, ensure_ascii=False), role="assistant"))
-        original_relations = original_data["relationships"] if original_data else []
-        changed_relations = agents[2].get_final_relations(
-            original_relations,
-            new_actors,
-            change_request
-        )
-        hub.broadcast(Msg("RelAgent", json.dumps(changed_relations, ensure_ascii=False), role="assistant"))
-    final_model = _merge_changes(
-        original_data,
-        new_actors,
-        changed_cases,
-        changed_relations
-    )
-    version_dir = _save_versioned_results(
-        change_request=change_request,
-        final_model=final_model,
-        original_version=latest_version,
-        output_base=model_base
-    )
-    print(f"\nChange results saved to: {version_dir}")
-    return new_actors, changed_cases, changed_relations
+    model_base = model_base or get_runtime().model_base("use_case")
+    agents = agents or _init_change_agents(knowledge_config)
+    outputs = run_pipeline("use_case_change", {"change_request": change_request, "model_base": model_base},
+                           agents=agents, knowledge_config=knowledge_config, resume=resume)
+    print(f"\nChange results saved to: {outputs['version_dir']}")
+    return outputs["actors"], outputs["use_cases"], outputs["relations"]
+
+
+def _init_change_agents(knowledge_config: str) -> list:
+    return init_pipeline_agents(load_pipeline_spec("use_case_change"), knowledge_config)
+
+
+def _apply_change(
+        agents: list,
+        original_data: Optional[Dict],
+        change_request: str,
+        checkpoint: WorkflowCheckpoint
+) -> Tuple[Dict, Tuple[List[str], Dict[str, List[str]], Dict[str, List[str]]]]:
+    """Run the change agents on an in-memory model; returns the merged model and the per-agent changes"""
+    outputs = run_pipeline("use_case_change", {"change_request": change_request, "original": original_data},
+                           agents=agents, checkpoint=checkpoint,
+                           outputs=["final_model", "actors", "use_cases", "relations"])
+    return outputs["final_model"], (outputs["actors"], outputs["use_cases"], outputs["relations"])
 
 
 def _find_latest_version(base_dir: str) -> Optional[str]:
-    version_dirs = []
-    for d in Path(base_dir).iterdir():
-        if d.is_dir() and re.match(r"\d{4}-\d{2}-\d{2}-\d+", d.name):
-            try:
-                date_part, num = d.name.rsplit("-", 1)
-                dt = datetime.strptime(date_part, "%Y-%m-%d")
-                version_dirs.append((dt, int(num), d))
-            except ValueError:
-                continue
-    if not version_dirs:
-        return None
-    version_dirs.sort(key=lambda x: (x[0], x[1]), reverse=True)
-    return str(version_dirs[0][2])
+    return latest_version(base_dir)
 
 
 def _load_existing_model(version_dir: str) -> Dict:
+    if (Path(version_dir) / SNAPSHOT_FILE).exists():
+        return load_snapshot(version_dir).elements
     model_data = {
         "actors": [],
         "use_cases": [],
@@ -165,6 +136,8 @@ def _save_versioned_results(
         relationships=final_model["relationships"],
         output_dir=version_dir
     )
+    if original_version:
+        (version_dir / "DIFF.md").write_text(diff_versions(original_version, version_dir).to_markdown(), encoding='utf-8')
     return str(version_dir)
 
 
@@ -201,6 +174,7 @@ def _save_structured_results(
                 if rel_hash not in seen:
                     f.write(f"| {subject.strip()} | Association | {obj.strip()} | {background} |\n")
                     seen.add(rel_hash)
+    save_snapshot(output_dir, "use_case", actors=actors, use_cases=use_cases, relationships=relationships)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,178 @@
-# 这是一个示例 Python 脚本。
+# File: main.py
+"""Command line entry point for decomposition, modeling, change management and tooling
 
-# 按 Shift+F10 执行或将其替换为您的代码。
-# 按 双击 Shift 在所有地方搜索类、文件、工具窗口、操作和设置。
+Heavy dependencies (agentscope, llama_index, python-docx) are imported inside the
+commands that run agents, so `versions`, `render` and `diff` start without them.
 
+Usage: python main.py [--config-dir DIR] [--model-dir DIR] ... <command> [options]
+       (python main.py <command> --help for details)
 
-def print_hi(name):
-    # 在下面的代码行中使用断点来调试脚本。
-    print(f'Hi, {name}')  # 按 Ctrl+F8 切换断点。
+The runtime path options may also be set through UMLGEN_* environment variables,
+see utils/runtime.py.
+"""
+import argparse
+import importlib
+import sys
+from typing import Any, Dict, List, Optional
 
+MODEL_TYPES = ("use_case", "class", "sequence")
+MODEL_WORKFLOWS = {
+    "use_case": ("workflow.use_case_modeling_workflow", "run_use_case_workflow"),
+    "class": ("workflow.class_modeling_workflow", "run_class_modeling_workflow"),
+    "sequence": ("workflow.sequence_modeling_workflow", "run_sequence_workflow"),
+}
+CHANGE_WORKFLOWS = {
+    "use_case": ("dynamic_workflow.dynamic_use_case_modeling_workflow", "run_change_workflow"),
+    "class": ("dynamic_workflow.dynamic_class_modeling_workflow", "run_class_change_workflow"),
+    "sequence": ("dynamic_workflow.dynamic_sequence_modeling_workflow", "run_sequence_change_workflow"),
+}
+# Commands whose module has its own argparse main(); the remaining arguments are passed on
+DELEGATED = {
+    "batch": ("dynamic_workflow.batch_change_workflow", "apply a queue of change requests to a model"),
+    "serve": ("service.modeling_service", "run the modeling service with warm agents"),
+    "diff": ("utils.model_diff", "structural diff between two model versions"),
+    "pipeline": ("utils.pipeline", "run a declarative pipeline from configs/pipelines.json"),
+    "projects": ("workflow.project_batch", "decompose and model every project in a directory or manifest"),
+}
+
+
+def _entry_point(target: tuple):
+    module, name = target
+    return getattr(importlib.import_module(module), name)
+
+
+def _options(args: argparse.Namespace, *names: str) -> Dict[str, Any]:
+    """Only the options given on the command line, so the workflow defaults apply otherwise."""
+    return {name: getattr(args, name) for name in names if getattr(args, name) is not None}
+
+
+def _read_input(path: str):
+    import utils.util_function as uf
+
+    return uf.load_requirements(path) if path.endswith(".jsonl") else uf.read_docx(path)
+
+
+def _decompose(args: argparse.Namespace) -> None:
+    import utils.util_function as uf
+    from agents.decomposer import run_decomposition
+
+    options = _options(args, "output_base", "knowledge_config")
+    if args.no_dedup:
+        options["dedup_config"] = None
+    demands, version_dir = run_decomposition(uf.read_docx(args.input), **options)
+    print(f"{len(demands)} requirements saved to: {version_dir}")
+
+
+def _model(args: argparse.Namespace) -> None:
+    run = _entry_point(MODEL_WORKFLOWS[args.type])
+    options = _options(args, "knowledge_config")
+    if args.map_reduce:
+        options["map_reduce"] = True
+    run(_read_input(args.input), resume=not args.no_resume, **options)
+
+
+def _change(args: argparse.Namespace) -> None:
+    run = _entry_point(CHANGE_WORKFLOWS[args.type])
+    run(args.request, resume=not args.no_resume, **_options(args, "knowledge_config", "model_base"))
+
+
+def _versions(args: argparse.Namespace) -> None:
+    from utils.model_diff import SNAPSHOT_FILE, load_snapshot
+    from utils.versions import list_versions
+
+    for version_dir in list_versions(args.base_dir):
+        if (version_dir / SNAPSHOT_FILE).exists():
+            snapshot = load_snapshot(version_dir)
+            counts = ", ".join(f"{kind}={len(items)}" for kind, items in snapshot.elements.items())
+            print(f"{version_dir.name}  {snapshot.model_type}  {counts}")
+        else:
+            print(f"{version_dir.name}  (no {SNAPSHOT_FILE})")
 
-# 按装订区域中的绿色按钮以运行脚本。
-if __name__ == '__main__':
-    print_hi('PyCharm')
 
-# 访问 https://www.jetbrains.com/help/pycharm/ 获取 PyCharm 帮助
+def _render(args: argparse.Namespace) -> None:
+    from utils.model_diff import load_snapshot
+    from utils.plantuml import render_snapshot
+
+    text = render_snapshot(load_snapshot(args.version_dir, args.type))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"PlantUML written to: {args.output}")
+    else:
+        sys.stdout.write(text)
+
+
+def runtime_parser() -> argparse.ArgumentParser:
+    """Path options shared by every command; they override the UMLGEN_* environment variables."""
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    paths = parser.add_argument_group("runtime paths")
+    paths.add_argument("--config-dir", help="agent, knowledge and pipeline configs")
+    paths.add_argument("--model-configs", dest="model_configs_file", help="model_configs.json")
+    paths.add_argument("--data-dir", help="sample requirement documents")
+    paths.add_argument("--model-dir", help="parent of the model version directories")
+    paths.add_argument("--requirements-dir", help="decomposition versions")
+    paths.add_argument("--checkpoint-dir", help="step checkpoints of interrupted runs")
+    paths.add_argument("--projects-dir", help="multi-project batch output")
+    return parser
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py", description=__doc__.split("\n", 1)[0], parents=[runtime_parser()]
+    )
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    decompose = commands.add_parser("decompose", help="decompose a requirements document")
+    decompose.add_argument("input", help=".docx or text file")
+    decompose.add_argument("--output-base")
+    decompose.add_argument("--knowledge-config")
+    decompose.add_argument("--no-dedup", action="store_true")
+    decompose.set_defaults(func=_decompose)
+
+    model = commands.add_parser("model", help="run a modeling workflow")
+    model.add_argument("type", choices=MODEL_TYPES)
+    model.add_argument("input", help="demands.jsonl, .docx or text file")
+    model.add_argument("--knowledge-config")
+    model.add_argument("--map-reduce", action="store_true", help="use case model from structured requirements only")
+    model.add_argument("--no-resume", action="store_true")
+    model.set_defaults(func=_model)
+
+    change = commands.add_parser("change", help="apply one change request to the latest model version")
+    change.add_argument("type", choices=MODEL_TYPES)
+    change.add_argument("request")
+    change.add_argument("--knowledge-config")
+    change.add_argument("--model-base")
+    change.add_argument("--no-resume", action="store_true")
+    change.set_defaults(func=_change)
+
+    versions = commands.add_parser("versions", help="list the versions under a model directory")
+    versions.add_argument("base_dir")
+    versions.set_defaults(func=_versions)
+
+    render = commands.add_parser("render", help="render a version as PlantUML")
+    render.add_argument("version_dir")
+    render.add_argument("--type", choices=MODEL_TYPES, help="model type (detected if omitted)")
+    render.add_argument("-o", "--output")
+    render.set_defaults(func=_render)
+
+    for name, (_, help_text) in DELEGATED.items():
+        commands.add_parser(name, help=help_text, add_help=False)  # listed in --help, dispatched in main()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    paths, argv = runtime_parser().parse_known_args(argv)
+    if any(vars(paths).values()):
+        from utils.runtime import configure
+
+        configure(**vars(paths))
+    if argv and argv[0] in DELEGATED:
+        importlib.import_module(DELEGATED[argv[0]][0]).main(argv[1:])
+        return
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+# File: service/modeling_service.py
+"""Long-running modeling service: warm agents and knowledge banks behind a local HTTP job API
+
+Usage: python -m service.modeling_service [--host 127.0.0.1] [--port 8765] [--preload class,sequence]
+
+    POST /jobs        {"type": "class", "params": {"background": "..."}}  -> 202 {"id": ...}
+    GET  /jobs        all jobs without their results
+    GET  /jobs/<id>   status (queued | running | done | failed), result or error
+    GET  /health      job types, warm agent groups and queue length
+
+Workflows, their agents and knowledge banks are built on first use and reused by
+later jobs with the same knowledge configuration. Jobs run one at a time in a
+single worker thread: agentscope keeps global state and agents are not safe to
+share between concurrent runs.
+"""
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import queue
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class JobSpec(NamedTuple):
+    module: str
+    run: str  # entry point accepting an `agents=` keyword
+    init: str  # builds the agent group from the value of `agent_key`
+    agent_key: str = "knowledge_config"
+
+
+JOBS = {
+    "decompose": JobSpec("agents.decomposer", "run_decomposition", "_init_decomposer_agents"),
+    "use_case": JobSpec("workflow.use_case_modeling_workflow", "run_use_case_workflow", "_init_use_case_agents"),
+    "class": JobSpec("workflow.class_modeling_workflow", "run_class_modeling_workflow", "_init_class_agents"),
+    "sequence": JobSpec("workflow.sequence_modeling_workflow", "run_sequence_workflow", "_init_sequence_agents"),
+    "use_case_change": JobSpec(
+        "dynamic_workflow.dynamic_use_case_modeling_workflow", "run_change_workflow", "_init_change_agents"
+    ),
+    "class_change": JobSpec(
+        "dynamic_workflow.dynamic_class_modeling_workflow", "run_class_change_workflow", "_init_class_change_agents"
+    ),
+    "sequence_change": JobSpec(
+        "dynamic_workflow.dynamic_sequence_modeling_workflow", "run_sequence_change_workflow",
+        "_init_sequence_change_agents"
+    ),
+    "srs": JobSpec("agents.document_writer", "run_srs_generation", "_init_srs_agents", "model_config_name"),
+}
+
+
+@dataclass
+class Job:
+    id: str
+    type: str
+    params: Dict[str, Any]
+    status: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if k not in ("params", "result")}
+
+
+class AgentPool:
+    """Agent groups kept warm between jobs, keyed by job module and agent configuration."""
+
+    def __init__(self) -> None:
+        self._groups: Dict[Tuple[str, str, str], list] = {}
+
+    def get(self, key: Tuple[str, str, str], factory: Callable[[], list]) -> list:
+        if key not in self._groups:
+            print(f"[service] Building agents for {key[0]} ({key[2]})")
+            self._groups[key] = factory()
+        agents = self._groups[key]
+        for agent in agents:
+            # Conversation memory from the previous job must not leak into this one
+            if getattr(agent, "memory", None) is not None:
+                agent.memory.clear()
+        return agents
+
+    def keys(self) -> List[str]:
+        return [f"{module}:{value}" for module, _, value in self._groups]
+
+
+class ModelingService:
+    """Job queue with a single worker that runs workflows on warm agents."""
+
+    def __init__(self) -> None:
+        self.jobs: Dict[str, Job] = {}
+        self.pool = AgentPool()
+        self._queue: "queue.Queue[Job]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._work, name="modeling-worker", daemon=True)
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def submit(self, job_type: str, params: Dict[str, Any]) -> Job:
+        if job_type not in JOBS:
+            raise ValueError(f"unknown job type '{job_type}', expected one of {sorted(JOBS)}")
+        with self._lock:
+            job = Job(f"job-{next(self._ids)}", job_type, params)
+            self.jobs[job.id] = job
+        self._queue.put(job)
+        return job
+
+    def _agents_for(self, spec: JobSpec, run: Callable, params: Dict[str, Any]) -> list:
+        module = importlib.import_module(spec.module)
+        value = params.get(spec.agent_key, inspect.signature(run).parameters[spec.agent_key].default)
+        return self.pool.get((spec.module, spec.init, value), lambda: getattr(module, spec.init)(value))
+
+    def run(self, job: Job) -> Any:
+        spec = JOBS[job.type]
+        run = getattr(importlib.import_module(spec.module), spec.run)
+        return run(agents=self._agents_for(spec, run, job.params), **job.params)
+
+    def preload(self, job_types: List[str]) -> None:
+        for job_type in job_types:
+            spec = JOBS[job_type]
+            self._agents_for(spec, getattr(importlib.import_module(spec.module), spec.run), {})
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            job.status, job.started = "running", time.time()
+            try:
+                job.result = self.run(job)
+                job.status = "done"
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = "failed"
+                traceback.print_exc()
+            job.finished = time.time()
+            print(f"[service] {job.id} ({job.type}) {job.status} in {job.finished - job.started:.1f}s")
+
+    def health(self) -> Dict[str, Any]:
+        return {"job_types": sorted(JOBS), "warm_agents": self.pool.keys(), "queued": self._queue.qsize()}
+
+
+def _handler(service: ModelingService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Any) -> None:
+            data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            path = self.path.rstrip("/")
+            if path == "/health":
+                self._send(200, service.health())
+            elif path == "/jobs":
+                self._send(200, [job.summary() for job in list(service.jobs.values())])
+            elif path.startswith("/jobs/") and (job := service.jobs.get(path[len("/jobs/"):])):
+                self._send(200, asdict(job))
+            else:
+                self._send(404, {"error": f"not found: {self.path}"})
+
+        def do_POST(self) -> None:
+            if self.path.rstrip("/") != "/jobs":
+                self._send(404, {"error": f"not found: {self.path}"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                job = service.submit(body.get("type", ""), body.get("params", {}))
+            except (ValueError, AttributeError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            self._send(202, {"id": job.id, "status": job.status})
+
+    return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local modeling service with warm agents")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--preload", default="", help="comma-separated job types whose agents are built at startup")
+    args = parser.parse_args(argv)
+
+    service = ModelingService()
+    service.preload([job_type for job_type in args.preload.split(",") if job_type])
+    service.start()
+    server = ThreadingHTTPServer((args.host, args.port), _handler(service))
+    print(f"[service] Listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
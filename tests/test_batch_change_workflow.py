@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import wait
+
+import pytest
+
+from dynamic_workflow import batch_change_workflow as batch
+from utils.render_pool import RenderQueue
+
+
+def test_pipelined_batch_stops_after_a_failed_save(monkeypatch, tmp_path):
+    applied, queues = [], []
+    release_save = threading.Event()
+
+    def apply_change(agents, model, change_request, checkpoint):
+        applied.append(change_request)
+        if queues[0].futures:
+            # the first save fails only now, after the loop has already checked it once
+            release_save.set()
+            wait(queues[0].futures[:1])
+        return {"requests": applied[:]}, None
+
+    def save_version(**kwargs):
+        release_save.wait()
+        raise OSError("disk full")
+
+    def render_queue(processes):
+        queues.append(RenderQueue(processes=False))
+        return queues[-1]
+
+    workflow = batch.ChangeWorkflow("test_change", "", None, lambda base: None, None, apply_change, save_version)
+    monkeypatch.setitem(batch.WORKFLOWS, "test", workflow)
+    monkeypatch.setattr(batch, "RenderQueue", render_queue)
+
+    with pytest.raises(OSError, match="disk full"):
+        batch.run_change_batch("test", [f"change {i}" for i in range(5)], model_base=str(tmp_path),
+                               resume=False, agents=[object()], pipelined=True)
+
+    assert applied == ["change 0", "change 1"]
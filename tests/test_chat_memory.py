@@ -0,0 +1,86 @@
+from concurrent.futures import Future
+
+from utils.chat_memory import SlidingWindow, SummarizingMemory
+
+
+class ImmediateExecutor:
+    """Runs each job at submit time and hands back the already completed future."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append(args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class Summarizer:
+    def __init__(self, failures=0):
+        self.failures = failures
+
+    def __call__(self, summary, messages):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("model unavailable")
+        return " ".join(filter(None, [summary, *messages]))
+
+
+def _memory(summarize, executor=None):
+    memory = SummarizingMemory(summarize, window=SlidingWindow(2), min_batch=2)
+    memory._executor = executor or ImmediateExecutor()
+    return memory
+
+
+def test_evicted_messages_are_summarized_in_the_background():
+    memory = _memory(Summarizer())
+    messages = ["m1", "m2", "m3", "m4"]
+
+    assert memory.select(messages) == ["m3", "m4"]  # the summary is only collected on the next select
+    assert memory._executor.jobs == [("", ["m1", "m2"])]
+
+    prompt = memory.select(messages + ["m5"])
+    assert prompt[0].content.endswith("m1 m2")
+    assert prompt[1:] == ["m4", "m5"]
+
+
+def test_a_running_summary_does_not_block_or_repeat():
+    pending = Future()
+    executor = ImmediateExecutor()
+    executor.submit = lambda fn, *args: executor.jobs.append(args) or pending
+    memory = _memory(Summarizer(), executor)
+
+    assert memory.select(["m1", "m2", "m3", "m4"]) == ["m3", "m4"]
+    assert memory.select(["m1", "m2", "m3", "m4", "m5", "m6"]) == ["m5", "m6"]
+    assert len(executor.jobs) == 1
+
+    pending.set_result("summary of m1 m2")
+    prompt = memory.select(["m1", "m2", "m3", "m4", "m5", "m6"])
+    assert prompt[0].content.endswith("summary of m1 m2")
+    assert executor.jobs[-1] == ("summary of m1 m2", ["m3", "m4"])
+
+
+def test_clearing_the_memory_resets_the_summary():
+    memory = _memory(Summarizer())
+    memory.select(["m1", "m2", "m3", "m4"])
+    memory.select(["m1", "m2", "m3", "m4"])
+    assert memory.summary
+
+    assert memory.select(["n1"]) == ["n1"]
+    assert memory.summary == ""
+
+
+def test_a_failed_summary_is_retried_with_the_same_messages():
+    memory = _memory(Summarizer(failures=1))
+    messages = ["m1", "m2", "m3", "m4"]
+
+    memory.select(messages)
+    assert memory.select(messages) == ["m3", "m4"]  # the failure is collected and the batch resubmitted
+    assert memory.summary == ""
+    assert memory._executor.jobs == [("", ["m1", "m2"])] * 2
+
+    assert memory.select(messages)[0].content.endswith("m1 m2")
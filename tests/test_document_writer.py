@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import agents.document_writer as dw
+
+RULES = {
+    "Purpose": "State what the system is for and who reads the specification.",
+    "Glossary": "One `term: definition` per line for every domain noun.",
+}
+
+
+class KeywordKnowledge:
+    """Returns the rules whose section name occurs in the query."""
+
+    def retrieve(self, query, similarity_top_k=None):
+        return [
+            SimpleNamespace(text=rule, node=SimpleNamespace(metadata={"section": section}))
+            for section, rule in RULES.items() if section in query
+        ]
+
+
+def _writer():
+    writer = object.__new__(dw.DocumentWriter)
+    writer.name, writer.sys_prompt, writer.model = "DocumentWriter", "", None
+    writer.knowledge_list, writer.similarity_top_k = [KeywordKnowledge()], 3
+    return writer
+
+
+def test_each_section_gets_its_own_retrieved_context(monkeypatch):
+    prompts = {}
+
+    def fake_call_model(model, prompt):
+        title = prompt.split("Write only the section '")[1].split("'")[0]
+        prompts[title] = prompt
+        return SimpleNamespace(text="```RESULT\ncontent\n```")
+
+    monkeypatch.setattr(dw, "call_model", fake_call_model)
+    writer = _writer()
+    purpose, glossary = dw.SRS_SECTIONS[0], dw.SRS_SECTIONS[1]
+    writer._generate_section("FR-001 users log in", purpose)
+    writer._generate_section("FR-001 users log in", glossary)
+
+    assert RULES["Purpose"] in prompts[purpose.key] and RULES["Glossary"] not in prompts[purpose.key]
+    assert RULES["Glossary"] in prompts[glossary.key] and RULES["Purpose"] not in prompts[glossary.key]
+
+
+def test_srs_writer_is_equipped_with_the_srs_rules(monkeypatch):
+    import agentscope.rag
+
+    equipped = []
+
+    class RecordingKnowledgeBank:
+        def __init__(self, configs):
+            self.ids = [config["knowledge_id"] for config in configs]
+
+        def equip(self, agent, knowledge_ids):
+            assert set(knowledge_ids) <= set(self.ids)
+            equipped.append((agent, list(knowledge_ids)))
+
+    built = []
+    monkeypatch.setattr(agentscope.rag, "KnowledgeBank", RecordingKnowledgeBank)
+    monkeypatch.setattr("utils.agent_factory.build_agents",
+                        lambda configs: built.extend(configs) or [_writer() for _ in configs])
+
+    agents = dw._init_srs_agents("test_model")
+
+    assert [config["class"] for config in built] == ["DocumentWriter"]
+    assert built[0]["args"]["model_config_name"] == "test_model"
+    assert equipped == [(agents[0], ["srs_rules"])]
@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.adaptive_limiter import configure_limiters, get_limiter
+from utils.model_call import call_model
+from utils.resilience import ModelCallTimeout, get_breaker, register_policy
+
+
+class SlowModel:
+    def __init__(self, config_name: str, latency: float) -> None:
+        self.config_name = config_name
+        self.latency = latency
+        self.prompts = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, **kwargs):
+        with self._lock:
+            self.prompts[prompt] += 1
+        time.sleep(self.latency)
+        return f"answer to {prompt}"
+
+
+def test_queue_wait_does_not_time_out_calls():
+    # one slot, six callers: the last one queues ~1s, far beyond the 0.5s call timeout
+    model = SlowModel("test-saturated", latency=0.2)
+    configure_limiters({model.config_name: {"initial_limit": 1, "max_limit": 1}})
+    register_policy(model.config_name, {"timeout": 0.5, "max_retries": 2, "backoff_base": 0.01})
+
+    prompts = [f"prompt-{i}" for i in range(6)]
+    with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+        results = list(pool.map(lambda prompt: call_model(model, prompt), prompts))
+
+    assert results == [f"answer to {prompt}" for prompt in prompts]
+    assert model.prompts == Counter(prompts)  # every request submitted exactly once
+    assert get_breaker(model.config_name).state == "closed"
+    assert get_limiter(model.config_name).metrics()["overload_errors"] == 0
+
+
+def test_real_timeout_is_reported_as_overload():
+    model = SlowModel("test-timeout", latency=0.3)
+    configure_limiters({model.config_name: {"initial_limit": 4, "cooldown": 0}})
+    register_policy(model.config_name, {"timeout": 0.05, "max_retries": 0})
+
+    with pytest.raises(ModelCallTimeout):
+        call_model(model, "prompt")
+
+    limiter = get_limiter(model.config_name)
+    assert limiter.metrics()["overload_errors"] == 1
+    assert limiter.limit == 2
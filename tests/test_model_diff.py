@@ -0,0 +1,41 @@
+from utils.model_diff import Snapshot, diff_snapshots
+
+
+def _class_model(classes, relations):
+    return Snapshot("class", {"classes": classes, "attributes": [], "methods": [], "relations": relations})
+
+
+def test_split_class_is_not_a_rename():
+    old = _class_model(["Order", "Payment"], ["Order --association--> Payment"])
+    new = _class_model(
+        ["Order", "CashPayment", "OnlinePayment"],
+        ["Order --association--> CashPayment", "Order --association--> OnlinePayment"],
+    )
+
+    diff = diff_snapshots(old, new)
+
+    assert diff.kinds["classes"].renamed == []
+    assert diff.kinds["classes"].deleted == ["Payment"]
+    assert sorted(diff.kinds["classes"].added) == ["CashPayment", "OnlinePayment"]
+    # relations are not rewritten to one of the new classes
+    assert diff.kinds["relations"].deleted == ["Order --association--> Payment"]
+    assert len(diff.kinds["relations"].added) == 2
+
+
+def test_tied_rename_candidates_give_the_same_result_in_any_order():
+    old = _class_model(["Payment"], [])
+    results = set()
+    for added in (["CashPayment", "OnlinePayment"], ["OnlinePayment", "CashPayment"]):
+        diff = diff_snapshots(old, _class_model(added, []))
+        results.add((tuple(diff.kinds["classes"].renamed), tuple(diff.kinds["classes"].deleted)))
+    assert results == {((), ("Payment",))}
+
+
+def test_unambiguous_rename_rewrites_relations():
+    old = _class_model(["Order", "Payment"], ["Order --association--> Payment"])
+    new = _class_model(["Order", "OrderPayment"], ["Order --association--> OrderPayment"])
+
+    diff = diff_snapshots(old, new)
+
+    assert diff.kinds["classes"].renamed == [("Payment", "OrderPayment")]
+    assert not diff.kinds["relations"]
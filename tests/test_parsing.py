@@ -0,0 +1,79 @@
+from utils.parsing import (
+    Message,
+    Relation,
+    parse_message,
+    parse_relation,
+    result_block,
+    result_blocks,
+    result_lines,
+    strip_list_marker,
+)
+
+
+def test_result_block_takes_the_first_fenced_result():
+    content = "thinking...\n```RESULT\nOrder\nCustomer\n```\nmore\n```RESULT\nInvoice\n```"
+
+    assert result_block(content) == "Order\nCustomer"
+    assert result_blocks(content) == ["Order\nCustomer", "Invoice"]
+
+
+def test_result_block_ignores_other_fences_and_unclosed_blocks():
+    assert result_block("```json\n{\"classes\": []}\n```") is None
+    assert result_block("```RESULT\nOrder\n") is None
+    assert result_blocks("no block here") == []
+    assert result_lines("```RESULT\nOrder\n```") == ["Order"]
+
+
+def test_result_lines_drop_blank_lines_and_padding():
+    assert result_lines("```RESULT\n  Order  \n\n   \nCustomer\n```") == ["Order", "Customer"]
+    assert result_lines("plain answer") == []
+
+
+def test_strip_list_marker():
+    assert strip_list_marker("- Order") == "Order"
+    assert strip_list_marker("  * Order ") == "Order"
+    assert strip_list_marker("• Order") == "Order"
+    assert strip_list_marker("1. Order") == "Order"
+    assert strip_list_marker("12) Order") == "Order"
+    assert strip_list_marker("3、订单") == "订单"
+
+
+def test_strip_list_marker_keeps_text_that_only_looks_like_a_marker():
+    assert strip_list_marker("2FA login") == "2FA login"
+    assert strip_list_marker("-> Order") == "-> Order"
+    assert strip_list_marker("Order - Customer") == "Order - Customer"
+    assert strip_list_marker("") == ""
+
+
+def test_parse_relation_forms():
+    expected = Relation("Customer", "association", "Order")
+
+    assert parse_relation("Customer --association--> Order") == expected
+    assert parse_relation("- Customer -- Association --> Order") == expected
+    assert parse_relation("Customer <:association> Order") == expected
+    assert parse_relation("Customer :association> Order") == expected
+    assert parse_relation("Customer -> Order  type:association") == expected
+    assert parse_relation("Customer -> Order") == expected
+    assert parse_relation("VIP Customer extends Customer") == Relation("VIP Customer", "extend", "Customer")
+    assert parse_relation("Order depends on Payment") == Relation("Order", "depend", "Payment")
+
+
+def test_parse_relation_rejects_malformed_lines():
+    assert parse_relation("") is None
+    assert parse_relation("Customer Order") is None
+    assert parse_relation("--association--> Order") is None
+    assert parse_relation("Customer --association-->") is None
+
+
+def test_parse_message_forms():
+    assert parse_message("User->System: login(name, password)") == Message("User", "System", "login(name, password)")
+    assert parse_message("1. System-->User: token") == Message("System", "User", "token", reply=True)
+    assert parse_message("User → System：login") == Message("User", "System", "login")
+    assert parse_message("User -> System") == Message("User", "System", "")
+    assert str(parse_message("System --> User : ok")) == "System-->User: ok"
+
+
+def test_parse_message_rejects_malformed_lines():
+    assert parse_message("User: login") is None
+    assert parse_message("-> System: login") is None
+    assert parse_message("User ->: login") is None
@@ -0,0 +1,111 @@
+import pytest
+
+from utils.checkpoint import WorkflowCheckpoint
+from utils.pipeline import AgentSpec, PipelineRun, PipelineSpec, StepSpec, init_pipeline_agents
+from utils.workflow_hub import TopicHub
+
+
+def _spec():
+    return PipelineSpec(
+        name="test",
+        agent_configs="",
+        knowledge_config="",
+        inputs={"value": None},
+        steps=[
+            StepSpec("text", inputs=["value"], function="builtins:str"),
+            StepSpec("length", inputs=["text"], function="builtins:len"),
+            StepSpec("saved", inputs=["length"], function="builtins:repr"),
+        ],
+    )
+
+
+def test_only_the_steps_for_the_targets_run():
+    values = PipelineRun(_spec()).run({"value": 1234}, targets=["length"])
+
+    assert values["length"] == 4
+    assert "saved" not in values
+
+
+def test_an_input_replaces_the_step_that_produces_it():
+    spec = _spec()
+    assert [step.name for step in spec.steps_for(["saved"], ["value", "text"])] == ["length", "saved"]
+
+    values = PipelineRun(spec).run({"value": None, "text": "abcdef"})
+
+    assert values["saved"] == "6"
+
+
+def test_a_checkpointed_output_must_match_the_step_schema(tmp_path):
+    class ClassIdentifier:
+        replies = [["  "], ["Order"], ["Invoice"]]
+
+        def identify_classes(self, background):
+            return self.replies.pop(0)
+
+    spec = PipelineSpec(
+        name="test",
+        agent_configs="",
+        knowledge_config="",
+        inputs={"background": None},
+        steps=[StepSpec("classes", inputs=["background"], agent=0, method="identify_classes", schema="classes")],
+    )
+
+    def run():
+        checkpoint = WorkflowCheckpoint("test", "background", base_dir=str(tmp_path))
+        return PipelineRun(spec, agents=[ClassIdentifier()], checkpoint=checkpoint).run({"background": "shop"})
+
+    assert run()["classes"] == ["  "]  # invalid, so not stored
+    assert run()["classes"] == ["Order"]
+    assert run()["classes"] == ["Order"]  # resumed
+    assert ClassIdentifier.replies == [["Invoice"]]
+
+
+class Memory(list):
+    def add(self, msg):
+        self.append(msg)
+
+
+class Identifier:
+    def __init__(self, name):
+        self.name = name
+        self.memory = Memory()
+
+    def observe(self, msg):
+        if self.memory is not None:  # agentscope drops observed messages without a memory
+            self.memory.add(msg)
+
+    def identify(self, text):
+        return [text]
+
+
+def _subscription_spec(reader_stateless=False):
+    return PipelineSpec(
+        name="test",
+        agent_configs="",
+        knowledge_config="",
+        agents=[AgentSpec(stateless=True), AgentSpec(stateless=reader_stateless)],
+        inputs={"text": None},
+        steps=[StepSpec("words", inputs=["text"], agent=0, method="identify")],
+        subscriptions={"words": [1]},
+    )
+
+
+def test_a_subscribed_agent_keeps_its_memory_and_receives_the_message(monkeypatch):
+    import agentscope.rag
+
+    spec = _subscription_spec()
+    spec.check()
+    monkeypatch.setattr(agentscope.rag, "KnowledgeBank", lambda configs: None)
+    monkeypatch.setattr("utils.agent_factory.build_agents",
+                        lambda configs, model_configs=None: [Identifier("Writer"), Identifier("Reader")])
+    writer, reader = init_pipeline_agents(spec, "uc_knowledge.json")
+
+    PipelineRun(spec, [writer, reader], hub=TopicHub([writer, reader], spec.subscriptions)).run({"text": "login"})
+
+    assert writer.memory is None
+    assert [msg.content for msg in reader.memory] == ['["login"]']
+
+
+def test_a_stateless_agent_cannot_subscribe():
+    with pytest.raises(ValueError, match="stateless"):
+        _subscription_spec(reader_stateless=True).check()
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from utils.checkpoint import WorkflowCheckpoint
+from utils.runtime import RuntimeConfig
+
+
+def test_config_names_are_not_shadowed_by_files_in_the_working_directory(monkeypatch, tmp_path):
+    (tmp_path / "uc_knowledge.json").write_text("[]", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    runtime = RuntimeConfig(config_dir=tmp_path / "configs")
+
+    assert runtime.config_path("uc_knowledge.json") == str(tmp_path / "configs" / "uc_knowledge.json")
+    assert Path(runtime.config_path("./uc_knowledge.json")).resolve() == tmp_path / "uc_knowledge.json"
+    assert runtime.config_path(str(tmp_path / "uc_knowledge.json")) == str(tmp_path / "uc_knowledge.json")
+
+
+def test_checkpoints_default_to_the_runtime_checkpoint_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr("utils.checkpoint.get_runtime", lambda: RuntimeConfig(checkpoint_dir=tmp_path))
+    monkeypatch.chdir(Path(__file__).parent)
+
+    checkpoint = WorkflowCheckpoint("class", "background")
+    checkpoint.step("classes", lambda: ["Order"])
+
+    assert checkpoint.run_dir.parent == tmp_path / "class"
+    assert len(list(checkpoint.run_dir.glob("classes-*.json"))) == 1
+
+
+def test_a_resumed_step_with_several_outputs_returns_a_tuple(tmp_path):
+    checkpoint = WorkflowCheckpoint("class", "background", base_dir=str(tmp_path))
+    checkpoint.step("split", lambda: (["Order"], {"Order": ["id"]}))
+
+    assert checkpoint.step("split", lambda: None) == (["Order"], {"Order": ["id"]})
@@ -0,0 +1,77 @@
+import pytest
+
+from utils.parsing import Message
+from utils.sequence_flow import Block, FlowError, build_flow, read_flow_md, serialize_flow, to_plantuml
+
+FLOW = [
+    "User->System: login(name, password)",
+    "alt valid password",
+    "  System-->User: token",
+    "else locked",
+    "  loop three times",
+    "    System->Mailer: notify",
+    "  end",
+    "end",
+]
+
+
+def test_blocks_nest_with_their_branches():
+    flow = build_flow(FLOW)
+
+    assert flow.errors == []
+    assert flow.steps[0] == Message("User", "System", "login(name, password)")
+    alt = flow.steps[1]
+    assert isinstance(alt, Block) and alt.keyword == "alt"
+    assert [branch.condition for branch in alt.branches] == ["valid password", "locked"]
+    assert alt.branches[1].steps[0].keyword == "loop"
+
+
+def test_an_inline_message_joins_the_opening_branch():
+    flow = build_flow(["opt cart not empty | User->System: checkout", "end"])
+
+    assert flow.steps[0].branches[0].steps == [Message("User", "System", "checkout")]
+
+
+@pytest.mark.parametrize("lines, error", [
+    (["alt ok", "User->System: pay"], "line 1: 'alt' block is never closed"),
+    (["loop items", "alt ok", "end"], "line 1: 'loop' block is never closed"),
+    (["User->System: pay", "end"], "line 2: extra end tag"),
+    (["loop items", "else", "end"], "line 2: 'else' outside an alt/par block"),
+    (["User System pay"], "line 1: not a message or control tag"),
+])
+def test_unbalanced_or_misplaced_tags_are_rejected(lines, error):
+    with pytest.raises(FlowError, match=error):
+        build_flow(lines)
+
+    assert any(e.startswith(error) for e in build_flow(lines, strict=False).errors)
+
+
+def test_lenient_build_closes_open_blocks_and_skips_stray_tags():
+    flow = build_flow(["end", "alt ok", "User->System: pay"], strict=False)
+
+    assert serialize_flow(flow) == ["alt ok", "  User->System: pay", "end"]
+
+
+def test_flow_md_round_trip():
+    text = "# Flow\n\n```sequence\n" + "\n".join(FLOW) + "\n\n```\nnotes\n"
+    lines = read_flow_md(text)
+
+    assert serialize_flow(build_flow(lines)) == FLOW
+    assert read_flow_md("\n".join(["```sequence"] + serialize_flow(build_flow(lines)) + ["```"])) == FLOW
+    assert read_flow_md("no sequence block") == []
+
+
+def test_to_plantuml_renders_replies_and_aliases():
+    flow = build_flow(FLOW)
+
+    assert to_plantuml(flow, alias=lambda name: name.upper()) == [
+        "USER -> SYSTEM : login(name, password)",
+        "alt valid password",
+        "  SYSTEM --> USER : token",
+        "else locked",
+        "  loop three times",
+        "    SYSTEM -> MAILER : notify",
+        "  end",
+        "end",
+    ]
+    assert to_plantuml(build_flow(["User->System"])) == ["User -> System"]
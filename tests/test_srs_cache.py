@@ -0,0 +1,57 @@
+from utils.model_diff import Snapshot
+from utils.srs_cache import SectionCache, render_inputs, srs_inputs, subsystem_inputs
+
+SECTIONS = {"overview": ["requirements"], "data_model": ["classes", "relations"]}
+SUBSYSTEMS = ["Order", "Invoice"]
+
+
+def _snapshot(payment_class):
+    return Snapshot("class", {
+        "classes": ["Order", "OrderLine", "Invoice", payment_class],
+        "relations": ["Order --composition--> OrderLine", f"Invoice --association--> {payment_class}"],
+    })
+
+
+def _write_srs(cache_path, snapshot):
+    """The section loop of the document writer with a stub model call."""
+    generated = []
+
+    def generate(section_id, section_input):
+        generated.append(section_id)
+        return f"{section_id}: {section_input}"
+
+    cache = SectionCache(cache_path)
+    inputs = srs_inputs([{"id": "R1", "requirement": "Customers order products"}], [snapshot])
+    document = {}
+    for key, depends in SECTIONS.items():
+        section_input = render_inputs(inputs, depends)
+        document[key] = cache.get_or_generate(key, section_input, lambda: generate(key, section_input))
+    for subsystem in SUBSYSTEMS:
+        key, section_input = f"subsystem:{subsystem}", render_inputs(subsystem_inputs(inputs, subsystem))
+        document[key] = cache.get_or_generate(key, section_input, lambda: generate(key, section_input))
+    cache.save(keep=document)
+    return document, generated
+
+
+def test_a_second_run_regenerates_only_the_sections_that_read_the_changed_class(tmp_path):
+    cache_path = tmp_path / "srs.sections.json"
+    first, generated = _write_srs(cache_path, _snapshot("Payment"))
+    assert generated == ["overview", "data_model", "subsystem:Order", "subsystem:Invoice"]
+    assert "Payment" not in first["subsystem:Order"]
+
+    second, generated = _write_srs(cache_path, _snapshot("CardPayment"))
+
+    assert generated == ["data_model", "subsystem:Invoice"]
+    assert second["overview"] == first["overview"]
+    assert second["subsystem:Order"] == first["subsystem:Order"]
+    assert "CardPayment" in second["subsystem:Invoice"]
+
+
+def test_an_unchanged_model_reuses_every_section(tmp_path):
+    cache_path = tmp_path / "srs.sections.json"
+    first, _ = _write_srs(cache_path, _snapshot("Payment"))
+
+    second, generated = _write_srs(cache_path, _snapshot("Payment"))
+
+    assert generated == []
+    assert second == first
@@ -0,0 +1,30 @@
+from utils.workflow_hub import TopicHub
+
+
+class Observer:
+    def __init__(self):
+        self.seen = []
+
+    def observe(self, msg):
+        self.seen.append(msg)
+
+
+def test_messages_for_topics_without_subscribers_are_not_built():
+    built = []
+    hub = TopicHub([Observer()], {})
+
+    hub.publish("classes", lambda: built.append("classes"))
+
+    assert built == []
+    assert hub.published["classes"] == 1
+
+
+def test_subscribers_receive_only_their_topics():
+    reader, other = Observer(), Observer()
+    hub = TopicHub([reader, other], {"classes": [0]})
+
+    hub.publish("classes", lambda: "built message")
+    hub.publish("attributes", "plain message")
+
+    assert reader.seen == ["built message"]
+    assert other.seen == []
@@ -0,0 +1,181 @@
+# File: utils/adaptive_limiter.py
+"""Process-wide adaptive (AIMD) concurrency limiting for model backends"""
+import threading
+import time
+from typing import Dict, Optional
+
+_OVERLOAD_MARKERS = ("timeout", "timed out", "connection", "429", "503", "overload", "too many requests", "busy")
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Errors that signal a saturated backend (queue full, refused or timed-out connections)."""
+    text = f"{type(error).__name__} {error}".lower()
+    return isinstance(error, TimeoutError) or any(marker in text for marker in _OVERLOAD_MARKERS)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    Every successful call that finishes within `latency_tolerance` times the
+    smoothed latency grows the limit by about one slot per window of calls.
+    Slow calls shrink it by `decrease_factor`, overload errors by
+    `overload_factor`; a decrease is applied at most once per `cooldown` seconds
+    so a burst of slow responses from one saturated moment only counts once.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            initial_limit: int = 2,
+            min_limit: int = 1,
+            max_limit: int = 16,
+            latency_tolerance: float = 2.0,
+            latency_target: Optional[float] = None,
+            decrease_factor: float = 0.8,
+            overload_factor: float = 0.5,
+            cooldown: float = 5.0,
+            smoothing: float = 0.2,
+    ) -> None:
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.overload_factor = overload_factor
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._waiting = 0
+        self._latency_ewma: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._stats = {
+            "calls": 0,
+            "errors": 0,
+            "overload_errors": 0,
+            "increases": 0,
+            "decreases": 0,
+            "total_latency": 0.0,
+            "total_wait": 0.0,
+            "max_wait": 0.0,
+        }
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> float:
+        """Block until a slot is free and return the time spent queueing."""
+        start = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._waiting -= 1
+            self._in_flight += 1
+            wait = time.monotonic() - start
+            self._stats["total_wait"] += wait
+            self._stats["max_wait"] = max(self._stats["max_wait"], wait)
+        return wait
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now (used for optional work such as hedging)."""
+        with self._cond:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, latency: float, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._stats["calls"] += 1
+            if error is not None:
+                self._stats["errors"] += 1
+                if is_overload_error(error):
+                    self._stats["overload_errors"] += 1
+                    self._decrease(self.overload_factor)
+            else:
+                self._stats["total_latency"] += latency
+                if self._is_slow(latency):
+                    self._decrease(self.decrease_factor)
+                else:
+                    self._increase()
+                self._latency_ewma = latency if self._latency_ewma is None else (
+                    self.smoothing * latency + (1 - self.smoothing) * self._latency_ewma
+                )
+            self._cond.notify_all()
+
+    def record_overload(self) -> None:
+        """Count a request the caller gave up on (e.g. timed out) as overload while it still runs."""
+        with self._cond:
+            self._stats["overload_errors"] += 1
+            self._decrease(self.overload_factor)
+
+    def _is_slow(self, latency: float) -> bool:
+        if self.latency_target is not None:
+            return latency > self.latency_target
+        return self._latency_ewma is not None and latency > self._latency_ewma * self.latency_tolerance
+
+    def _increase(self) -> None:
+        if self._limit < self.max_limit:
+            previous = self.limit
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            if self.limit > previous:
+                self._stats["increases"] += 1
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        self._stats["decreases"] += 1
+
+    def metrics(self) -> Dict:
+        with self._cond:
+            calls = self._stats["calls"]
+            successes = calls - self._stats["errors"]
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "latency_ewma": self._latency_ewma,
+                "avg_latency": self._stats["total_latency"] / successes if successes else None,
+                "avg_wait": self._stats["total_wait"] / calls if calls else None,
+                **{k: v for k, v in self._stats.items() if k not in ("total_latency", "total_wait")},
+            }
+
+
+_registry: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_registry_settings: Dict[str, Dict] = {}
+_registry_lock = threading.Lock()
+
+
+def configure_limiters(settings: Dict[str, Dict]) -> None:
+    """Set limiter options per key ("default" applies to keys without their own entry).
+
+    Must be called before the first call on a key; existing limiters keep their options.
+    """
+    with _registry_lock:
+        _registry_settings.update(settings)
+
+
+def get_limiter(key: str) -> AdaptiveConcurrencyLimiter:
+    """Return the process-wide limiter for a backend key, creating it on first use."""
+    with _registry_lock:
+        if key not in _registry:
+            options = _registry_settings.get(key, _registry_settings.get("default", {}))
+            _registry[key] = AdaptiveConcurrencyLimiter(key, **options)
+        return _registry[key]
+
+
+def limiter_metrics() -> Dict[str, Dict]:
+    """Snapshot of every limiter's state and counters."""
+    with _registry_lock:
+        limiters = list(_registry.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
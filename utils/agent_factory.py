@@ -0,0 +1,45 @@
+# File: utils/agent_factory.py
+"""One agentscope initialization per process; agent groups are built from their agent configs alone
+
+`agentscope.init` resets process-global state (model registry, run directory,
+monitor). Warm agent groups in the service and the batch runners are built while
+other groups are serving calls, so only the first group initializes agentscope
+and every later one just instantiates its agent configs. Model configs from a
+file not seen before are added to the registry without touching the rest.
+"""
+import json
+import threading
+from typing import Dict, List, Optional, Set, Union
+
+from utils.runtime import get_runtime
+
+_lock = threading.Lock()
+_initialized = False
+_config_names: Set[str] = set()
+
+
+def init_agentscope(model_configs: Optional[str] = None) -> None:
+    """Initialize agentscope on first use with the model configs of `model_configs` (default: runtime's)."""
+    global _initialized
+    import agentscope
+    from agentscope.manager import ModelManager
+
+    configs = get_runtime().model_configs(model_configs)
+    with _lock:
+        if not _initialized:
+            agentscope.init(model_configs=configs)
+            _initialized = True
+        elif new_configs := [c for c in configs if c["config_name"] not in _config_names]:
+            ModelManager.get_instance().load_model_configs(new_configs)
+        _config_names.update(c["config_name"] for c in configs)
+
+
+def build_agents(agent_configs: Union[str, List[Dict]], model_configs: Optional[str] = None) -> list:
+    """Instantiate the agents of an agent config file (or its parsed entries) in order."""
+    from agentscope.agents import AgentBase
+
+    init_agentscope(model_configs)
+    if isinstance(agent_configs, str):
+        with open(get_runtime().config_path(agent_configs), 'r', encoding='utf-8') as f:
+            agent_configs = json.load(f)
+    return [AgentBase.get_agent_class(config["class"])(**config["args"]) for config in agent_configs]
@@ -0,0 +1,109 @@
+# File: utils/chat_memory.py
+"""Prompt memory policies for chat agents: sliding window, token budget and rolling summaries
+
+A policy picks the part of a growing conversation that goes into the next prompt, so
+the prompt stays the same size however long the session runs. `SummarizingMemory`
+folds the turns that fall out of its window into a running summary, written on a
+background thread so a reply never waits for it.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from agentscope.message import Msg
+
+
+def message_text(message: Any) -> str:
+    content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", message)
+    return "" if content is None else str(content)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: about four ASCII characters per token, one per other character (e.g. CJK)."""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+class MemoryPolicy:
+    """Keeps every message; subclasses bound what goes into the prompt."""
+
+    def select(self, messages: Sequence[Any]) -> List[Any]:
+        return list(messages)
+
+
+class SlidingWindow(MemoryPolicy):
+    def __init__(self, max_messages: int = 20) -> None:
+        self.max_messages = max_messages
+
+    def select(self, messages: Sequence[Any]) -> List[Any]:
+        return list(messages[-self.max_messages:]) if self.max_messages > 0 else []
+
+
+class TokenBudget(MemoryPolicy):
+    """The most recent messages that fit in `max_tokens`; the latest message is always kept."""
+
+    def __init__(self, max_tokens: int = 3000, count_tokens: Callable[[str], int] = estimate_tokens) -> None:
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+
+    def select(self, messages: Sequence[Any]) -> List[Any]:
+        kept, used = [], 0
+        for message in reversed(messages):
+            used += self.count_tokens(message_text(message))
+            if kept and used > self.max_tokens:
+                break
+            kept.append(message)
+        return kept[::-1]
+
+
+class SummarizingMemory(MemoryPolicy):
+    """Recent messages selected by `window`, preceded by a rolling summary of the older ones.
+
+    Once at least `min_batch` messages have dropped out of the window, they are
+    summarized together with the previous summary on a background thread. Until
+    that finishes the prompt uses the previous summary, so a slow summary only
+    delays how soon the oldest turns are reflected, never the reply itself.
+    """
+
+    def __init__(
+            self,
+            summarize: Callable[[str, List[Any]], str],
+            window: Optional[MemoryPolicy] = None,
+            min_batch: int = 4,
+    ) -> None:
+        self.summarize = summarize
+        self.window = window or TokenBudget()
+        self.min_batch = min_batch
+        self.summary = ""
+        self._covered = 0  # leading messages already folded into the summary
+        self._pending: Optional[Tuple[int, Future]] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summary")
+
+    def select(self, messages: Sequence[Any]) -> List[Any]:
+        self._collect()
+        if self._covered > len(messages):  # the memory was cleared
+            self.reset()
+        recent = list(messages[self._covered:])
+        kept = self.window.select(recent)
+        evicted = len(recent) - len(kept)
+        if evicted >= self.min_batch and self._pending is None:
+            future = self._executor.submit(self.summarize, self.summary, recent[:evicted])
+            self._pending = (self._covered + evicted, future)
+
+        if not self.summary:
+            return kept
+        return [Msg("system", f"Summary of the earlier conversation:\n{self.summary}", role="system")] + kept
+
+    def _collect(self) -> None:
+        if self._pending is None or not self._pending[1].done():
+            return
+        covered, future = self._pending
+        self._pending = None
+        try:
+            self.summary = future.result()
+            self._covered = covered
+        except Exception as e:
+            logger.warning(f"Conversation summary failed ({e}); older turns stay out of the prompt")
+
+    def reset(self) -> None:
+        self.summary, self._covered, self._pending = "", 0, None
@@ -0,0 +1,92 @@
+# File: utils/checkpoint.py
+"""Step-level checkpoints so interrupted workflows resume from the last completed step"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from utils.runtime import get_runtime
+
+
+def input_hash(*values: Any) -> str:
+    """Stable hash of JSON-serializable inputs."""
+    payload = json.dumps(values, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def is_empty_output(output: Any) -> bool:
+    """None, blank text and empty containers (or tuples of them) as left by a failed parse."""
+    if output is None:
+        return True
+    if isinstance(output, str):
+        return not output.strip()
+    if isinstance(output, tuple):
+        return all(is_empty_output(item) for item in output)
+    if isinstance(output, (list, dict, set)):
+        return not output
+    return False
+
+
+class WorkflowCheckpoint:
+    """Stores each step's output under `<base_dir>/<workflow>/<run hash>/<step>-<input hash>.json`.
+
+    `base_dir` defaults to the runtime's checkpoint directory.
+
+    The run hash covers the workflow inputs, the step hash covers the step's own
+    arguments, so changing an upstream result invalidates every later step.
+    """
+
+    def __init__(
+            self, workflow: str, *run_inputs: Any, base_dir: Optional[str] = None, enabled: bool = True
+    ) -> None:
+        self.enabled = enabled
+        self.run_dir = Path(base_dir or get_runtime().checkpoint_dir) / workflow / input_hash(*run_inputs)
+
+    def step(
+            self,
+            name: str,
+            fn: Callable,
+            *args: Any,
+            validate: Optional[Callable[[Any], bool]] = None,
+            **kwargs: Any
+    ) -> Any:
+        """Return the stored output of `name` for these arguments, or run `fn` and store it.
+
+        Empty outputs and outputs rejected by `validate` are returned but not
+        stored, so a resumed run retries the step instead of reusing a bad result.
+        Outputs go through JSON: a tuple result (a step with several outputs) is
+        restored as a tuple, but nested tuples and sets come back as lists.
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        def _usable(output: Any) -> bool:
+            return not is_empty_output(output) and (validate is None or validate(output))
+
+        path = self.run_dir / f"{name}-{input_hash(args, kwargs)}.json"
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            output = tuple(stored["output"]) if stored.get("tuple") else stored["output"]
+            if _usable(output):
+                print(f"[checkpoint] Resuming step '{name}' from {path}")
+                return output
+            path.unlink()
+
+        output = fn(*args, **kwargs)
+        if not _usable(output):
+            print(f"[checkpoint] Not storing step '{name}': empty or invalid output")
+            return output
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"step": name, "output": output, "tuple": isinstance(output, tuple)}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return output
+
+    def clear(self) -> None:
+        """Drop the checkpoints of this run once its results have been saved."""
+        if self.enabled and self.run_dir.exists():
+            shutil.rmtree(self.run_dir, ignore_errors=True)
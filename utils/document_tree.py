@@ -0,0 +1,168 @@
+# File: utils/document_tree.py
+"""Format-neutral document tree with Markdown, HTML and DOCX renderers
+
+Writers build the tree once through the python-docx style calls they already use
+(add_heading, add_paragraph, add_table). The text formats are cheap to render and
+to diff; python-docx is only imported when a .docx is requested.
+
+Table rows are kept as the iterable the writer passed and are pulled by the
+renderer, so a streamed .docx never holds a whole table in memory. A tree whose
+rows come from a one-shot iterator renders once; `materialize` it first to
+render it several times or to send it to another process.
+"""
+import html
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Union
+
+
+@dataclass
+class Heading:
+    text: str
+    level: int = 1
+
+
+@dataclass
+class Paragraph:
+    text: str
+
+
+@dataclass
+class Table:
+    headers: List[str]
+    rows: Iterable[Sequence[Any]]
+
+    def iter_rows(self) -> Iterator[List[str]]:
+        """Rows as strings, padded or truncated to the header width."""
+        width = len(self.headers)
+        for row in self.rows:
+            cells = [str(value) for value in list(row)[:width]]
+            yield cells + [""] * (width - len(cells))
+
+
+Block = Union[Heading, Paragraph, Table]
+
+
+@dataclass
+class DocumentTree:
+    blocks: List[Block] = field(default_factory=list)
+
+    def add_heading(self, text: str, level: int = 1) -> Heading:
+        block = Heading(str(text), level)
+        self.blocks.append(block)
+        return block
+
+    def add_paragraph(self, text: str = "") -> Paragraph:
+        block = Paragraph(str(text))
+        self.blocks.append(block)
+        return block
+
+    def add_table(self, headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> Table:
+        """The rows are not read here but by the renderer."""
+        block = Table([str(header) for header in headers], rows)
+        self.blocks.append(block)
+        return block
+
+    def materialize(self) -> "DocumentTree":
+        """Read every table's rows into lists, so the tree can be rendered again or pickled."""
+        for block in self.blocks:
+            if isinstance(block, Table) and not isinstance(block.rows, list):
+                block.rows = list(block.iter_rows())
+        return self
+
+
+def _md_cell(text: str) -> str:
+    return text.replace("|", "\\|").replace("\n", "<br>")
+
+
+def render_markdown(tree: DocumentTree) -> str:
+    out = []
+    for block in tree.blocks:
+        if isinstance(block, Heading):
+            out.append(f"{'#' * min(max(block.level, 1), 6)} {block.text}")
+        elif isinstance(block, Paragraph):
+            out.append(block.text.replace("\n", "  \n"))  # hard line breaks
+        else:
+            out.append("| " + " | ".join(_md_cell(h) for h in block.headers) + " |")
+            out.append("|" + " --- |" * len(block.headers))
+            out += ["| " + " | ".join(_md_cell(c) for c in row) + " |" for row in block.iter_rows()]
+        out.append("")
+    return "\n".join(out)
+
+
+def _html_text(text: str) -> str:
+    return html.escape(text).replace("\n", "<br>\n")
+
+
+def render_html(tree: DocumentTree, title: str = "") -> str:
+    out = [
+        "<!DOCTYPE html>",
+        '<html><head><meta charset="utf-8">',
+        f"<title>{html.escape(title)}</title>",
+        "<style>table{border-collapse:collapse}td,th{border:1px solid #999;padding:2px 6px}</style>",
+        "</head><body>",
+    ]
+    for block in tree.blocks:
+        if isinstance(block, Heading):
+            level = min(max(block.level, 1), 6)
+            out.append(f"<h{level}>{_html_text(block.text)}</h{level}>")
+        elif isinstance(block, Paragraph):
+            out.append(f"<p>{_html_text(block.text)}</p>")
+        else:
+            out.append("<table>")
+            out.append("<thead><tr>" + "".join(f"<th>{_html_text(h)}</th>" for h in block.headers) + "</tr></thead>")
+            out.append("<tbody>")
+            out += ["<tr>" + "".join(f"<td>{_html_text(c)}</td>" for c in row) + "</tr>" for row in block.iter_rows()]
+            out.append("</tbody></table>")
+    out.append("</body></html>")
+    return "\n".join(out) + "\n"
+
+
+def write_markdown(tree: DocumentTree, output_path: str, **_options) -> None:
+    Path(output_path).write_text(render_markdown(tree), encoding="utf-8")
+
+
+def write_html(tree: DocumentTree, output_path: str, **_options) -> None:
+    Path(output_path).write_text(render_html(tree, Path(output_path).stem), encoding="utf-8")
+
+
+def write_docx(tree: DocumentTree, output_path: str, streaming: bool = False, **_options) -> None:
+    """Tables go through utils.docx_tables; with `streaming`, their rows are written while saving."""
+    from docx import Document
+    from utils.docx_tables import StreamingTables, add_table
+
+    doc = Document()
+    tables = StreamingTables() if streaming else None
+    for block in tree.blocks:
+        if isinstance(block, Heading):
+            doc.add_heading(block.text, level=block.level)
+        elif isinstance(block, Paragraph):
+            doc.add_paragraph(block.text)
+        elif tables is not None:
+            tables.add_table(doc, block.headers, block.rows)
+        else:
+            add_table(doc, block.headers, block.rows)
+    if tables is not None:
+        tables.save(doc, output_path)
+    else:
+        doc.save(output_path)
+
+
+# Output file suffix -> writer(tree, output_path, **options)
+RENDERERS: Dict[str, Callable[..., None]] = {
+    ".md": write_markdown,
+    ".html": write_html,
+    ".docx": write_docx,
+}
+
+
+def register_renderer(suffix: str, writer: Callable[..., None]) -> None:
+    RENDERERS[suffix.lower()] = writer
+
+
+def save_document(tree: DocumentTree, output_path: str, **options) -> None:
+    """Render the tree in the format given by the output file suffix."""
+    suffix = Path(output_path).suffix.lower()
+    if suffix not in RENDERERS:
+        raise ValueError(f"no renderer for '{suffix}' files, expected one of {sorted(RENDERERS)}")
+    RENDERERS[suffix](tree, str(output_path), **options)
@@ -0,0 +1,60 @@
+# File: utils/map_reduce.py
+"""Requirement-level fan-out and name canonicalization for map-reduce identification"""
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]\s*|\d+[.)、]\s*)+")
+_LEADING_NOISE = re.compile(r"^\s*(?:[-*•]\s*|\d+[.)、]\s*|(?:the|a|an)\s+)+", re.I)
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def group_requirements(records: List[Dict], group_size: int = 1) -> List[List[Dict]]:
+    """Split structured requirements into consecutive groups of `group_size`."""
+    group_size = max(1, group_size)
+    return [records[i:i + group_size] for i in range(0, len(records), group_size)]
+
+
+def fan_out(map_fn: Callable, groups: List, max_workers: int = 4) -> List:
+    """Apply `map_fn` to every group concurrently, keeping group order in the results."""
+    if not groups:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as pool:
+        return list(pool.map(map_fn, groups))
+
+
+def canonical_key(name: str) -> str:
+    """Matching key for a model element name: case, numbering, articles and plural 's' ignored."""
+    words = _NON_WORD.sub(" ", _LEADING_NOISE.sub("", name).lower()).split()
+    if words and len(words[-1]) > 3 and words[-1].endswith("s") and not words[-1].endswith("ss"):
+        words[-1] = words[-1][:-1]
+    return " ".join(words)
+
+
+def reduce_names(mapped: List[Tuple[List[str], List[str]]]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Merge per-group name lists into canonical names with requirement traceability.
+
+    `mapped` holds (requirement ids, identified names) per group. Names sharing a
+    canonical key are merged; the most frequent spelling (first seen on ties)
+    becomes the canonical name. Names are returned in first-seen order.
+    """
+    spellings: Dict[str, Counter] = {}
+    sources: Dict[str, List[str]] = {}
+    for req_ids, names in mapped:
+        for name in names:
+            name = _LIST_MARKER.sub("", name).strip()
+            key = canonical_key(name)
+            if not key:
+                continue
+            spellings.setdefault(key, Counter())[name] += 1
+            trace = sources.setdefault(key, [])
+            trace.extend(rid for rid in req_ids if rid not in trace)
+
+    canonical = []
+    traceability = {}
+    for key, counter in spellings.items():
+        name = counter.most_common(1)[0][0]
+        canonical.append(name)
+        traceability[name] = sources[key]
+    return canonical, traceability
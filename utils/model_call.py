@@ -0,0 +1,119 @@
+# File: utils/model_call.py
+"""Shared model invocation path used by all agents"""
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from utils.adaptive_limiter import AdaptiveConcurrencyLimiter, get_limiter
+from utils.resilience import ModelCallTimeout, ResiliencePolicy, get_breaker, get_policy, register_policy
+
+# Calls run on this pool so a hung request can be abandoned after its timeout.
+_call_pool = ThreadPoolExecutor(max_workers=64, thread_name_prefix="model-call")
+
+
+def limiter_key(model: Any) -> str:
+    """Backends are limited per model config, so agents sharing a config share a limiter."""
+    return getattr(model, "config_name", None) or type(model).__name__
+
+
+def load_model_configs(config_path: str) -> List[Dict]:
+    """Read model_configs.json, register each "resilience" block and return configs for agentscope.init.
+
+    The block is removed from the returned configs because agentscope passes
+    unknown keys on to the model wrapper constructor.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        configs = json.load(f)
+    cleaned = []
+    for config in configs:
+        config = dict(config)
+        if settings := config.pop("resilience", None):
+            register_policy(config["config_name"], settings)
+        cleaned.append(config)
+    return cleaned
+
+
+def call_model(model: Any, prompt: Any, **kwargs) -> Any:
+    """Invoke a model wrapper with retries, timeouts, circuit breaking, hedging and adaptive concurrency."""
+    key = limiter_key(model)
+    policy = get_policy(key)
+    breaker = get_breaker(key)
+    limiter = get_limiter(key)
+
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = _hedged_call(model, prompt, kwargs, policy, limiter)
+        except Exception as error:
+            breaker.record_failure()
+            if attempt >= policy.max_retries or not policy.is_retryable(error):
+                raise
+            delay = policy.backoff(attempt)
+            attempt += 1
+            logger.warning(f"Model call to '{key}' failed ({error}); retry {attempt}/{policy.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+def _submit(limiter: AdaptiveConcurrencyLimiter, model: Any, prompt: Any, kwargs: Dict):
+    """Run one request on the call pool; the caller must already hold a limiter slot."""
+    def _run():
+        start = time.monotonic()
+        try:
+            response = model(prompt, **kwargs)
+        except BaseException as error:
+            limiter.release(time.monotonic() - start, error)
+            raise
+        limiter.release(time.monotonic() - start)
+        return response
+
+    return _call_pool.submit(_run)
+
+
+def _hedged_call(
+        model: Any,
+        prompt: Any,
+        kwargs: Dict,
+        policy: ResiliencePolicy,
+        limiter: AdaptiveConcurrencyLimiter,
+) -> Any:
+    """One logical attempt: the primary request plus hedges launched after `hedge_after` seconds.
+
+    The timeout counts from the moment a limiter slot is granted, so time spent
+    queueing behind other calls never times a request out.
+    """
+    limiter.acquire()
+    deadline = time.monotonic() + policy.timeout if policy.timeout else None
+    pending = {_submit(limiter, model, prompt, kwargs)}
+    hedges = 0
+    last_error = None
+
+    while pending:
+        remaining = deadline - time.monotonic() if deadline else None
+        if remaining is not None and remaining <= 0:
+            break
+        can_hedge = policy.hedge_after is not None and hedges < policy.max_hedges
+        timeout = remaining
+        if can_hedge:
+            timeout = policy.hedge_after if remaining is None else min(policy.hedge_after, remaining)
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            last_error = future.exception()
+        if not done and can_hedge and limiter.try_acquire():
+            hedges += 1
+            pending.add(_submit(limiter, model, prompt, kwargs))
+        elif not done and can_hedge:
+            hedges = policy.max_hedges  # backend saturated: stop trying to hedge this call
+
+    if last_error is not None and not pending:
+        raise last_error
+    limiter.record_overload()  # the abandoned requests keep their slots until they finish
+    raise ModelCallTimeout(f"Model call to '{limiter.name}' exceeded {policy.timeout}s")
@@ -0,0 +1,169 @@
+# File: utils/model_context.py
+"""Change-scoped prompt context: the neighbourhood of model elements a change request reaches
+
+Change agents used to receive the whole element list with every request. Here the
+names the request mentions (directly, or through the elements that best match its
+wording) seed a walk over the model graph, and only the elements incident to those
+names go into the prompt; everything else is carried over unchanged by `merge_scoped`.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils.model_diff import NAME_KINDS, element_names
+from utils.parsing import parse_message
+from utils.sequence_flow import Block, Flow, Step, build_flow, serialize_flow
+
+_SPACES = re.compile(r"\s+")
+_TOKENS = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])|[^\W\d_a-zA-Z]+")
+COMMON_TOKEN_RATIO = 0.5  # tokens found in more elements than this carry no signal
+
+
+def _norm(name: str) -> str:
+    return _SPACES.sub("", name).casefold()
+
+
+def _tokens(text: str) -> Set[str]:
+    return {t.casefold() for t in _TOKENS.findall(text) if len(t) > 1}
+
+
+def _names(kind: str, element: str) -> List[str]:
+    """Names an element refers to; flow lines are read as messages."""
+    if kind == "flow":
+        message = parse_message(element)
+        return [message.source, message.target] if message else []
+    return [name for name in element_names(kind, element) if name.strip()]
+
+
+def _refs(kind: str, element: str) -> List[str]:
+    return [_norm(name) for name in _names(kind, element)]
+
+
+@dataclass
+class ChangeScope:
+    seeds: Set[str] = field(default_factory=set)
+    neighbours: Set[str] = field(default_factory=set)
+
+    def covers(self, kind: str, element: str) -> bool:
+        """Named elements in the neighbourhood, and anything attached to a seed."""
+        refs = _refs(kind, element)
+        if kind in NAME_KINDS:
+            return any(ref in self.seeds or ref in self.neighbours for ref in refs)
+        return any(ref in self.seeds for ref in refs)
+
+    def split(self, kind: str, elements: List[str]) -> Tuple[List[str], List[str]]:
+        """(relevant, untouched); without seeds nothing can be ruled out and all elements are relevant."""
+        if not self.seeds:
+            return list(elements), []
+        relevant, untouched = [], []
+        for element in elements:
+            (relevant if self.covers(kind, element) else untouched).append(element)
+        return relevant, untouched
+
+
+def _retrieve(request_tokens: Set[str], model: Dict[str, List[str]], top_k: int) -> List[Tuple[str, str]]:
+    """Elements sharing the most informative tokens with the request (IDF-weighted overlap)."""
+    documents = [(kind, element, _tokens(element)) for kind, elements in model.items() for element in elements]
+    df = Counter(token for _, _, tokens in documents for token in tokens)
+    limit = max(1, int(len(documents) * COMMON_TOKEN_RATIO))
+    scored = []
+    for kind, element, tokens in documents:
+        shared = [t for t in tokens & request_tokens if df[t] <= limit]
+        if shared:
+            score = sum(math.log((len(documents) + 1) / df[t]) for t in shared)
+            scored.append((score, kind, element))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [(kind, element) for _, kind, element in scored[:top_k]]
+
+
+def change_scope(
+        change_request: str,
+        model: Dict[str, List[str]],
+        hops: int = 1,
+        top_k: int = 8,
+) -> ChangeScope:
+    """Seed names mentioned by, or retrieved for, the request, expanded `hops` steps over the model graph.
+
+    `model` maps element kinds (classes, attributes, relations, messages, flow, ...)
+    to element lists, as stored in a version snapshot.
+    """
+    adjacency: Dict[str, Set[str]] = defaultdict(set)
+    names: Dict[str, Set[str]] = {}
+    for kind, elements in model.items():
+        for element in elements:
+            element_refs = _names(kind, element)
+            refs = [_norm(name) for name in element_refs]
+            for name, ref in zip(element_refs, refs):
+                names.setdefault(ref, _tokens(name))
+                adjacency[ref].update(r for r in refs if r != ref)
+
+    request = _norm(change_request)
+    request_tokens = _tokens(change_request)
+    seeds = {
+        name for name, tokens in names.items()
+        if (len(name) > 2 and name in request) or (tokens and tokens <= request_tokens)
+    }
+    # Words not explained by a mentioned name (e.g. an attribute or message text) go to retrieval.
+    residual = request_tokens.difference(*(names[seed] for seed in seeds))
+    for kind, element in _retrieve(residual, model, top_k):
+        seeds.update(_refs(kind, element))
+
+    neighbours, frontier = set(), set(seeds)
+    for _ in range(hops):
+        frontier = {n for name in frontier for n in adjacency.get(name, ())} - seeds - neighbours
+        neighbours |= frontier
+    return ChangeScope(seeds, neighbours)
+
+
+def merge_scoped(untouched: List[str], updated: List[str]) -> List[str]:
+    """Elements left out of the prompt followed by the agent's version of the scoped ones."""
+    return list(dict.fromkeys(untouched + updated))
+
+
+def scoped_prompt(label: str, relevant: List[str], omitted: int, change_request: str) -> str:
+    """User message for a change agent that only sees the relevant part of the model."""
+    listed = "\n".join(f"- {element}" for element in relevant) or "- (none)"
+    note = (
+        f"{omitted} other {label} are not affected by the change and are not shown; "
+        f"return the listed {label} as they are after the change, plus any new ones, "
+        f"and leave out the deleted ones."
+        if omitted else
+        f"Return the complete list of {label} after the change."
+    )
+    return f"Current {label} related to the change:\n{listed}\n{note}\nChange requirements:{change_request}"
+
+
+def _step_refs(step: Step) -> Set[str]:
+    if isinstance(step, Block):
+        return {ref for branch in step.branches for s in branch.steps for ref in _step_refs(s)}
+    return {_norm(step.source), _norm(step.target)}
+
+
+def flow_window(
+        lines: List[str],
+        scope: ChangeScope,
+        margin: int = 1,
+) -> Tuple[List[str], List[str], List[str]]:
+    """Split the flow into (before, window, after) around the top-level steps the change touches.
+
+    The window spans the first to the last touched step plus `margin` steps on each
+    side, so the agent can reorder within it; the flow is returned whole as the
+    window when no step is touched.
+    """
+    steps = build_flow(lines, strict=False).steps
+    touched = [idx for idx, step in enumerate(steps) if _step_refs(step) & scope.seeds]
+    if not touched:
+        return [], serialize_flow(Flow(steps)), []
+    start, end = max(0, touched[0] - margin), min(len(steps), touched[-1] + 1 + margin)
+    return (
+        serialize_flow(Flow(steps[:start])),
+        serialize_flow(Flow(steps[start:end])),
+        serialize_flow(Flow(steps[end:])),
+    )
+
+
+def scope_for(change_request: str, kind: str, elements: List[str], model: Optional[Dict] = None) -> ChangeScope:
+    """Scope over the full model when the workflow passes it, else over the agent's own elements."""
+    return change_scope(change_request, {k: v for k, v in (model or {kind: elements}).items() if isinstance(v, list)})
@@ -0,0 +1,416 @@
+# File: utils/model_diff.py
+"""Structural diff between model versions (class, use case and sequence models)
+
+Usage: python -m utils.model_diff OLD_VERSION_DIR NEW_VERSION_DIR [--type class] [--format md|json]
+"""
+import argparse
+import json
+import re
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from utils.parsing import Message, parse_message, parse_relation, strip_list_marker
+from utils.sequence_flow import FlowChange, build_flow, diff_flows, read_flow_md
+
+SNAPSHOT_FILE = "model.json"
+# Element kinds per model type; name kinds are diffed first so that renames can be
+# applied to the members, relations and messages that refer to them.
+MODEL_KINDS = {
+    "class": ("classes", "attributes", "methods", "relations"),
+    "use_case": ("actors", "use_cases", "relationships"),
+    "sequence": ("objects", "messages", "flow"),
+}
+NAME_KINDS = ("classes", "actors", "use_cases", "objects")
+MEMBER_KINDS = ("attributes", "methods")
+RELATION_KINDS = ("relations", "relationships")
+RENAME_SIMILARITY = 0.5
+
+_SPACES = re.compile(r"\s+")
+_TOKENS = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])|[^\W\d_a-zA-Z]+")
+_TABLE_SEPARATOR = re.compile(r"^\|[\s|:-]+\|$")
+_LIST_LINE = re.compile(r"^(?:[-*]\s+|\d+[.)]\s+)")
+
+
+@dataclass
+class Snapshot:
+    model_type: str
+    elements: Dict[str, List[str]]
+
+
+@dataclass
+class KindDiff:
+    added: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    modified: List[Tuple[str, str]] = field(default_factory=list)
+    renamed: List[Tuple[str, str]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.deleted or self.modified or self.renamed)
+
+
+@dataclass
+class ModelDiff:
+    model_type: str
+    kinds: Dict[str, KindDiff]
+    flow: List[FlowChange] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return any(self.kinds.values()) or bool(self.flow)
+
+    def touched_names(self) -> Set[str]:
+        """Names of the model elements involved in any change."""
+        names = set()
+        for kind, diff in self.kinds.items():
+            for element in diff.added + diff.deleted + [e for pair in diff.modified + diff.renamed for e in pair]:
+                names.update(element_names(kind, element))
+        for change in self.flow:
+            for line in (change.old, change.new):
+                if line and (message := parse_message(line)):
+                    names.update((message.source, message.target))
+        return names
+
+    def to_dict(self) -> Dict:
+        return {
+            "model_type": self.model_type,
+            "kinds": {kind: asdict(diff) for kind, diff in self.kinds.items()},
+            "flow": [change._asdict() for change in self.flow],
+        }
+
+    def to_markdown(self) -> str:
+        lines = [f"# Model Diff ({self.model_type})\n"]
+        if not self:
+            lines.append("No structural changes.")
+        for kind, diff in self.kinds.items():
+            if not diff:
+                continue
+            lines.append(f"## {kind}")
+            lines += [f"- Added: {e}" for e in diff.added]
+            lines += [f"- Deleted: {e}" for e in diff.deleted]
+            lines += [f"- Modified: {old} => {new}" for old, new in diff.modified]
+            lines += [f"- Renamed: {old} => {new}" for old, new in diff.renamed]
+            lines.append("")
+        if self.flow:
+            lines.append("## flow")
+            lines += [f"- {c.op} [{c.path}]: {c.old or ''} => {c.new or ''}" for c in self.flow]
+        return "\n".join(lines).rstrip() + "\n"
+
+
+def _norm(text: str) -> str:
+    return _SPACES.sub(" ", text.strip()).casefold()
+
+
+def _flatten(value: Union[List[str], Dict[str, List[str]]]) -> List[str]:
+    """Members stored per class ({cls: [items]}) become `cls.item` strings."""
+    if isinstance(value, dict):
+        return [f"{owner}.{item}" for owner, items in value.items() for item in items]
+    return list(value or [])
+
+
+def save_snapshot(version_dir: Union[str, Path], model_type: str, **elements) -> None:
+    """Write the structured model.json snapshot next to the markdown artifacts."""
+    snapshot = {
+        "model_type": model_type,
+        "elements": {kind: _flatten(elements.get(kind, [])) for kind in MODEL_KINDS[model_type]},
+    }
+    with open(Path(version_dir) / SNAPSHOT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2)
+
+
+def _guess_model_type(path: Path) -> str:
+    for model_type, marker in (("class", "classes.md"), ("use_case", "actors.md"), ("sequence", "objects.md")):
+        if (path / marker).exists():
+            return model_type
+    raise FileNotFoundError(f"{path} does not contain a class, use case or sequence model")
+
+
+def _read_lines(path: Path) -> List[str]:
+    return path.read_text(encoding='utf-8').splitlines() if path.exists() else []
+
+
+def _list_items(path: Path) -> List[str]:
+    """`- item`, `* item` and `1. item` lines of a markdown list (emphasis stripped)."""
+    items = []
+    for line in _read_lines(path):
+        if _LIST_LINE.match(line):
+            items.append(strip_list_marker(line).replace("**", "").replace("​", "").strip())
+    return items
+
+
+def _table_rows(path: Path) -> List[List[str]]:
+    rows = [line.strip() for line in _read_lines(path) if line.strip().startswith("|")]
+    return [
+        [cell.strip() for cell in row.strip("|").split("|")]
+        for row in rows[1:] if not _TABLE_SEPARATOR.match(row)
+    ]
+
+
+def _named_items(path: Path) -> List[str]:
+    return [line.split(":", 1)[1].strip() for line in _read_lines(path) if line.startswith("- Name:")]
+
+
+def _sectioned_members(path: Path) -> List[str]:
+    """`## Class` sections with `- member` items, or `* Class.member` lines."""
+    members, owner = [], None
+    for line in _read_lines(path):
+        if line.startswith("## "):
+            owner = line[3:].strip()
+        elif line.startswith("* "):
+            members.append(line[2:].strip())
+        elif line.startswith("- ") and owner:
+            members.append(f"{owner}.{line[2:].strip()}")
+    return members
+
+
+def _load_legacy(path: Path, model_type: str) -> Dict[str, List[str]]:
+    """Rebuild elements from the markdown artifacts of versions written before model.json."""
+    if model_type == "class":
+        classes = [c for c in _list_items(path / "classes.md") if ":" not in c] or [
+            line[3:].strip() for line in _read_lines(path / "classes.md") if line.startswith("## ")
+        ]
+        relations = [str(r) for r in map(parse_relation, _read_lines(path / "relations.md")) if r]
+        relations += [f"{row[0]} --{row[1]}--> {row[2]}" for row in _table_rows(path / "relationships.md")
+                      if len(row) >= 3 and row[2]]
+        return {
+            "classes": classes,
+            "attributes": _sectioned_members(path / "attributes.md"),
+            "methods": _sectioned_members(path / "methods.md"),
+            "relations": relations,
+        }
+    if model_type == "use_case":
+        return {
+            "actors": _named_items(path / "actors.md"),
+            "use_cases": _named_items(path / "use_cases.md"),
+            "relationships": [f"{row[0]} --{row[1]}--> {row[2]}" for row in _table_rows(path / "relationships.md")
+                              if len(row) >= 3],
+        }
+    lines = _read_lines(path / "objects.md")
+    names = [l.split(":", 1)[1].strip() for l in lines if l.startswith("- Object Name:")]
+    types = [l.split(":", 1)[1].strip() for l in lines if l.startswith("- Type:")]
+    objects = [f"{n}:{t}" for n, t in zip(names, types)] or _list_items(path / "objects.md")
+    messages = [m.replace("→", "->") for m in _list_items(path / "messages.md") if "->" in m or "→" in m]
+    messages += [f"{row[0]}->{row[1]}: {row[2]}" for row in _table_rows(path / "messages.md") if len(row) >= 3]
+    flow = read_flow_md((path / "flow.md").read_text(encoding='utf-8')) if (path / "flow.md").exists() \
+        else _list_items(path / "sequence.md")
+    return {"objects": objects, "messages": messages, "flow": flow}
+
+
+def load_snapshot(version_dir: Union[str, Path], model_type: Optional[str] = None) -> Snapshot:
+    path = Path(version_dir)
+    snapshot_path = path / SNAPSHOT_FILE
+    if snapshot_path.exists():
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return Snapshot(data["model_type"], data["elements"])
+    model_type = model_type or _guess_model_type(path)
+    return Snapshot(model_type, _load_legacy(path, model_type))
+
+
+def element_names(kind: str, element: str) -> List[str]:
+    """Model element names an element refers to (the element itself, owner class, endpoints)."""
+    if kind in RELATION_KINDS:
+        relation = parse_relation(element)
+        return [relation.source, relation.target] if relation else [element]
+    if kind == "messages":
+        message = parse_message(element)
+        return [message.source, message.target] if message else [element]
+    if kind in MEMBER_KINDS:
+        return [element.split(".", 1)[0].strip()]
+    if kind == "objects":
+        return [element.split(":", 1)[0].strip()]
+    return [element.strip()]
+
+
+def _canonical(kind: str, element: str) -> str:
+    if kind in RELATION_KINDS and (relation := parse_relation(element)):
+        return _norm(str(relation))
+    if kind == "messages" and (message := parse_message(element)):
+        return _norm(str(message))
+    return _norm(element)
+
+
+def _identity(kind: str, element: str) -> str:
+    """What stays the same when an element is modified rather than replaced."""
+    if kind in RELATION_KINDS and (relation := parse_relation(element)):
+        return _norm(f"{relation.source} -> {relation.target}")
+    if kind == "messages" and (message := parse_message(element)):
+        return _norm(f"{message.source} -> {message.target}")
+    if kind in MEMBER_KINDS:
+        return _norm(re.split(r"[:(]", element, 1)[0])
+    if kind == "objects":
+        return _norm(element.split(":", 1)[0])
+    return _norm(element)
+
+
+def _rename_in(kind: str, element: str, renames: Dict[str, str]) -> str:
+    """Rewrite references to renamed names so dependent elements still match."""
+    if not renames:
+        return element
+    if kind in RELATION_KINDS and (relation := parse_relation(element)):
+        return f"{renames.get(_norm(relation.source), relation.source)} --{relation.kind}--> " \
+               f"{renames.get(_norm(relation.target), relation.target)}"
+    if kind == "messages" and (message := parse_message(element)):
+        return str(Message(renames.get(_norm(message.source), message.source),
+                           renames.get(_norm(message.target), message.target),
+                           message.text, message.reply))
+    if kind in MEMBER_KINDS and "." in element:
+        owner, member = element.split(".", 1)
+        return f"{renames.get(_norm(owner), owner)}.{member}"
+    return element
+
+
+def _tokens(text: str) -> Set[str]:
+    return {t.casefold() for t in _TOKENS.findall(text)}
+
+
+def _features(snapshot: Snapshot) -> Dict[str, Set[str]]:
+    """Per name: member identities and relation neighbours, independent of the name itself."""
+    features = defaultdict(set)
+    for kind in MEMBER_KINDS:
+        for element in snapshot.elements.get(kind, []):
+            if "." in element:
+                features[_norm(element.split(".", 1)[0])].add(f"{kind}:{_identity(kind, element.split('.', 1)[1])}")
+    for kind in RELATION_KINDS:
+        for element in snapshot.elements.get(kind, []):
+            if relation := parse_relation(element):
+                features[_norm(relation.source)].add(f"to:{_norm(relation.target)}")
+                features[_norm(relation.target)].add(f"from:{_norm(relation.source)}")
+    return features
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _detect_renames(
+        deleted: List[str],
+        added: List[str],
+        old_features: Dict[str, Set[str]],
+        new_features: Dict[str, Set[str]],
+) -> List[Tuple[str, str]]:
+    """Pair deleted and added names whose name tokens or structure overlap enough.
+
+    Candidates come from an inverted index over both, so each deleted name is only
+    compared with added names sharing at least one token or feature. A deleted
+    name whose best score is shared by several added names (e.g. a class split
+    in two) is not a rename and stays a delete plus adds.
+    """
+    index = defaultdict(list)
+    profile = {}
+    for name in added:
+        profile[name] = (_tokens(name), new_features.get(_norm(name), set()))
+        for key in {f"t:{t}" for t in profile[name][0]} | {f"f:{f}" for f in profile[name][1]}:
+            index[key].append(name)
+
+    pairs, taken = [], set()
+    for name in deleted:
+        tokens, features = _tokens(name), old_features.get(_norm(name), set())
+        keys = {f"t:{t}" for t in tokens} | {f"f:{f}" for f in features}
+        candidates = sorted({candidate for key in keys for candidate in index.get(key, ())} - taken)
+        best, best_score = [], RENAME_SIMILARITY
+        for candidate in candidates:
+            cand_tokens, cand_features = profile[candidate]
+            score = max(_jaccard(tokens, cand_tokens), _jaccard(features, cand_features))
+            if score > best_score or (score == best_score and not best):
+                best, best_score = [candidate], score
+            elif score == best_score:
+                best.append(candidate)
+        if len(best) == 1:
+            pairs.append((name, best[0]))
+            taken.add(best[0])
+    return pairs
+
+
+def _diff_kind(kind: str, old: List[str], new: List[str]) -> KindDiff:
+    """Hash-based matching: exact canonical form first, then unique identity for modifications."""
+    diff = KindDiff()
+    new_by_key = {}
+    for element in new:
+        new_by_key.setdefault(_canonical(kind, element), element)
+    old_keys = set()
+    deleted = []
+    for element in old:
+        key = _canonical(kind, element)
+        old_keys.add(key)
+        if key not in new_by_key:
+            deleted.append(element)
+    added = [element for key, element in new_by_key.items() if key not in old_keys]
+
+    old_ids = Counter(_identity(kind, e) for e in deleted)
+    new_ids = defaultdict(list)
+    for element in added:
+        new_ids[_identity(kind, element)].append(element)
+    modified_new = set()
+    for element in deleted:
+        identity = _identity(kind, element)
+        if old_ids[identity] == 1 and len(new_ids.get(identity, [])) == 1:
+            replacement = new_ids[identity][0]
+            diff.modified.append((element, replacement))
+            modified_new.add(replacement)
+        else:
+            diff.deleted.append(element)
+    diff.added = [element for element in added if element not in modified_new]
+    return diff
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> ModelDiff:
+    if old.model_type != new.model_type:
+        raise ValueError(f"cannot diff a {old.model_type} model against a {new.model_type} model")
+    kinds = {}
+    renames: Dict[str, str] = {}
+    old_features, new_features = _features(old), _features(new)
+    for kind in MODEL_KINDS[new.model_type]:
+        if kind == "flow":
+            continue
+        old_elements = [_rename_in(kind, e, renames) for e in old.elements.get(kind, [])]
+        diff = _diff_kind(kind, old_elements, new.elements.get(kind, []))
+        if kind in NAME_KINDS and diff.deleted and diff.added:
+            old_names = {_norm(element_names(kind, e)[0]): e for e in diff.deleted}
+            new_names = {_norm(element_names(kind, e)[0]): e for e in diff.added}
+            pairs = _detect_renames(
+                [element_names(kind, e)[0] for e in diff.deleted],
+                [element_names(kind, e)[0] for e in diff.added],
+                old_features, new_features,
+            )
+            for old_name, new_name in pairs:
+                diff.renamed.append((old_names[_norm(old_name)], new_names[_norm(new_name)]))
+                renames[_norm(old_name)] = new_name
+            renamed_old = {old for old, _ in diff.renamed}
+            renamed_new = {new for _, new in diff.renamed}
+            diff.deleted = [e for e in diff.deleted if e not in renamed_old]
+            diff.added = [e for e in diff.added if e not in renamed_new]
+        kinds[kind] = diff
+
+    flow = []
+    if "flow" in MODEL_KINDS[new.model_type]:
+        old_flow = [_rename_in("messages", line, renames) for line in old.elements.get("flow", [])]
+        flow = diff_flows(build_flow(old_flow, strict=False), build_flow(new.elements.get("flow", []), strict=False))
+    return ModelDiff(new.model_type, kinds, flow)
+
+
+def diff_versions(
+        old_dir: Union[str, Path],
+        new_dir: Union[str, Path],
+        model_type: Optional[str] = None,
+) -> ModelDiff:
+    return diff_snapshots(load_snapshot(old_dir, model_type), load_snapshot(new_dir, model_type))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Structural diff between two model versions")
+    parser.add_argument("old", help="baseline version directory")
+    parser.add_argument("new", help="changed version directory")
+    parser.add_argument("--type", choices=sorted(MODEL_KINDS), help="model type (detected if omitted)")
+    parser.add_argument("--format", choices=("md", "json"), default="md")
+    args = parser.parse_args(argv)
+
+    diff = diff_versions(args.old, args.new, args.type)
+    if args.format == "json":
+        print(json.dumps(diff.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(diff.to_markdown())
+
+
+if __name__ == "__main__":
+    main()
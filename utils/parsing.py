@@ -0,0 +1,184 @@
+# File: utils/parsing.py
+"""Precompiled patterns and a tokenizer for RESULT blocks, relation and message expressions"""
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+
+RESULT_BLOCK = re.compile(r"```RESULT\n(.*?)\n```", re.DOTALL)
+LIST_MARKER = re.compile(r"^\s*(?:[-*•]\s+|\d+[.)、]\s*)")
+# `Class.method(params)` and `name:Type #note` items of the dynamic agents
+METHOD_SIGNATURE = re.compile(r"^\w+\.\w+(?:\(([\w: ,]*)\))?$")
+OBJECT_DECLARATION = re.compile(r"^\w+:(\w+)(\s*#\w+)?$")
+
+OPENING_FRAGMENTS = ("alt", "loop", "opt", "par", "break", "critical")
+# Combined fragment keywords; a keyword directly followed by an arrow is a participant name.
+FRAGMENT_LINE = re.compile(
+    r"^\s*(alt|loop|opt|par|break|critical|else|end)(?![\w-])(?!\s*-+>)\s*(.*)$"
+)
+_KEYWORD_RELATION = re.compile(
+    r"^(?P<source>.+?)\s+(?P<kind>extends?(?:\s+from)?|inherits?(?:\s+from)?|association|aggregation"
+    r"|composition|dependency|depends\s+on|implements?|realization)\s+(?P<target>.+)$",
+    re.IGNORECASE,
+)
+_TOKEN = re.compile(
+    r"""
+      (?P<LABELED_ARROW>--\s*(?P<arrow_label>[^<>\n]*?[^\s<>-])\s*-->)   # A --include--> B
+    | (?P<ANGLE><:?\s*(?P<angle_label>[\w ]+?)\s*:?>)                   # A <:inheritance> B, A <extend> B
+    | (?P<COLON_ANGLE>:\s*(?P<colon_label>\w+)\s*>)                     # A :association> B
+    | (?P<ARROW>-->|->|→)                                               # A -> B, A --> B
+    | (?P<TYPE>\btype\s*[:：]\s*(?P<type_label>\w+))                    # ... type:include
+    | (?P<COLON>[:：])
+    | (?P<SPACE>\s+)
+    | (?P<TEXT>[^\s:：<>→-]+|[<>-])
+    """,
+    re.VERBOSE,
+)
+_LABEL_GROUPS = {
+    "LABELED_ARROW": "arrow_label",
+    "ANGLE": "angle_label",
+    "COLON_ANGLE": "colon_label",
+    "TYPE": "type_label",
+}
+_RELATION_TOKENS = ("LABELED_ARROW", "ANGLE", "COLON_ANGLE", "ARROW")
+# Single-match fast paths for the canonical forms; anything else goes through the tokenizer.
+_FAST_RELATION = re.compile(r"^([^-<>:：\s][^-<>:：]*?)\s*--([\w ]+?)-->\s*([^-<>:：]*[^-<>:：\s])$")
+_FAST_MESSAGE = re.compile(r"^([^-<>:：\s][^-<>:：]*?)\s*(-->|->)\s*([^-<>:：]*?[^-<>:：\s])\s*:\s*(.*)$")
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+    label: str = ""
+
+
+@dataclass(frozen=True)
+class Relation:
+    source: str
+    kind: str
+    target: str
+
+    def __str__(self) -> str:
+        return f"{self.source} --{self.kind}--> {self.target}"
+
+
+@dataclass(frozen=True)
+class Message:
+    source: str
+    target: str
+    text: str
+    reply: bool = False
+
+    def __str__(self) -> str:
+        arrow = "-->" if self.reply else "->"
+        return f"{self.source}{arrow}{self.target}: {self.text}"
+
+
+@dataclass(frozen=True)
+class Fragment:
+    keyword: str
+    condition: str = ""
+
+    def __str__(self) -> str:
+        return f"{self.keyword} {self.condition}".strip()
+
+
+def result_block(content: str) -> Optional[str]:
+    """Body of the first ```RESULT block, or None."""
+    match = RESULT_BLOCK.search(content)
+    return match.group(1) if match else None
+
+
+def result_blocks(content: str) -> List[str]:
+    return RESULT_BLOCK.findall(content)
+
+
+def result_lines(content: str) -> List[str]:
+    """Non-empty, stripped lines of the first ```RESULT block."""
+    block = result_block(content)
+    if block is None:
+        return []
+    return [line.strip() for line in block.split("\n") if line.strip()]
+
+
+def strip_list_marker(line: str) -> str:
+    line = line.strip()
+    if line[:1].isdigit() or line[:1] in "-*•":
+        line = LIST_MARKER.sub("", line, count=1).strip()
+    return line
+
+
+def tokenize(line: str) -> List[Token]:
+    """Split a relation/message expression into tokens, dropping whitespace."""
+    tokens = []
+    for match in _TOKEN.finditer(line):
+        kind = match.lastgroup
+        if kind == "SPACE":
+            continue
+        label = match.group(_LABEL_GROUPS[kind]).strip() if kind in _LABEL_GROUPS else ""
+        tokens.append(Token(kind, match.group(kind), match.start(), match.end(), label))
+    return tokens
+
+
+def parse_relation(line: str) -> Optional[Relation]:
+    """Parse `A --kind--> B`, `A <:kind> B`, `A :kind> B`, `A -> B  type:kind` or `A extends B`."""
+    line = strip_list_marker(line)
+    if match := _FAST_RELATION.match(line):
+        return Relation(match.group(1), match.group(2).strip().lower(), match.group(3))
+    tokens = tokenize(line)
+    for idx, token in enumerate(tokens):
+        if token.kind not in _RELATION_TOKENS:
+            continue
+        kind, end = token.label, len(line)
+        type_token = next((t for t in tokens[idx + 1:] if t.kind == "TYPE"), None)
+        if type_token:
+            kind, end = type_token.label, type_token.start
+        source, target = line[:token.start].strip(), line[token.end:end].strip()
+        if not source or not target:
+            return None
+        return Relation(source, kind.lower() or "association", target)
+
+    if match := _KEYWORD_RELATION.match(line):
+        kind = match.group("kind").lower().split()[0].rstrip("s")
+        return Relation(match.group("source").strip(), kind, match.group("target").strip())
+    return None
+
+
+def parse_message(line: str) -> Optional[Message]:
+    """Parse `A->B: text` (or `A-->B: text` for replies); None if there is no arrow."""
+    line = strip_list_marker(line)
+    if match := _FAST_MESSAGE.match(line):
+        return Message(match.group(1), match.group(3), match.group(4).strip(), reply=match.group(2) == "-->")
+    tokens = tokenize(line)
+    arrow = next((t for t in tokens if t.kind == "ARROW"), None)
+    if arrow is None:
+        return None
+    colon = next((t for t in tokens if t.kind == "COLON" and t.start >= arrow.end), None)
+    source = line[:arrow.start].strip()
+    target = line[arrow.end:colon.start if colon else len(line)].strip()
+    if not source or not target:
+        return None
+    text = line[colon.end:].strip() if colon else ""
+    return Message(source, target, text, reply=arrow.text == "-->")
+
+
+def parse_fragment(line: str) -> Optional[Fragment]:
+    """Parse an `alt/loop/opt/... condition`, `else` or `end` line."""
+    if match := FRAGMENT_LINE.match(line):
+        return Fragment(match.group(1), match.group(2).split("|", 1)[0].strip())
+    return None
+
+
+def parse_sequence(lines: Iterable[str]) -> Iterator[Union[Fragment, Message]]:
+    """Flat stream of fragments and messages; `alt cond | A->B: msg` yields both."""
+    for line in lines:
+        if not line.strip():
+            continue
+        if fragment := parse_fragment(line):
+            yield fragment
+            _, sep, inline = line.partition("|")
+            if sep and (message := parse_message(inline)):
+                yield message
+        elif message := parse_message(line):
+            yield message
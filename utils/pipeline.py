@@ -0,0 +1,518 @@
+# File: utils/pipeline.py
+"""Declarative modeling pipelines and the executors that run them
+
+A pipeline spec (configs/pipelines.json) names the agent configs, the class and
+knowledge ids of each agent, the pipeline inputs and its steps. A step calls an
+agent method or a module-level function ("module:function") with values produced
+by the inputs or by earlier steps; every step whose values are available runs in
+the same round, on the executor picked for the deployment:
+
+    sequential  one step after another in the calling thread
+    thread      ready steps share a thread pool
+    process     as thread, and steps marked "process" run in a process pool
+    asyncio     ready steps are gathered on an event loop (asyncio.to_thread)
+
+The result of an agent step is published under the step's topic (default: its
+name) to the agents listed for that topic in the pipeline's "subscriptions"
+(falling back to "defaults"); the identifiers take their inputs as arguments, so
+by default nobody subscribes and nothing is serialized. Such agents are marked
+"stateless" and lose their memory; a stateless agent cannot subscribe to a topic.
+
+Agents cannot leave the process that created them, so agent steps always run in
+the calling process; "process" only applies to function steps with picklable
+arguments and results.
+
+The workflow entry points (workflow/, dynamic_workflow/) run these specs; the
+batch change runner uses the change pipelines on an in-memory model by passing
+the "original" value and asking only for the merged model.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from utils.checkpoint import WorkflowCheckpoint
+from utils.runtime import RuntimeConfig, get_runtime
+from utils.structured_output import OUTPUT_SCHEMAS, validate_output
+
+SPEC_FILE = "pipelines.json"
+_MISSING = object()
+
+
+@dataclass
+class AgentSpec:
+    """`stateless` agents build their prompts from arguments only; their memory is detached."""
+    agent_class: str = ""
+    knowledge: List[str] = field(default_factory=list)
+    stateless: bool = False
+
+
+@dataclass
+class StepSpec:
+    """One call. `inputs` is a list (positional) or a dict (keyword) of references.
+
+    A reference is a value name, a dotted path into a dict value ("original.classes"),
+    `{"ref": path, "default": value}` for a path that may be missing, or
+    `{"value": literal}`. With `when`, the step only runs if that value is truthy and
+    otherwise produces `default`. `schema` names the agent's output schema
+    (utils/structured_output.py); a checkpointed output that fails it is not reused.
+    """
+    name: str
+    inputs: Union[List[Any], Dict[str, Any]] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    agent: Optional[int] = None
+    method: str = ""
+    function: str = ""
+    topic: str = ""
+    when: str = ""
+    default: Any = None
+    process: bool = False
+    checkpoint: bool = True
+    schema: str = ""
+
+    def __post_init__(self) -> None:
+        if (self.agent is None) == (not self.function):
+            raise ValueError(f"step '{self.name}' needs either 'agent' and 'method' or 'function'")
+        if self.agent is not None and not self.method:
+            raise ValueError(f"step '{self.name}' names agent {self.agent} but no 'method'")
+        if self.process and not self.function:
+            raise ValueError(f"step '{self.name}': only function steps can run in a process")
+        if self.schema and self.schema not in OUTPUT_SCHEMAS:
+            raise ValueError(f"step '{self.name}': unknown schema '{self.schema}'")
+        self.outputs = self.outputs or [self.name]
+        self.topic = self.topic or self.name
+
+    def references(self) -> List[str]:
+        refs = self.inputs.values() if isinstance(self.inputs, dict) else self.inputs
+        names = [_ref_path(ref) for ref in refs]
+        return [path.split(".")[0] for path in names if path] + ([self.when] if self.when else [])
+
+
+@dataclass
+class PipelineSpec:
+    name: str
+    agent_configs: str
+    knowledge_config: str
+    steps: List[StepSpec]
+    agents: List[AgentSpec] = field(default_factory=list)
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    outputs: List[str] = field(default_factory=list)
+    model_configs: str = ""
+    subscriptions: Dict[str, List[int]] = field(default_factory=dict)
+    executor: Dict[str, Any] = field(default_factory=dict)
+
+    def check(self) -> None:
+        """Every reference must name an input or an earlier output, and output names must be unique."""
+        available = set(self.inputs)
+        for step in self.steps:
+            unknown = [ref for ref in step.references() if ref not in available]
+            if unknown:
+                raise ValueError(f"pipeline '{self.name}', step '{step.name}': unknown values {unknown}")
+            if step.agent is not None and self.agents and step.agent >= len(self.agents):
+                raise ValueError(f"pipeline '{self.name}', step '{step.name}': no agent {step.agent}")
+            duplicates = available.intersection(step.outputs)
+            if duplicates:
+                raise ValueError(f"pipeline '{self.name}', step '{step.name}': {sorted(duplicates)} already defined")
+            available.update(step.outputs)
+        missing = [name for name in self.outputs if name not in available]
+        if missing:
+            raise ValueError(f"pipeline '{self.name}': outputs {missing} are never produced")
+        for topic, indexes in self.subscriptions.items():
+            for index in indexes:
+                if self.agents and index >= len(self.agents):
+                    raise ValueError(f"pipeline '{self.name}': topic '{topic}' names no agent {index}")
+                if self.agents and self.agents[index].stateless:
+                    raise ValueError(
+                        f"pipeline '{self.name}': agent {index} subscribes to '{topic}' but is stateless"
+                    )
+
+    def steps_for(self, targets: Iterable[str], supplied: Iterable[str] = ()) -> List[StepSpec]:
+        """The steps needed to produce `targets`, in spec order; `supplied` values are not recomputed."""
+        supplied = set(supplied)
+        producers = {output: index for index, step in enumerate(self.steps) for output in step.outputs}
+        needed: Set[int] = set()
+        wanted = [name for name in targets if name not in supplied]
+        while wanted:
+            name = wanted.pop()
+            if name not in producers:
+                raise ValueError(f"pipeline '{self.name}': '{name}' is neither an input nor a step output")
+            if producers[name] not in needed:
+                needed.add(producers[name])
+                wanted.extend(ref for ref in self.steps[producers[name]].references() if ref not in supplied)
+        return [step for index, step in enumerate(self.steps) if index in needed]
+
+
+def _ref_path(ref: Any) -> str:
+    if isinstance(ref, str):
+        return ref
+    if isinstance(ref, dict) and "ref" in ref:
+        return ref["ref"]
+    return ""
+
+
+def load_pipeline_specs(path: Optional[str] = None) -> Dict[str, PipelineSpec]:
+    """Specs by name, parsed once per file and runtime configuration.
+
+    Config paths in the file are relative to the file's directory; `${model_dir}` and
+    the other runtime placeholders in input defaults are filled in from the runtime.
+    """
+    runtime = get_runtime()
+    return _load_specs(runtime.config_path(path or SPEC_FILE), runtime)
+
+
+@lru_cache(maxsize=None)
+def _load_specs(path: str, runtime: RuntimeConfig) -> Dict[str, PipelineSpec]:
+    base = Path(path).resolve().parent
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    defaults = raw.get("defaults", {})
+
+    def resolve(value: str) -> str:
+        return str(base / value) if value else value
+
+    def expand(value: Any) -> Any:
+        return Template(value).safe_substitute(runtime.placeholders()) if isinstance(value, str) else value
+
+    specs = {}
+    for name, entry in raw["pipelines"].items():
+        spec = PipelineSpec(
+            name=name,
+            agent_configs=resolve(entry["agent_configs"]),
+            knowledge_config=resolve(entry["knowledge_config"]),
+            model_configs=resolve(entry.get("model_configs", defaults.get("model_configs", ""))),
+            agents=[
+                AgentSpec(a.get("class", ""), list(a.get("knowledge", [])), bool(a.get("stateless", False)))
+                for a in entry.get("agents", [])
+            ],
+            inputs={key: expand(value) for key, value in entry.get("inputs", {}).items()},
+            steps=[StepSpec(**step) for step in entry["steps"]],
+            outputs=list(entry.get("outputs", [])),
+            subscriptions=dict(entry.get("subscriptions", defaults.get("subscriptions", {}))),
+            executor={**defaults.get("executor", {}), **entry.get("executor", {})},
+        )
+        spec.check()
+        specs[name] = spec
+    return specs
+
+
+def load_pipeline_spec(name: str, path: Optional[str] = None) -> PipelineSpec:
+    specs = load_pipeline_specs(path)
+    if name not in specs:
+        raise ValueError(f"unknown pipeline '{name}', expected one of {sorted(specs)}")
+    return specs[name]
+
+
+def resolve_function(target: str) -> Callable:
+    module, _, name = target.partition(":")
+    if not name:
+        raise ValueError(f"function '{target}' must be given as 'module:function'")
+    return getattr(importlib.import_module(module), name)
+
+
+class SequentialExecutor:
+    """Runs the ready steps one after another; the base for the other executors."""
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers
+
+    def __enter__(self) -> "SequentialExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(self, tasks: List[Callable[[], Any]]) -> List[Any]:
+        return [task() for task in tasks]
+
+    def call_in_process(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        return fn(*args, **kwargs)
+
+    def close(self) -> None:
+        return None
+
+
+class ThreadExecutor(SequentialExecutor):
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        super().__init__(max_workers)
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+
+    def run(self, tasks: List[Callable[[], Any]]) -> List[Any]:
+        if len(tasks) == 1:
+            return [tasks[0]()]
+        return list(self._threads.map(lambda task: task(), tasks))
+
+    def close(self) -> None:
+        self._threads.shutdown()
+
+
+class ProcessExecutor(ThreadExecutor):
+    """Agent steps on threads; function steps marked "process" in a process pool."""
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        super().__init__(max_workers)
+        # spawn: this process already runs the step threads, and forking it could copy a held lock
+        self._processes = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def call_in_process(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        return self._processes.submit(fn, *args, **kwargs).result()
+
+    def close(self) -> None:
+        super().close()
+        self._processes.shutdown()
+
+
+class AsyncioExecutor(SequentialExecutor):
+    """Ready steps are gathered on a new event loop, at most `max_workers` at a time.
+
+    The steps themselves are blocking calls and run through asyncio.to_thread, so
+    this executor cannot be used from a thread that already runs an event loop.
+    """
+
+    def run(self, tasks: List[Callable[[], Any]]) -> List[Any]:
+        return asyncio.run(self._gather(tasks))
+
+    async def _gather(self, tasks: List[Callable[[], Any]]) -> List[Any]:
+        limit = asyncio.Semaphore(self.max_workers or len(tasks) or 1)
+
+        async def run_one(task: Callable[[], Any]) -> Any:
+            async with limit:
+                return await asyncio.to_thread(task)
+
+        return list(await asyncio.gather(*(run_one(task) for task in tasks)))
+
+
+EXECUTORS: Dict[str, Callable[..., SequentialExecutor]] = {
+    "sequential": SequentialExecutor,
+    "thread": ThreadExecutor,
+    "process": ProcessExecutor,
+    "asyncio": AsyncioExecutor,
+}
+
+
+def make_executor(kind: str = "thread", max_workers: Optional[int] = None) -> SequentialExecutor:
+    if kind not in EXECUTORS:
+        raise ValueError(f"unknown executor '{kind}', expected one of {sorted(EXECUTORS)}")
+    return EXECUTORS[kind](max_workers)
+
+
+def init_pipeline_agents(spec: PipelineSpec, knowledge_config: Optional[str] = None) -> list:
+    """Create the spec's agents, check their classes, equip their knowledge and detach stateless memories."""
+    from agentscope.rag import KnowledgeBank
+    from utils.agent_factory import build_agents
+    from utils.workflow_hub import disable_memory
+
+    agents = build_agents(spec.agent_configs, spec.model_configs or None)
+    knowledge_bank = KnowledgeBank(configs=get_runtime().knowledge_configs(knowledge_config or spec.knowledge_config))
+    for index, (agent, agent_spec) in enumerate(zip(agents, spec.agents)):
+        if agent_spec.agent_class and type(agent).__name__ != agent_spec.agent_class:
+            raise ValueError(
+                f"pipeline '{spec.name}': agent {index} is {type(agent).__name__}, expected {agent_spec.agent_class}"
+            )
+        if agent_spec.knowledge:
+            knowledge_bank.equip(agent, agent_spec.knowledge)
+    disable_memory(agent for agent, agent_spec in zip(agents, spec.agents) if agent_spec.stateless)
+    return agents
+
+
+def _lookup(values: Dict[str, Any], path: str, default: Any = _MISSING) -> Any:
+    name, *keys = path.split(".")
+    value = values[name]
+    for key in keys:
+        if not isinstance(value, dict) or key not in value:
+            if default is _MISSING:
+                raise KeyError(f"'{path}' is not available")
+            return default
+        value = value[key]
+    return value
+
+
+def _resolve(values: Dict[str, Any], ref: Any) -> Any:
+    if isinstance(ref, str):
+        return _lookup(values, ref)
+    if isinstance(ref, dict) and "value" in ref:
+        return ref["value"]
+    if isinstance(ref, dict) and "ref" in ref:
+        return _lookup(values, ref["ref"], ref.get("default"))
+    raise ValueError(f"invalid step input {ref!r}")
+
+
+class PipelineRun:
+    """Runs one spec over one set of inputs with given agents, executor, checkpoint and hub."""
+
+    def __init__(
+            self,
+            spec: PipelineSpec,
+            agents: Optional[list] = None,
+            executor: Optional[SequentialExecutor] = None,
+            checkpoint: Optional[WorkflowCheckpoint] = None,
+            hub: Any = None
+    ) -> None:
+        self.spec = spec
+        self.agents = agents or []
+        self.executor = executor or SequentialExecutor()
+        self.checkpoint = checkpoint
+        self.hub = hub
+
+    def run(self, inputs: Dict[str, Any], targets: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """All values of the run: the inputs (spec defaults filled in) and the step outputs.
+
+        Only the steps needed for `targets` run (default: every step). An input named
+        like a step output replaces that step.
+        """
+        values = {**self.spec.inputs, **inputs}
+        missing = [name for name, value in values.items() if value is None and name not in inputs]
+        if missing:
+            raise ValueError(f"pipeline '{self.spec.name}' needs the inputs {missing}")
+
+        if targets is None:
+            targets = [output for step in self.spec.steps for output in step.outputs]
+        pending = self.spec.steps_for(targets, values)
+        while pending:
+            ready = [step for step in pending if all(ref in values for ref in step.references())]
+            if not ready:
+                raise ValueError(f"pipeline '{self.spec.name}': steps {[s.name for s in pending]} can never run")
+            results = self.executor.run([self._task(step, values) for step in ready])
+            for step, result in zip(ready, results):
+                values.update(zip(step.outputs, result if len(step.outputs) > 1 else [result]))
+                pending.remove(step)
+        return values
+
+    def _task(self, step: StepSpec, values: Dict[str, Any]) -> Callable[[], Any]:
+        if step.when and not values[step.when]:
+            return lambda: step.default
+        if isinstance(step.inputs, dict):
+            args, kwargs = [], {key: _resolve(values, ref) for key, ref in step.inputs.items()}
+        else:
+            args, kwargs = [_resolve(values, ref) for ref in step.inputs], {}
+
+        if step.function:
+            fn = resolve_function(step.function)
+            if step.process:
+                fn = _InProcess(self.executor, fn)
+        else:
+            fn = getattr(self.agents[step.agent], step.method)
+
+        def task() -> Any:
+            if self.checkpoint is not None and step.checkpoint:
+                validate = (lambda output: not validate_output(output, step.schema)) if step.schema else None
+                result = self.checkpoint.step(step.name, fn, *args, validate=validate, **kwargs)
+            else:
+                result = fn(*args, **kwargs)
+            if step.agent is not None and self.hub is not None:
+                self._publish(step, result)
+            return result
+
+        return task
+
+    def _publish(self, step: StepSpec, result: Any) -> None:
+        from agentscope.message import Msg
+
+        speaker = getattr(self.agents[step.agent], "name", step.name)
+        self.hub.publish(
+            step.topic, lambda: Msg(speaker, json.dumps(result, ensure_ascii=False, default=str), role="assistant")
+        )
+
+
+class _InProcess:
+    def __init__(self, executor: SequentialExecutor, fn: Callable) -> None:
+        self.executor = executor
+        self.fn = fn
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.executor.call_in_process(self.fn, *args, **kwargs)
+
+
+def as_background(value: Union[str, List[Dict]], model_type: str) -> str:
+    """Pipeline helper: structured requirements rendered as prompt background, text unchanged."""
+    if isinstance(value, str):
+        return value
+    import utils.util_function as uf
+
+    return uf.requirements_to_background(value, model_type)
+
+
+def run_pipeline(
+        name: str,
+        inputs: Dict[str, Any],
+        executor: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        agents: Optional[list] = None,
+        knowledge_config: Optional[str] = None,
+        resume: bool = True,
+        spec_path: Optional[str] = None,
+        outputs: Optional[Sequence[str]] = None,
+        checkpoint: Optional[WorkflowCheckpoint] = None
+) -> Dict[str, Any]:
+    """Run a configured pipeline and return its declared outputs (or `outputs`).
+
+    `executor` and `max_workers` default to the spec's "executor" settings. With
+    `outputs`, only the steps those values need are run. A run with its own
+    `checkpoint` leaves clearing it to the caller.
+    """
+    from agentscope.message import Msg
+    from utils.workflow_hub import TopicHub
+
+    spec = load_pipeline_spec(name, spec_path)
+    agents = agents or init_pipeline_agents(spec, knowledge_config)
+    kind = executor or spec.executor.get("kind", "thread")
+    workers = max_workers or spec.executor.get("max_workers")
+
+    owned = checkpoint is None
+    if owned:
+        checkpoint = WorkflowCheckpoint(f"pipeline-{name}", inputs, knowledge_config, enabled=resume)
+    with make_executor(kind, workers) as pool, TopicHub(agents, spec.subscriptions) as hub:
+        hub.publish("status", Msg("Host", f"Start the {name} pipeline ({kind} executor)", role="system"))
+        values = PipelineRun(spec, agents, pool, checkpoint, hub).run(inputs, outputs)
+    if owned:
+        checkpoint.clear()
+    return {output: values[output] for output in outputs or spec.outputs}
+
+
+def _read_requirements(path: str) -> Union[str, List[Dict]]:
+    import utils.util_function as uf
+
+    return uf.load_requirements(path) if path.endswith(".jsonl") else uf.read_docx(path)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a declarative modeling pipeline")
+    parser.add_argument("pipeline", nargs="?", help="pipeline name (omit with --list)")
+    parser.add_argument("source", nargs="?", help="requirements (.docx/.jsonl) or the change request text")
+    parser.add_argument("--spec", help=f"pipeline spec file (default: {SPEC_FILE} in the config directory)")
+    parser.add_argument("--executor", choices=sorted(EXECUTORS), help="overrides the spec's executor")
+    parser.add_argument("--workers", type=int, help="overrides the spec's max_workers")
+    parser.add_argument("--knowledge-config", dest="knowledge_config")
+    parser.add_argument("--no-resume", dest="resume", action="store_false")
+    parser.add_argument("--list", action="store_true", help="list the pipelines and their steps")
+    args = parser.parse_args(argv)
+
+    specs = load_pipeline_specs(args.spec)
+    if args.list or not args.pipeline:
+        for name, spec in specs.items():
+            print(f"{name:<18} {' -> '.join(step.name for step in spec.steps)}")
+        return
+    if args.pipeline not in specs:
+        parser.error(f"unknown pipeline '{args.pipeline}', expected one of {sorted(specs)}")
+    if not args.source:
+        parser.error("the pipeline needs a requirements file or a change request")
+
+    if "change_request" in specs[args.pipeline].inputs:
+        inputs = {"change_request": args.source}
+    else:
+        inputs = {"requirements": _read_requirements(args.source)}
+    outputs = run_pipeline(
+        args.pipeline, inputs, args.executor, args.workers,
+        knowledge_config=args.knowledge_config, resume=args.resume, spec_path=args.spec
+    )
+    print(json.dumps(outputs, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# File: utils/plantuml.py
+"""PlantUML rendering of model snapshots (class, use case and sequence diagrams)"""
+import re
+from typing import Callable, Dict, List
+
+from utils.model_diff import Snapshot
+from utils.parsing import parse_relation
+from utils.sequence_flow import build_flow, to_plantuml
+
+# Relation kind -> arrow, read as `source <arrow> target`
+CLASS_ARROWS = {
+    "inheritance": "--|>",
+    "extend": "--|>",
+    "generalization": "--|>",
+    "implement": "..|>",
+    "realization": "..|>",
+    "composition": "*--",
+    "aggregation": "o--",
+    "dependency": "..>",
+    "depend": "..>",
+    "association": "-->",
+}
+PARTICIPANT_TYPES = {
+    "Actor": "actor",
+    "System": "participant",
+    "Database": "database",
+    "Component": "component",
+}
+_NON_ALIAS = re.compile(r"\W+")
+
+
+def _alias(name: str) -> str:
+    return _NON_ALIAS.sub("_", name.strip()).strip("_") or "_"
+
+
+def _class_diagram(elements: Dict[str, List[str]]) -> List[str]:
+    members: Dict[str, List[str]] = {name: [] for name in elements.get("classes", [])}
+    for kind in ("attributes", "methods"):
+        for element in elements.get(kind, []):
+            owner, _, member = element.partition(".")
+            if member:
+                members.setdefault(owner.strip(), []).append(member.strip())
+
+    out = []
+    for name, items in members.items():
+        out.append(f'class "{name}" as {_alias(name)} {{')
+        out += [f"  {item}" for item in items]
+        out.append("}")
+    for element in elements.get("relations", []):
+        if relation := parse_relation(element):
+            arrow = CLASS_ARROWS.get(relation.kind, "--")
+            out.append(f"{_alias(relation.source)} {arrow} {_alias(relation.target)}")
+    return out
+
+
+def _use_case_diagram(elements: Dict[str, List[str]]) -> List[str]:
+    out = [f'actor "{name}" as {_alias(name)}' for name in elements.get("actors", [])]
+    out += [f'usecase "{name}" as {_alias(name)}' for name in elements.get("use_cases", [])]
+    for element in elements.get("relationships", []):
+        relation = parse_relation(element)
+        if relation is None:
+            continue
+        if relation.kind in ("include", "extend"):
+            out.append(f"{_alias(relation.source)} ..> {_alias(relation.target)} : <<{relation.kind}>>")
+        else:
+            out.append(f"{_alias(relation.source)} --> {_alias(relation.target)}")
+    return out
+
+
+def _sequence_diagram(elements: Dict[str, List[str]]) -> List[str]:
+    out = []
+    for obj in elements.get("objects", []):
+        name, _, obj_type = obj.split("#")[0].partition(":")
+        out.append(f'{PARTICIPANT_TYPES.get(obj_type.strip(), "participant")} "{name.strip()}" as {_alias(name)}')
+    out.append("")
+    out += to_plantuml(build_flow(elements.get("flow") or elements.get("messages", []), strict=False), _alias)
+    return out
+
+
+RENDERERS: Dict[str, Callable[[Dict[str, List[str]]], List[str]]] = {
+    "class": _class_diagram,
+    "use_case": _use_case_diagram,
+    "sequence": _sequence_diagram,
+}
+
+
+def render_snapshot(snapshot: Snapshot) -> str:
+    """Complete @startuml ... @enduml text for a snapshot."""
+    lines = ["@startuml"] + RENDERERS[snapshot.model_type](snapshot.elements) + ["@enduml"]
+    return "\n".join(lines) + "\n"
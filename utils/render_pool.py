@@ -0,0 +1,100 @@
+# File: utils/render_pool.py
+"""Producer/consumer hand-off of CPU-bound post-processing to a process pool
+
+Merging, snapshot and diff writing, markdown and DOCX rendering only need the
+finished model, so the producer (the thread talking to the agents) can queue
+them and go on with the next LLM call. A dispatcher thread takes the jobs in
+submission order and runs them in worker processes.
+
+Any argument that is a Future of an earlier job is replaced by its result before
+the job starts, which chains jobs that depend on each other (e.g. a version
+numbered after the previous one). The queue is bounded: a producer that outruns
+rendering blocks in `submit` instead of piling up models in memory.
+
+One-off renders (the .docx of an SRS job) go to `shared_process_pool`, a worker
+kept for the life of the process, so a long-running service does not spawn a
+new interpreter per job.
+"""
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+_STOP = object()
+_shared_pool: Optional[ProcessPoolExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def _resolve(value: Any) -> Any:
+    return value.result() if isinstance(value, Future) else value
+
+
+class RenderQueue:
+    def __init__(self, max_workers: int = 1, max_pending: int = 4, processes: bool = True) -> None:
+        """`processes=False` renders on threads, for functions or arguments that cannot be pickled."""
+        if processes:
+            # spawn: the producer is multi-threaded, and forking it could copy a held lock
+            self._pool = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="render")
+        self._jobs: queue.Queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))  # jobs queued or running
+        self._futures: List[Future] = []
+        self._dispatcher = threading.Thread(target=self._dispatch, name="render-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def __enter__(self) -> "RenderQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        self._slots.acquire()
+        future: Future = Future()
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+        self._jobs.put((future, fn, args, kwargs))
+        return future
+
+    def _dispatch(self) -> None:
+        while (job := self._jobs.get()) is not _STOP:
+            future, fn, args, kwargs = job
+            try:
+                args = [_resolve(arg) for arg in args]
+                kwargs = {key: _resolve(value) for key, value in kwargs.items()}
+                self._pool.submit(fn, *args, **kwargs).add_done_callback(
+                    lambda done, target=future: _copy_outcome(done, target)
+                )
+            except Exception as e:  # a failed dependency fails the jobs built on it
+                future.set_exception(e)
+
+    @property
+    def futures(self) -> List[Future]:
+        return list(self._futures)
+
+    def results(self) -> List[Any]:
+        """Results of every submitted job in submission order; raises the first failure."""
+        return [future.result() for future in self._futures]
+
+    def close(self, wait: bool = True) -> None:
+        self._jobs.put(_STOP)
+        self._dispatcher.join()
+        self._pool.shutdown(wait=wait)
+
+
+def _copy_outcome(source: Future, target: Future) -> None:
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def shared_process_pool() -> ProcessPoolExecutor:
+    """The process-wide render worker, started on first use."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+        return _shared_pool
@@ -0,0 +1,147 @@
+# File: utils/requirement_dedup.py
+"""Near-duplicate detection for decomposed requirements (MinHash/LSH + embeddings)"""
+import hashlib
+import math
+import random
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text: str, k: int = 3) -> set:
+    """Word k-shingles of a normalized text (falls back to character shingles for short/CJK text)."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) >= k:
+        return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+    compact = "".join(tokens)
+    if len(compact) <= k:
+        return {compact} if compact else set()
+    return {compact[i:i + k] for i in range(len(compact) - k + 1)}
+
+
+class MinHasher:
+    """Computes fixed-length MinHash signatures with universal hashing."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._a = [rng.randint(1, _MERSENNE_PRIME - 1) for _ in range(num_perm)]
+        self._b = [rng.randint(0, _MERSENNE_PRIME - 1) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: set) -> Tuple[int, ...]:
+        if not shingle_set:
+            return tuple([_MAX_HASH] * self.num_perm)
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+            for s in shingle_set
+        ]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+    @staticmethod
+    def jaccard(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class LSHIndex:
+    """Banded LSH index returning candidate pairs whose signatures collide in any band."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16) -> None:
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+
+    def insert(self, key: int, signature: Sequence[int]) -> List[int]:
+        """Insert a signature and return the keys already sharing a bucket with it."""
+        candidates = set()
+        for band in range(self.bands):
+            start = band * self.rows
+            bucket = self._buckets.setdefault((band, tuple(signature[start:start + self.rows])), [])
+            candidates.update(bucket)
+            bucket.append(key)
+        return sorted(candidates)
+
+
+def _normalize(vec: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vec))
+    return [x / norm for x in vec] if norm else [0.0] * len(vec)
+
+
+def deduplicate_requirements(
+        texts: List[str],
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        jaccard_threshold: float = 0.5,
+        cosine_threshold: float = 0.92,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+) -> Tuple[List[int], List[Dict]]:
+    """Cluster near-duplicate texts and return (indices to keep, merge report).
+
+    Without an embedding function, LSH collisions produce candidate pairs, which
+    are merged when their estimated Jaccard similarity reaches ``jaccard_threshold``.
+    With ``embed``, every text is embedded and every pair is compared exactly, merging
+    on either the Jaccard or the cosine threshold, so paraphrases that share few
+    shingles (and never collide in LSH) are still found. That mode is quadratic and
+    meant for a single decomposition (hundreds of requirements); larger inputs should
+    be deduplicated without ``embed``. The first text of every cluster (in input
+    order) is kept as its representative.
+    """
+    hasher = MinHasher(num_perm=num_perm)
+    signatures = [hasher.signature(shingles(text, shingle_size)) for text in texts]
+
+    parent = list(range(len(texts)))
+
+    def _find(idx: int) -> int:
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    evidence: List[Dict] = []
+
+    def _merge(idx_a: int, idx_b: int, method: str, score: float) -> None:
+        root_a, root_b = _find(idx_a), _find(idx_b)
+        if root_a == root_b:
+            return
+        parent[max(root_a, root_b)] = min(root_a, root_b)
+        evidence.append({"pair": (idx_a, idx_b), "method": method, "score": round(score, 3)})
+
+    if embed is None:
+        index = LSHIndex(num_perm=num_perm, bands=bands)
+        for idx, signature in enumerate(signatures):
+            for other in index.insert(idx, signature):
+                score = MinHasher.jaccard(signatures[other], signature)
+                if score >= jaccard_threshold:
+                    _merge(other, idx, "minhash", score)
+    else:
+        vectors = [_normalize(embed(text)) for text in texts]
+        for idx, vector in enumerate(vectors):
+            for other in range(idx):
+                score = MinHasher.jaccard(signatures[other], signatures[idx])
+                if score >= jaccard_threshold:
+                    _merge(other, idx, "minhash", score)
+                    continue
+                score = sum(x * y for x, y in zip(vectors[other], vector))
+                if score >= cosine_threshold:
+                    _merge(other, idx, "embedding", score)
+
+    clusters: Dict[int, List[int]] = {}
+    for idx in range(len(texts)):
+        clusters.setdefault(_find(idx), []).append(idx)
+    report = [
+        {
+            "kept": root,
+            "merged": members[1:],
+            "evidence": [e for e in evidence if _find(e["pair"][0]) == root],
+        }
+        for root, members in clusters.items() if len(members) > 1
+    ]
+    return sorted(clusters), report
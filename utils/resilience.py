@@ -0,0 +1,120 @@
+# File: utils/resilience.py
+"""Retry, timeout, circuit-breaker and hedging policies for model calls"""
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+NON_RETRYABLE_ERRORS = (TypeError, ValueError, KeyError, AttributeError, NotImplementedError)
+
+
+class ModelCallTimeout(TimeoutError):
+    """A model call did not complete within its per-call timeout."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The circuit breaker for a model config is open and rejects calls."""
+
+
+class ResiliencePolicy:
+    """Per model config settings; loaded from the "resilience" block of a model config."""
+
+    def __init__(
+            self,
+            timeout: Optional[float] = 300.0,
+            max_retries: int = 2,
+            backoff_base: float = 1.0,
+            backoff_max: float = 30.0,
+            failure_threshold: int = 5,
+            reset_timeout: float = 60.0,
+            hedge_after: Optional[float] = None,
+            max_hedges: int = 1,
+    ) -> None:
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge_after = hedge_after
+        self.max_hedges = max_hedges
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given (0-based) retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        return isinstance(error, Exception) and not isinstance(error, NON_RETRYABLE_ERRORS + (CircuitOpenError,))
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures; half-open after `reset_timeout`.
+
+    While half-open a single trial call is let through: success closes the
+    circuit, failure opens it again for another `reset_timeout`.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Circuit for model config '{self.name}' is open")
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    raise CircuitOpenError(f"Circuit for model config '{self.name}' is half-open, trial in progress")
+                self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+_policies: Dict[str, ResiliencePolicy] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def register_policy(config_name: str, settings: Dict) -> None:
+    with _lock:
+        _policies[config_name] = ResiliencePolicy(**settings)
+        _breakers.pop(config_name, None)
+
+
+def get_policy(config_name: str) -> ResiliencePolicy:
+    with _lock:
+        if config_name not in _policies:
+            _policies[config_name] = ResiliencePolicy()
+        return _policies[config_name]
+
+
+def get_breaker(config_name: str) -> CircuitBreaker:
+    policy = get_policy(config_name)
+    with _lock:
+        if config_name not in _breakers:
+            _breakers[config_name] = CircuitBreaker(config_name, policy.failure_threshold, policy.reset_timeout)
+        return _breakers[config_name]
@@ -0,0 +1,141 @@
+# File: utils/runtime.py
+"""Runtime configuration: where configs, inputs and model versions live, loaded once per process
+
+Every path defaults to the repository layout, so nothing depends on the working
+directory. Each one can be overridden by an environment variable, or on the
+command line through main.py (which calls `configure`):
+
+    UMLGEN_CONFIG_DIR        configs/            agent, knowledge, dedup and pipeline configs
+    UMLGEN_MODEL_CONFIGS     <config dir>/model_configs.json
+    UMLGEN_DATA_DIR          data/               sample requirement documents
+    UMLGEN_MODEL_DIR         workflow/           model versions (versions/, class_versions/, sequence_versions/)
+    UMLGEN_REQUIREMENTS_DIR  agents/output/      decomposition versions
+    UMLGEN_CHECKPOINT_DIR    .checkpoints/       step checkpoints of interrupted runs
+    UMLGEN_PROJECTS_DIR      projects/           multi-project batch output
+
+Config names are looked up in the config directory; only absolute paths and
+explicitly relative ones ("./x.json", "../x.json") are taken as they are.
+
+Model and knowledge configs are parsed once per file and handed out as copies.
+Relative data paths inside a knowledge config are resolved against the config
+file's directory, which is what they were written for.
+"""
+import copy
+import json
+import os
+import threading
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+MODEL_BASES = {"use_case": "versions", "class": "class_versions", "sequence": "sequence_versions"}
+ENV_VARS = {
+    "config_dir": "UMLGEN_CONFIG_DIR",
+    "model_configs_file": "UMLGEN_MODEL_CONFIGS",
+    "data_dir": "UMLGEN_DATA_DIR",
+    "model_dir": "UMLGEN_MODEL_DIR",
+    "requirements_dir": "UMLGEN_REQUIREMENTS_DIR",
+    "checkpoint_dir": "UMLGEN_CHECKPOINT_DIR",
+    "projects_dir": "UMLGEN_PROJECTS_DIR",
+}
+_EXPLICITLY_RELATIVE = ("./", "../", ".\\", "..\\")
+_KNOWLEDGE_PATH_KEYS = ("input_dir", "persist_dir", "input_files")
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    config_dir: Path = ROOT / "configs"
+    model_configs_file: Optional[Path] = None  # <config_dir>/model_configs.json
+    data_dir: Path = ROOT / "data"
+    model_dir: Path = ROOT / "workflow"
+    requirements_dir: Path = ROOT / "agents" / "output"
+    checkpoint_dir: Path = ROOT / ".checkpoints"
+    projects_dir: Path = ROOT / "projects"
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "RuntimeConfig":
+        """Defaults, then environment variables, then the non-None `overrides`."""
+        values = {name: Path(os.environ[var]) for name, var in ENV_VARS.items() if os.environ.get(var)}
+        values.update({name: Path(value) for name, value in overrides.items() if value is not None})
+        return cls(**{name: path.resolve() for name, path in values.items()})
+
+    def config_path(self, name: str) -> str:
+        """A config file by name from the config directory; absolute and "./"-style relative paths are kept."""
+        path = Path(name)
+        return str(path if path.is_absolute() or name.startswith(_EXPLICITLY_RELATIVE) else self.config_dir / path)
+
+    def data_path(self, name: str) -> str:
+        return str(self.data_dir / name)
+
+    def model_base(self, model_type: str) -> str:
+        return str(self.model_dir / MODEL_BASES[model_type])
+
+    def model_configs(self, path: Optional[str] = None) -> List[Dict]:
+        """The model configs of `path`, by default the configured model_configs.json."""
+        path = path or str(self.model_configs_file or "model_configs.json")
+        return copy.deepcopy(_model_configs(self.config_path(path)))
+
+    def knowledge_configs(self, name: str) -> List[Dict]:
+        return copy.deepcopy(_knowledge_configs(self.config_path(name)))
+
+    def placeholders(self) -> Dict[str, str]:
+        """Values for `${name}` placeholders in config files."""
+        return {"root": str(ROOT), **{f.name: str(getattr(self, f.name)) for f in fields(self) if getattr(self, f.name)}}
+
+
+@lru_cache(maxsize=None)
+def _model_configs(path: str) -> List[Dict]:
+    from utils.model_call import load_model_configs
+
+    return load_model_configs(path)
+
+
+def _resolve_paths(node: Any, base: Path) -> Any:
+    if isinstance(node, list):
+        return [_resolve_paths(item, base) for item in node]
+    if not isinstance(node, dict):
+        return node
+    resolved = {}
+    for key, value in node.items():
+        if key in _KNOWLEDGE_PATH_KEYS and isinstance(value, str):
+            value = str((base / value).resolve())
+        elif key in _KNOWLEDGE_PATH_KEYS and isinstance(value, list):
+            value = [str((base / item).resolve()) for item in value]
+        resolved[key] = _resolve_paths(value, base)
+    return resolved
+
+
+@lru_cache(maxsize=None)
+def _knowledge_configs(path: str) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return _resolve_paths(json.load(f), Path(path).resolve().parent)
+
+
+_runtime: Optional[RuntimeConfig] = None
+_lock = threading.Lock()
+
+
+def get_runtime() -> RuntimeConfig:
+    global _runtime
+    with _lock:
+        if _runtime is None:
+            _runtime = RuntimeConfig.from_env()
+        return _runtime
+
+
+def configure(**overrides: Any) -> RuntimeConfig:
+    """Replace the process-wide configuration; None values keep the current setting.
+
+    The overrides are also exported as environment variables, so worker processes
+    started afterwards resolve the same paths.
+    """
+    global _runtime
+    values = {name: Path(value).resolve() for name, value in overrides.items() if value is not None}
+    updated = replace(get_runtime(), **values)
+    for name, path in values.items():
+        os.environ[ENV_VARS[name]] = str(path)
+    with _lock:
+        _runtime = updated
+    return updated
@@ -0,0 +1,197 @@
+# File: utils/sequence_flow.py
+"""Sequence flow AST: combined fragments built in one pass, validated, serialized and diffed"""
+import difflib
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, NamedTuple, Optional, Union
+
+from utils.parsing import OPENING_FRAGMENTS, Message, parse_fragment, parse_message
+
+BRANCHING_FRAGMENTS = ("alt", "par")  # blocks that accept `else`
+SEQUENCE_BLOCK = re.compile(r"```sequence\n(.*?)```", re.DOTALL)
+
+
+class FlowError(ValueError):
+    """The flow has unbalanced or misplaced control tags, or unparseable lines."""
+
+
+@dataclass
+class Branch:
+    condition: str = ""
+    steps: List["Step"] = field(default_factory=list)
+
+
+@dataclass
+class Block:
+    keyword: str
+    branches: List[Branch]
+    line: int = 0
+    digest: str = field(default="", compare=False, repr=False)
+
+
+Step = Union[Message, Block]
+
+
+@dataclass
+class Flow:
+    steps: List[Step]
+    errors: List[str] = field(default_factory=list)
+
+
+class FlowChange(NamedTuple):
+    op: str  # add | delete | modify
+    path: str
+    old: Optional[str]
+    new: Optional[str]
+
+
+def build_flow(lines: Iterable[str], strict: bool = True) -> Flow:
+    """Build the AST in one pass over the lines.
+
+    With strict=False problems are collected in `Flow.errors` instead of raising:
+    unparseable lines and stray `else`/`end` tags are skipped and blocks left
+    open at the end are closed.
+    """
+    root = Branch()
+    stack: List[Block] = []
+    errors = []
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line:
+            continue
+        current = stack[-1].branches[-1] if stack else root
+        fragment = parse_fragment(line)
+        if fragment is None:
+            if message := parse_message(line):
+                current.steps.append(message)
+            else:
+                errors.append(f"line {number}: not a message or control tag: {line}")
+        elif fragment.keyword in OPENING_FRAGMENTS:
+            block = Block(fragment.keyword, [Branch(fragment.condition)], number)
+            current.steps.append(block)
+            stack.append(block)
+            _, sep, inline = line.partition("|")
+            if sep and (message := parse_message(inline)):
+                block.branches[0].steps.append(message)
+        elif fragment.keyword == "else":
+            if stack and stack[-1].keyword in BRANCHING_FRAGMENTS:
+                stack[-1].branches.append(Branch(fragment.condition))
+            else:
+                errors.append(f"line {number}: 'else' outside an alt/par block")
+        elif stack:
+            stack.pop()
+        else:
+            errors.append(f"line {number}: extra end tag")
+
+    errors.extend(f"line {block.line}: '{block.keyword}' block is never closed" for block in reversed(stack))
+    if strict and errors:
+        raise FlowError("; ".join(errors))
+    return Flow(root.steps, errors)
+
+
+def read_flow_md(text: str) -> List[str]:
+    """Flow lines stored in the ```sequence block of flow.md."""
+    match = SEQUENCE_BLOCK.search(text)
+    return [line for line in match.group(1).splitlines() if line.strip()] if match else []
+
+
+def _emit(steps: List[Step], depth: int, indent: str, render: Callable[[Message], str], out: List[str]) -> None:
+    pad = indent * depth
+    for step in steps:
+        if isinstance(step, Message):
+            out.append(pad + render(step))
+            continue
+        for idx, branch in enumerate(step.branches):
+            head = step.keyword if idx == 0 else "else"
+            out.append(f"{pad}{head} {branch.condition}".rstrip())
+            _emit(branch.steps, depth + 1, indent, render, out)
+        out.append(pad + "end")
+
+
+def serialize_flow(flow: Flow, indent: str = "  ") -> List[str]:
+    """Canonical line form used in flow.md."""
+    out = []
+    _emit(flow.steps, 0, indent, str, out)
+    return out
+
+
+def to_plantuml(flow: Flow, alias: Callable[[str], str] = lambda name: name) -> List[str]:
+    """Body lines of sequence.puml; participant names go through `alias`."""
+    def render(message: Message) -> str:
+        arrow = "-->" if message.reply else "->"
+        text = f" : {message.text}" if message.text else ""
+        return f"{alias(message.source)} {arrow} {alias(message.target)}{text}"
+
+    out = []
+    _emit(flow.steps, 0, "  ", render, out)
+    return out
+
+
+def step_digest(step: Step) -> str:
+    """Content hash of a step; cached on blocks, so the AST must not be mutated after building."""
+    if isinstance(step, Message):
+        return str(step)
+    if not step.digest:
+        parts = [step.keyword] + [
+            branch.condition + "{" + ";".join(step_digest(s) for s in branch.steps) + "}"
+            for branch in step.branches
+        ]
+        step.digest = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return step.digest
+
+
+def _describe(step: Step) -> str:
+    if isinstance(step, Message):
+        return str(step)
+    return f"{step.keyword} {step.branches[0].condition}".rstrip()
+
+
+def _diff_steps(old: List[Step], new: List[Step], path: str, changes: List[FlowChange]) -> None:
+    old_keys = [step_digest(s) for s in old]
+    new_keys = [step_digest(s) for s in new]
+    if old_keys == new_keys:
+        return
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for k in range(paired):
+            _diff_pair(old[i1 + k], new[j1 + k], f"{path}{j1 + k}", changes)
+        for k in range(i1 + paired, i2):
+            changes.append(FlowChange("delete", f"{path}{k}", _describe(old[k]), None))
+        for k in range(j1 + paired, j2):
+            changes.append(FlowChange("add", f"{path}{k}", None, _describe(new[k])))
+
+
+def _diff_pair(old: Step, new: Step, path: str, changes: List[FlowChange]) -> None:
+    if isinstance(old, Block) and isinstance(new, Block) and old.keyword == new.keyword:
+        for idx in range(max(len(old.branches), len(new.branches))):
+            branch_path = f"{path}.{idx}/"
+            if idx >= len(old.branches):
+                changes.append(FlowChange("add", branch_path, None, f"else {new.branches[idx].condition}".rstrip()))
+                continue
+            if idx >= len(new.branches):
+                changes.append(FlowChange("delete", branch_path, f"else {old.branches[idx].condition}".rstrip(), None))
+                continue
+            old_branch, new_branch = old.branches[idx], new.branches[idx]
+            if old_branch.condition != new_branch.condition:
+                changes.append(FlowChange("modify", branch_path, old_branch.condition, new_branch.condition))
+            _diff_steps(old_branch.steps, new_branch.steps, branch_path, changes)
+    elif isinstance(old, Message) and isinstance(new, Message):
+        changes.append(FlowChange("modify", path, str(old), str(new)))
+    else:
+        changes.append(FlowChange("delete", path, _describe(old), None))
+        changes.append(FlowChange("add", path, None, _describe(new)))
+
+
+def diff_flows(old: Flow, new: Flow) -> List[FlowChange]:
+    """Structural diff; identical subtrees are skipped by comparing their digests.
+
+    Paths are step indexes in the new flow, with `.<branch>/` descending into a
+    block (deleted steps use their index in the old flow).
+    """
+    changes: List[FlowChange] = []
+    _diff_steps(old.steps, new.steps, "", changes)
+    return changes
@@ -0,0 +1,145 @@
+# File: utils/srs_cache.py
+"""Incremental SRS generation: the inputs each section reads, and a cache of generated sections
+
+Requirements and model elements are kept as item lists per kind. Every section is
+written from the kinds it depends on (subsystem chapters only from the elements and
+requirements around the subsystem), and the cache stores each section with the hash
+of that input, so a new model version only regenerates the sections it touches.
+"""
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from utils.checkpoint import input_hash
+from utils.model_context import change_scope
+from utils.model_diff import Snapshot, load_snapshot
+
+REQUIREMENT_KINDS = ("requirements", "non_functional")
+VERSIONS_KIND = "versions"
+SUBSYSTEMS_KIND = "subsystems"
+_SPACES = re.compile(r"\s+")
+_TOKENS = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])|[^\W\d_a-zA-Z]+")
+
+
+def _norm(text: str) -> str:
+    return _SPACES.sub("", text).casefold()
+
+
+def _tokens(text: str) -> Set[str]:
+    return {t.casefold() for t in _TOKENS.findall(text) if len(t) > 1}
+
+
+def _requirement_line(record: Dict) -> str:
+    line = f"[{record.get('id')}] {record.get('requirement')}"
+    if subs := record.get("sub_requirements"):
+        line += " (" + "; ".join(str(sub) for sub in subs) + ")"
+    if record.get("components"):
+        line += f" [components: {record['components']}]"
+    return line
+
+
+def srs_inputs(
+        requirements: Iterable[Dict] = (),
+        snapshots: Iterable[Snapshot] = (),
+        versions: Iterable[str] = (),
+) -> Dict[str, List[str]]:
+    """Item lists per kind: functional and non-functional requirements, model elements and version names."""
+    inputs: Dict[str, List[str]] = {kind: [] for kind in REQUIREMENT_KINDS}
+    for record in requirements:
+        kind = "non_functional" if record.get("category") == "non-functional" else "requirements"
+        inputs[kind].append(_requirement_line(record))
+    for snapshot in snapshots:
+        for kind, elements in snapshot.elements.items():
+            items = inputs.setdefault(kind, [])
+            items.extend(element for element in elements if element not in items)
+    inputs[VERSIONS_KIND] = list(versions)
+    return inputs
+
+
+def load_srs_inputs(
+        requirements_path: Optional[str] = None,
+        version_dirs: Iterable[Union[str, Path]] = (),
+) -> Dict[str, List[str]]:
+    """Inputs from a demands.jsonl file and the model version directories the SRS describes."""
+    requirements = []
+    if requirements_path:
+        with open(requirements_path, 'r', encoding='utf-8') as f:
+            requirements = [json.loads(line) for line in f if line.strip()]
+    version_dirs = list(version_dirs)
+    return srs_inputs(requirements, [load_snapshot(d) for d in version_dirs], [Path(d).name for d in version_dirs])
+
+
+def render_inputs(inputs: Dict[str, List[str]], kinds: Optional[Iterable[str]] = None) -> str:
+    """Prompt text for the given kinds (all kinds when omitted), in the order given."""
+    kinds = list(inputs) if kinds is None else kinds
+    blocks = [f"[{kind}]\n" + "\n".join(inputs[kind]) for kind in kinds if inputs.get(kind)]
+    return "\n\n".join(blocks)
+
+
+def subsystem_inputs(inputs: Dict[str, List[str]], subsystem: str) -> Dict[str, List[str]]:
+    """The model neighbourhood of a subsystem and the requirements that mention it.
+
+    When the subsystem name matches nothing, every item is kept.
+    """
+    excluded = REQUIREMENT_KINDS + (VERSIONS_KIND, SUBSYSTEMS_KIND)
+    model = {kind: items for kind, items in inputs.items() if kind not in excluded}
+    scope = change_scope(subsystem, model)
+    scoped = {kind: scope.split(kind, items)[0] for kind, items in model.items()}
+
+    names = [name for name in scope.seeds | scope.neighbours if len(name) > 2]
+    tokens = _tokens(subsystem)
+    for kind in REQUIREMENT_KINDS:
+        items = inputs.get(kind, [])
+        related = [item for item in items if tokens & _tokens(item) or any(name in _norm(item) for name in names)]
+        scoped[kind] = related or list(items)
+    return scoped
+
+
+class SectionCache:
+    """Generated sections keyed by section id, each stored with the hash of the input it was written from.
+
+    Without a path nothing is read or written and every section is generated.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path else None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if self.path and self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        self._lock = threading.Lock()
+        self.reused: List[str] = []
+        self.generated: List[str] = []
+
+    def get_or_generate(self, section_id: str, section_input: Any, generate) -> Any:
+        """The cached content if `section_input` is unchanged, else the output of `generate()`."""
+        key = input_hash(section_input)
+        with self._lock:
+            entry = self._entries.get(section_id)
+        if entry and entry["input"] == key:
+            with self._lock:
+                self.reused.append(section_id)
+            return entry["content"]
+
+        content = generate()
+        with self._lock:
+            self._entries[section_id] = {"input": key, "content": content}
+            self.generated.append(section_id)
+        return content
+
+    def save(self, keep: Optional[Iterable[str]] = None) -> None:
+        """Write the cache, dropping sections that are no longer part of the document."""
+        if self.path is None:
+            return
+        if keep is not None:
+            keep = set(keep)
+            self._entries = {k: v for k, v in self._entries.items() if k in keep}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        print(f"[srs cache] {len(self.reused)} sections reused, {len(self.generated)} regenerated: {self.path}")
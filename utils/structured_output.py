@@ -0,0 +1,180 @@
+# File: utils/structured_output.py
+"""JSON-schema output definitions, constrained generation, validated parsing and targeted repair"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from utils.model_call import call_model
+from utils.parsing import result_lines
+
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCED_BLOCK = re.compile(r"```(?:RESULT|json|JSON)?\s*\n(.*?)\n?```", re.DOTALL)
+
+
+def _string_list(key: str, pattern: Optional[str] = None) -> Dict:
+    item = {"type": "string", "minLength": 1}
+    if pattern:
+        item["pattern"] = pattern
+    return {
+        "type": "object",
+        "properties": {key: {"type": "array", "items": item}},
+        "required": [key],
+    }
+
+
+_STRING_LIST_MAP = {
+    "type": "object",
+    "additionalProperties": {"type": "array", "items": {"type": "string", "minLength": 1}},
+}
+
+# Output schema per agent; list outputs are wrapped in an object under `LIST_KEYS[name]`.
+OUTPUT_SCHEMAS = {
+    "classes": _string_list("classes", r"^\S.*$"),
+    "attributes": _STRING_LIST_MAP,
+    "functions": _STRING_LIST_MAP,
+    "class_relationships": _string_list("relationships", r"^.+--.+-->.+$"),
+    "actors": _string_list("actors"),
+    "use_cases": _string_list("use_cases"),
+    "uc_relationships": _string_list("relationships", r"^.+--.+-->.+$"),
+    "objects": _string_list("objects"),
+    "messages": _string_list("messages", r"^.+->.+:.+$"),
+    "message_order": _string_list("steps"),
+}
+
+LIST_KEYS = {
+    name: next(iter(schema["properties"]))
+    for name, schema in OUTPUT_SCHEMAS.items() if "properties" in schema
+}
+
+
+class StructuredOutputError(ValueError):
+    """Model output could not be parsed into the agent's schema, even after repair."""
+
+
+def generation_kwargs(model: Any, name: str) -> Dict:
+    """Constrained-decoding arguments for backends that support them (Ollama `format`)."""
+    if str(getattr(model, "model_type", "")).startswith("ollama"):
+        return {"format": OUTPUT_SCHEMAS[name]}
+    return {}
+
+
+def validate(instance: Any, schema: Dict, path: str = "$") -> List[str]:
+    """Validate against the JSON-schema subset used by OUTPUT_SCHEMAS; returns error messages."""
+    errors = []
+    expected = schema.get("type")
+    type_checks = {"object": dict, "array": list, "string": str}
+    if expected and not isinstance(instance, type_checks[expected]):
+        return [f"{path}: expected {expected}, got {type(instance).__name__}"]
+
+    if expected == "object":
+        for key in schema.get("required", []):
+            if key not in instance:
+                errors.append(f"{path}: missing required property '{key}'")
+        properties = schema.get("properties", {})
+        for key, value in instance.items():
+            if key in properties:
+                errors.extend(validate(value, properties[key], f"{path}.{key}"))
+            elif "additionalProperties" in schema:
+                errors.extend(validate(value, schema["additionalProperties"], f"{path}.{key}"))
+    elif expected == "array":
+        for idx, item in enumerate(instance):
+            errors.extend(validate(item, schema.get("items", {}), f"{path}[{idx}]"))
+    elif expected == "string":
+        if len(instance.strip()) < schema.get("minLength", 0):
+            errors.append(f"{path}: empty string")
+        elif "pattern" in schema and not re.match(schema["pattern"], instance.strip()):
+            errors.append(f"{path}: '{instance}' does not match {schema['pattern']}")
+    return errors
+
+
+def validate_output(output: Any, name: str) -> List[str]:
+    """Validate a parsed agent output (lists unwrapped, as returned by `parse_with_repair`)."""
+    if name in LIST_KEYS and isinstance(output, list):
+        output = {LIST_KEYS[name]: output}
+    return validate(output, OUTPUT_SCHEMAS[name])
+
+
+def extract_json(content: str) -> Any:
+    """Parse the JSON document in a response (bare, fenced, or embedded in prose)."""
+    content = _THINK_BLOCK.sub("", content).strip()
+    candidates = [content] + [m.group(1) for m in _FENCED_BLOCK.finditer(content)]
+    start, end = content.find("{"), content.rfind("}")
+    if 0 <= start < end:
+        candidates.append(content[start:end + 1])
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except (json.JSONDecodeError, TypeError):
+            continue
+    raise StructuredOutputError("no JSON document found in model output")
+
+
+def parse_structured(content: str, name: str) -> Tuple[Any, List[str]]:
+    """Parse and validate a response; returns (value, errors) with value None if unparseable."""
+    schema = OUTPUT_SCHEMAS[name]
+    try:
+        value = extract_json(content)
+    except StructuredOutputError as error:
+        lines = result_lines(_THINK_BLOCK.sub("", content)) if name in LIST_KEYS else []
+        if not lines:
+            return None, [str(error)]
+        value = {LIST_KEYS[name]: lines}
+    if name in LIST_KEYS and isinstance(value, list):
+        value = {LIST_KEYS[name]: value}
+    return value, validate(value, schema)
+
+
+def _repair(model: Any, fragment: Any, name: str, errors: List[str], schema: Dict) -> Any:
+    """One cheap model call that rewrites only the invalid fragment."""
+    prompt = (
+        "The following output fragment does not match its JSON schema.\n"
+        f"[schema]\n{json.dumps(schema, ensure_ascii=False)}\n"
+        f"[errors]\n" + "\n".join(errors[:20]) + "\n"
+        f"[fragment]\n{fragment if isinstance(fragment, str) else json.dumps(fragment, ensure_ascii=False)}\n"
+        "Return only the corrected JSON document."
+    )
+    kwargs = {"format": schema} if generation_kwargs(model, name) else {}
+    return extract_json(call_model(model, prompt, **kwargs).text)
+
+
+def parse_with_repair(model: Any, content: str, name: str) -> Any:
+    """Validated parsing with a targeted repair call for the invalid part only.
+
+    For list outputs, valid items are kept as-is and only the invalid items are
+    sent for repair; items that are still invalid afterwards are dropped. Other
+    outputs are repaired as a whole once, raising StructuredOutputError on failure.
+    """
+    schema = OUTPUT_SCHEMAS[name]
+    value, errors = parse_structured(content, name)
+    if not errors:
+        return value[LIST_KEYS[name]] if name in LIST_KEYS else value
+
+    logger.warning(f"[{name}] output failed validation ({len(errors)} errors), requesting repair")
+    if value is not None and name in LIST_KEYS and isinstance(value.get(LIST_KEYS[name]), list):
+        key = LIST_KEYS[name]
+        item_schema = schema["properties"][key]["items"]
+        valid = [item for item in value[key] if not validate(item, item_schema)]
+        invalid = [item for item in value[key] if validate(item, item_schema)]
+        if invalid:
+            try:
+                repaired = _repair(model, {key: invalid}, name, errors, schema)
+                valid.extend(
+                    item for item in repaired.get(key, []) if not validate(item, item_schema)
+                )
+            except (StructuredOutputError, AttributeError) as error:
+                logger.warning(f"[{name}] repair failed ({error}); dropping {len(invalid)} invalid items")
+        return valid
+
+    fragment = content if value is None else value
+    try:
+        repaired = _repair(model, fragment, name, errors, schema)
+    except StructuredOutputError as error:
+        raise StructuredOutputError(f"[{name}] unrepairable output: {error}") from error
+    if name in LIST_KEYS and isinstance(repaired, list):
+        repaired = {LIST_KEYS[name]: repaired}
+    remaining = validate(repaired, schema)
+    if remaining:
+        raise StructuredOutputError(f"[{name}] output still invalid after repair: {remaining[:5]}")
+    return repaired[LIST_KEYS[name]] if name in LIST_KEYS else repaired
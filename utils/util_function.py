@@ -1,9 +1,15 @@
 import glob
+import json
 import os
+import re
 
 from agentscope.message import Msg
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from docx import Document  # 导入 python-docx 库
+
+from utils.runtime import get_runtime
+
+
 def _extract_query(x: Union[Msg, List[Msg]]) -> str:
     """提取查询内容"""
     if isinstance(x, Msg):
@@ -32,9 +38,8 @@ def read_docx(file_path):
 
 
 def get_latest_version_dir() -> Union[str, None]:
-    """直接定位到指定目录"""
-    # 硬编码绝对路径
-    target_dir = r"G:\PycharmProjects\UMLGenerator\agents\output"
+    """定位到运行时配置中的需求分解目录"""
+    target_dir = str(get_runtime().requirements_dir)
 
     # 验证路径是否存在
     if not os.path.exists(target_dir):
@@ -63,4 +68,162 @@ def read_docx(file_path: str) -> str:
     else:
         # 普通文本文件读取
         with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
\ No newline at end of file
+            return f.read()
+
+SECTION_HEADING_PATTERN = re.compile(
+    r"^\s*(?:#{1,6}\s+\S|\d+(?:\.\d+)+\.?\s+\S|Chapter\s+\d+|第.{1,3}[章节部分])"
+)
+# 单级编号（"1."、"1、"、"1)"）也是常见的列表项写法，只有短且不含句读标点的行才算标题
+NUMBERED_HEADING_PATTERN = re.compile(r"^\s*\d+(?:\.|、|\)|）)\s*(?P<title>\S.*)$")
+SENTENCE_PUNCTUATION = re.compile(r"[。；;，,：:！!？?.]")
+MAX_NUMBERED_HEADING_CHARS = 40
+
+
+def is_section_heading(line: str) -> bool:
+    """判断一行是否为章节标题；"1. The system shall…" 这类编号列表项不算"""
+    if SECTION_HEADING_PATTERN.match(line):
+        return True
+    match = NUMBERED_HEADING_PATTERN.match(line)
+    if not match:
+        return False
+    title = match.group("title").strip()
+    return len(title) <= MAX_NUMBERED_HEADING_CHARS and not SENTENCE_PUNCTUATION.search(title)
+
+
+def split_into_sections(text: str) -> List[str]:
+    """按标题行把文档切分为章节，标题行归属于其后的章节"""
+    sections = []
+    current = []
+    for line in text.split('\n'):
+        if is_section_heading(line) and any(l.strip() for l in current):
+            sections.append('\n'.join(current).strip())
+            current = []
+        current.append(line)
+    if any(l.strip() for l in current):
+        sections.append('\n'.join(current).strip())
+    return sections
+
+
+def split_into_shards(text: str, max_chars: int = 4000) -> List[str]:
+    """把文档按章节打包成不超过 max_chars 的分片，超长章节按段落再切分"""
+    pieces = []
+    for section in split_into_sections(text):
+        if len(section) <= max_chars:
+            pieces.append(section)
+            continue
+        buffer = ""
+        for paragraph in section.split('\n'):
+            if buffer and len(buffer) + len(paragraph) + 1 > max_chars:
+                pieces.append(buffer)
+                buffer = ""
+            buffer = f"{buffer}\n{paragraph}" if buffer else paragraph
+        if buffer.strip():
+            pieces.append(buffer)
+
+    shards = []
+    buffer = ""
+    for piece in pieces:
+        if buffer and len(buffer) + len(piece) + 2 > max_chars:
+            shards.append(buffer)
+            buffer = ""
+        buffer = f"{buffer}\n\n{piece}" if buffer else piece
+    if buffer.strip():
+        shards.append(buffer)
+    return shards
+
+
+REQUIREMENT_FIELDS = {
+    "id": ["Request Number"],
+    "category": ["Request Type", "Request Category"],
+    "requirement": ["Original Requirement"],
+    "sub_requirements": ["Sub-Requirements/Constraints"],
+    "components": ["Related System Components"],
+    "priority": ["Priority"],
+}
+
+# 每种模型只需要的需求字段，其余字段（来源、备注等）不进入下游提示词
+MODEL_TYPE_FIELDS = {
+    "use_case": ["requirement", "sub_requirements"],
+    "class": ["requirement", "sub_requirements", "components"],
+    "sequence": ["requirement", "sub_requirements", "components"],
+}
+
+
+def find_field(demand: Dict, field: str) -> Optional[str]:
+    """按字段名查找键，忽略大小写和方括号等修饰"""
+    target = field.lower()
+    for key in demand:
+        if key.strip("[] *").lower() == target:
+            return key
+    return None
+
+
+def to_requirement_record(demand: Dict) -> Dict:
+    """把分解结果转换为结构化需求记录"""
+    record = {}
+    for name, aliases in REQUIREMENT_FIELDS.items():
+        value = None
+        for alias in aliases:
+            if key := find_field(demand, alias):
+                value = demand[key]
+                break
+        record[name] = value
+    category = str(record["category"] or "").lower()
+    if "non" in category or "非功能" in category:
+        record["category"] = "non-functional"
+    elif "functional" in category or "功能" in category:
+        record["category"] = "functional"
+    else:
+        record["category"] = "unknown"
+    if isinstance(record["sub_requirements"], str):
+        record["sub_requirements"] = [record["sub_requirements"]]
+    record["fields"] = demand
+    return record
+
+
+def load_requirements(file_path: str) -> List[Dict]:
+    """读取 demands.jsonl 结构化需求集"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def select_requirements(records: List[Dict], model_type: str) -> List[Dict]:
+    """只保留功能需求，并裁剪为该模型类型需要的字段"""
+    fields = MODEL_TYPE_FIELDS[model_type]
+    return [
+        {"id": r.get("id"), **{name: r.get(name) for name in fields}}
+        for r in records
+        if r.get("category") != "non-functional"
+    ]
+
+
+def requirements_to_background(records: List[Dict], model_type: str) -> str:
+    """把筛选后的结构化需求渲染为紧凑的提示词背景"""
+    lines = []
+    for record in select_requirements(records, model_type):
+        lines.append(f"[{record['id']}] {record['requirement']}")
+        for sub in record.get("sub_requirements") or []:
+            lines.append(f"  - {sub}")
+        if record.get("components"):
+            lines.append(f"  components: {record['components']}")
+    return "\n".join(lines)
+
+
+def load_workflow_input(default_path: str) -> Union[str, List[Dict]]:
+    """优先使用最新分解版本中的 demands.jsonl，其次 demands.doc，最后是默认文档"""
+    latest_version_dir = get_latest_version_dir()
+    if latest_version_dir:
+        jsonl_path = os.path.join(latest_version_dir, "demands.jsonl")
+        if os.path.exists(jsonl_path):
+            print(f"Use the structured requirements file: {jsonl_path}")
+            return load_requirements(jsonl_path)
+        file_path = os.path.join(latest_version_dir, "demands.doc")
+        print(f"Use the history requirements file: {file_path}")
+    else:
+        file_path = default_path
+        print(f"Use the default test file: {file_path}")
+
+    try:
+        return read_docx(file_path)
+    except FileNotFoundError:
+        raise Exception(f"The input file does not exist: {file_path}")
@@ -0,0 +1,31 @@
+# File: utils/versions.py
+"""Version directory lookup shared by the workflows and the CLI (no heavy imports)"""
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Union
+
+# `2025-03-10-2`, or with a model prefix as written by the generation workflows (`class-2025-03-10-2`)
+VERSION_DIR = re.compile(r"^(?:[a-z_]+-)?(\d{4}-\d{2}-\d{2})-(\d+)$")
+
+
+def list_versions(base_dir: Union[str, Path]) -> List[Path]:
+    """Version directories under `base_dir`, oldest first."""
+    base = Path(base_dir)
+    if not base.is_dir():
+        return []
+    versions = []
+    for d in base.iterdir():
+        match = VERSION_DIR.match(d.name)
+        if d.is_dir() and match:
+            try:
+                versions.append((datetime.strptime(match.group(1), "%Y-%m-%d"), int(match.group(2)), d))
+            except ValueError:
+                continue
+    versions.sort(key=lambda x: (x[0], x[1]))
+    return [d for _, _, d in versions]
+
+
+def latest_version(base_dir: Union[str, Path]) -> Optional[str]:
+    versions = list_versions(base_dir)
+    return str(versions[-1]) if versions else None
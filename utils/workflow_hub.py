@@ -0,0 +1,52 @@
+# File: utils/workflow_hub.py
+"""Topic-based message hub for the modeling workflows
+
+With agentscope's msghub every broadcast is observed by every agent, so each agent's
+memory collects the full JSON output of all the others, although the identifiers
+build their prompts from explicit arguments and never read it. Here a message is
+published under a topic and only the agents subscribed to that topic observe it.
+Subscriptions are declared per pipeline in configs/pipelines.json; a message for a
+topic nobody subscribes to is never built.
+"""
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Union
+
+
+class TopicHub:
+    """Delivers each published message to the subscribers of its topic."""
+
+    def __init__(self, agents: Sequence[Any] = (), subscriptions: Optional[Dict[str, Iterable[int]]] = None) -> None:
+        """`subscriptions` maps a topic to the indexes in `agents` of the agents that consume it."""
+        self._subscribers: Dict[str, list] = {}
+        self.published: Counter = Counter()
+        for topic, indexes in (subscriptions or {}).items():
+            self.subscribe(topic, *(agents[i] for i in indexes))
+
+    def __enter__(self) -> "TopicHub":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def subscribe(self, topic: str, *agents: Any) -> None:
+        subscribers = self._subscribers.setdefault(topic, [])
+        subscribers.extend(agent for agent in agents if agent not in subscribers)
+
+    def publish(self, topic: str, msg: Union[Any, Callable[[], Any]]) -> None:
+        """Deliver `msg` to the topic's subscribers; a callable is only called if there are any."""
+        self.published[topic] += 1
+        subscribers = self._subscribers.get(topic)
+        if not subscribers:
+            return
+        if callable(msg):
+            msg = msg()
+        for agent in subscribers:
+            agent.observe(msg)
+
+
+def disable_memory(agents: Iterable[Any]) -> None:
+    """Detach the memory of stateless agents so nothing can accumulate in it."""
+    for agent in agents:
+        if getattr(agent, "memory", None) is not None:
+            agent.memory.clear()
+        agent.memory = None
@@ -1,61 +1,33 @@
 # File: workflows/class_modeling.py
 """RAG-enhanced Class Modeling Workflow"""
-import json
 import os
 import glob
-import re
 from datetime import datetime
-from typing import Tuple, Dict, List
-import agentscope
-from agentscope.rag import KnowledgeBank
-from agentscope.msghub import msghub
-from agentscope.message import Msg
+from typing import Tuple, Dict, List, Optional, Union
 import utils.util_function as uf
+from utils.model_diff import save_snapshot
+from utils.pipeline import init_pipeline_agents, load_pipeline_spec, run_pipeline
+from utils.runtime import get_runtime
+from utils.parsing import parse_relation
 
 
 def run_class_modeling_workflow(
-        background: str,
-        knowledge_config: str = "../configs/class_knowledge.json"
+        background: Union[str, List[Dict]],
+        knowledge_config: str = "class_knowledge.json",
+        resume: bool = True,
+        agents: Optional[list] = None
 ) -> Tuple[List[str], Dict[str, List[str]], Dict[str, List[str]], List[str]]:
+    """Class modeling workflow: runs the "class" pipeline"""
+    agents = agents or _init_class_agents(knowledge_config)
+    outputs = run_pipeline("class", {"requirements": background}, agents=agents,
+                           knowledge_config=knowledge_config, resume=resume)
+    print(f"\nThe generated results are versioned and saved to a directory: {outputs['version_dir']}")
+    return outputs["classes"], outputs["attributes"], outputs["functions"], outputs["relationships"]
 
-    agents = agentscope.init(
-        model_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\model_configs.json",
-        agent_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\class_agent_configs.json"
-    )
-
-    knowledge_bank = KnowledgeBank(configs=knowledge_config)
-
-
-    knowledge_bank.equip(agents[0], ["class_rules"])  # ClassIdentifier
-    knowledge_bank.equip(agents[1], ["attribute_rules"])  # AttributeIdentifier
-    knowledge_bank.equip(agents[2], ["function_rules"])  # FunctionIdentifier
-    knowledge_bank.equip(agents[3], ["class_relationship_rules"])  # ClassRelationshipIdentifier
-
-    with msghub(agents) as hub:
-        hub.broadcast(Msg("Host", "Start the class diagram modeling process:", role="system"))
-        hub.broadcast(Msg("Host", f"background：{background}", role="user"))
-
-        classes = agents[0].identify_classes(background)
-        hub.broadcast(Msg("ClassAgent", json.dumps(classes, ensure_ascii=False), role="assistant"))
-
-        attributes = agents[1].identify_attributes(classes, background)
-        hub.broadcast(Msg("AttrAgent", json.dumps(attributes, ensure_ascii=False), role="assistant"))
-
-        functions = agents[2].identify_functions(attributes, background)
-        hub.broadcast(Msg("FuncAgent", json.dumps(functions, ensure_ascii=False), role="assistant"))
-
-        relationships = agents[3].identify_relationships(functions, background)
-        hub.broadcast(Msg("RelAgent", json.dumps(relationships, ensure_ascii=False), role="assistant"))
 
-    version_dir = _save_class_results(
-        background=background,
-        classes=classes,
-        attributes=attributes,
-        functions=functions,
-        relationships=relationships
-    )
-    print(f"\nThe generated results are versioned and saved to a directory: {version_dir}")
-    return classes, attributes, functions, relationships
+def _init_class_agents(knowledge_config: str) -> list:
+    """Create the four class modeling agents and equip their knowledge; reusable across runs"""
+    return init_pipeline_agents(load_pipeline_spec("class"), knowledge_config)
 
 
 def _save_class_results(
@@ -64,9 +36,10 @@ def _save_class_results(
         attributes: Dict[str, List[str]],
         functions: Dict[str, List[str]],
         relationships: List[str],
-        output_base: str = "class_versions"
+        output_base: Optional[str] = None
 ) -> str:
 
+    output_base = output_base or get_runtime().model_base("class")
     os.makedirs(output_base, exist_ok=True)
 
     # version num（class-date-num）
@@ -108,51 +81,21 @@ def _save_class_results(
         f.write("| Subject | relation type | object | description |\n")
         f.write("|------|---------|------|-----|\n")
         for rel in relationships:
-
-            if "extend" in rel:
-                parts = re.split(r"\s*extend from\s*", rel)
-                rel_type = "extend"
-            elif "Association " in rel:
-                parts = re.split(r"\s*Association \s*", rel)
-                rel_type = "Association "
-            elif "Dependency" in rel:
-                parts = re.split(r"\s*Dependency\s*", rel)
-                rel_type = "Dependency"
-            else:
-                parts = [rel, ""]
-                rel_type = "Dependency"
-
-            if len(parts) >= 2:
-                subject, obj = parts[0], parts[1]
-                f.write(f"| {subject} | {rel_type} | {obj} | systematic design |\n")
+            relation = parse_relation(rel)
+            if relation:
+                f.write(f"| {relation.source} | {relation.kind} | {relation.target} | systematic design |\n")
             else:
                 f.write(f"| {rel} | The | system is automatically generated by | |\n")
 
+    save_snapshot(version_dir, "class", classes=classes, attributes=attributes, methods=functions,
+                  relations=relationships)
     return version_dir
 
 
 if __name__ == "__main__":
     # file_path = "../data/case.docx"
 
-    output_base = "./agents/output"
-    latest_version_dir = uf.get_latest_version_dir()
-    # print(latest_version_dir)
-
-    if latest_version_dir:
-
-        file_path = os.path.join(latest_version_dir, "demands.doc")
-        print(f"Use the history requirements file: {file_path}")
-    else:
-
-        file_path = "../data/case.docx"
-        print(f"Use the default test file: {file_path}")
-
-    try:
-        test_demand = uf.read_docx(file_path)
-    except FileNotFoundError:
-        raise Exception(f"The input file does not exist: {file_path}")
-
-    test_input = uf.read_docx(file_path)
+    test_input = uf.load_workflow_input(get_runtime().data_path("case.docx"))
 
     classes, attrs, funcs, rels = run_class_modeling_workflow(test_input)
 
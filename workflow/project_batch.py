@@ -0,0 +1,246 @@
+# File: workflow/project_batch.py
+"""Multi-project batch runs: decomposition and every modeling pipeline for many requirement documents
+
+Each project writes under its own `<output>/<project>/` directory (requirements/,
+use_case_versions/, class_versions/, sequence_versions/). Decompositions and model
+runs are scheduled on one worker pool; a project's models start as soon as its
+decomposition is done. Agent groups are kept warm and lent to one task at a time,
+so later projects reuse them without two running tasks sharing an agent.
+
+Usage: python -m workflow.project_batch SOURCE [--output DIR] [--models class,sequence] [--workers N]
+
+SOURCE is a directory of .docx/.jsonl documents (one project per file, named after
+it) or a JSON/JSONL manifest of {"name", "input", "models"} entries or plain paths.
+A .jsonl input is taken as already decomposed requirements.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from utils.runtime import get_runtime
+
+MODEL_PIPELINES = ("use_case", "class", "sequence")
+INPUT_SUFFIXES = (".docx", ".jsonl")
+REPORT_FILE = "batch_report.json"
+
+
+class Project(NamedTuple):
+    name: str
+    input: str
+    models: Sequence[str] = MODEL_PIPELINES
+
+
+def discover_projects(source: str, models: Sequence[str] = MODEL_PIPELINES) -> List[Project]:
+    """Projects from a directory of requirement documents or from a manifest file."""
+    path = Path(source)
+    if path.is_dir():
+        projects = [Project(file.stem, str(file), tuple(models))
+                    for file in sorted(path.iterdir()) if file.suffix.lower() in INPUT_SUFFIXES]
+    else:
+        text = path.read_text(encoding="utf-8")
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()] \
+            if path.suffix == ".jsonl" else json.loads(text)
+        projects = []
+        for entry in entries:
+            entry = {"input": entry} if isinstance(entry, str) else entry
+            input_path = path.parent / entry["input"]
+            projects.append(Project(entry.get("name", input_path.stem), str(input_path),
+                                    tuple(entry.get("models", models))))
+
+    names = Counter(project.name for project in projects)
+    duplicates = sorted(name for name, count in names.items() if count > 1)
+    if duplicates:
+        raise ValueError(f"project names must be unique, repeated: {duplicates}")
+    unknown = sorted({model for project in projects for model in project.models} - set(MODEL_PIPELINES))
+    if unknown:
+        raise ValueError(f"unknown models {unknown}, expected some of {list(MODEL_PIPELINES)}")
+    return projects
+
+
+class WarmAgents:
+    """Idle agent groups by name; a task borrows one, and a new group is built only when all are busy."""
+
+    def __init__(self, factories: Dict[str, Callable[[], list]]) -> None:
+        self._factories = factories
+        self._idle: Dict[str, List[list]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.built: Counter = Counter()
+
+    @contextmanager
+    def borrow(self, name: str) -> Iterator[list]:
+        with self._lock:  # groups are built one at a time; agentscope itself is only initialized once
+            if self._idle[name]:
+                agents = self._idle[name].pop()
+            else:
+                agents = self._factories[name]()
+                self.built[name] += 1
+        try:
+            yield agents
+        finally:
+            with self._lock:
+                self._idle[name].append(agents)
+
+
+class Progress:
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def report(self, project: str, stage: str, seconds: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.done += 1
+            self.failed += error is not None
+            elapsed = time.perf_counter() - self.start
+            eta = elapsed / self.done * (self.total - self.done)
+            status = f"FAILED ({error})" if error else f"done in {seconds:.1f}s"
+            print(f"[projects] {self.done}/{self.total} {project}/{stage} {status}; "
+                  f"elapsed {elapsed:.0f}s, about {eta:.0f}s left")
+
+    def skip(self, count: int) -> None:
+        with self._lock:
+            self.total -= count
+
+
+def _load_records(version_dir: str) -> List[Dict]:
+    import utils.util_function as uf
+
+    return uf.load_requirements(os.path.join(version_dir, "demands.jsonl"))
+
+
+class ProjectBatch:
+    def __init__(
+            self,
+            output_root: Optional[str] = None,
+            workers: int = 2,
+            executor: Optional[str] = None,
+            resume: bool = True,
+            agents: Optional[WarmAgents] = None
+    ) -> None:
+        self.output_root = Path(output_root or get_runtime().projects_dir)
+        self.workers = workers
+        self.executor = executor
+        self.resume = resume
+        self.agents = agents or WarmAgents(_agent_factories())
+
+    def project_dir(self, project: Project) -> Path:
+        return self.output_root / project.name
+
+    def decompose(self, project: Project) -> List[Dict]:
+        import utils.util_function as uf
+        from agents.decomposer import run_decomposition
+
+        if project.input.endswith(".jsonl"):
+            return uf.load_requirements(project.input)
+        raw_demand = uf.read_docx(project.input)
+        with self.agents.borrow("decompose") as agents:
+            _, version_dir = run_decomposition(
+                raw_demand, output_base=str(self.project_dir(project) / "requirements"), agents=agents
+            )
+        return _load_records(version_dir)
+
+    def model(self, project: Project, model: str, records: List[Dict]) -> str:
+        from utils.pipeline import run_pipeline
+
+        inputs = {"requirements": records, "output_base": str(self.project_dir(project) / f"{model}_versions")}
+        with self.agents.borrow(model) as agents:
+            outputs = run_pipeline(model, inputs, self.executor, agents=agents, resume=self.resume)
+        return outputs["version_dir"]
+
+    def run(self, projects: Sequence[Project]) -> Dict[str, Dict[str, Any]]:
+        """Run every project; a failed stage is reported and only skips the stages that need it."""
+        report: Dict[str, Dict[str, Any]] = {
+            project.name: {"input": project.input, "output_dir": str(self.project_dir(project)), "stages": {}}
+            for project in projects
+        }
+        progress = Progress(sum(1 + len(project.models) for project in projects))
+        print(f"[projects] {len(projects)} projects, {progress.total} stages on {self.workers} workers")
+
+        def timed(project: Project, stage: str, fn: Callable, *args: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                result = fn(*args)
+            except Exception as e:
+                seconds = time.perf_counter() - start
+                report[project.name]["stages"][stage] = {"status": "failed", "seconds": round(seconds, 1),
+                                                         "error": f"{type(e).__name__}: {e}"}
+                progress.report(project.name, stage, seconds, f"{type(e).__name__}: {e}")
+                raise
+            seconds = time.perf_counter() - start
+            summary = result if isinstance(result, str) else f"{len(result)} requirements"
+            report[project.name]["stages"][stage] = {"status": "done", "seconds": round(seconds, 1),
+                                                     "result": summary}
+            progress.report(project.name, stage, seconds)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="project") as pool:
+            pending = {pool.submit(timed, project, "decompose", self.decompose, project): (project, None)
+                       for project in projects}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    project, model = pending.pop(future)
+                    if future.exception() is not None:
+                        if model is None:
+                            progress.skip(len(project.models))
+                        continue
+                    if model is None:
+                        for next_model in project.models:
+                            task = pool.submit(timed, project, next_model, self.model, project, next_model, future.result())
+                            pending[task] = (project, next_model)
+
+        elapsed = time.perf_counter() - progress.start
+        print(f"[projects] Finished in {elapsed:.0f}s: {progress.done - progress.failed} stages done, "
+              f"{progress.failed} failed; agent groups built: {dict(self.agents.built)}")
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        with open(self.output_root / REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+
+def _agent_factories() -> Dict[str, Callable[[], list]]:
+    def decomposer() -> list:
+        from agents.decomposer import _init_decomposer_agents
+
+        return _init_decomposer_agents()
+
+    def pipeline(name: str) -> Callable[[], list]:
+        def build() -> list:
+            from utils.pipeline import init_pipeline_agents, load_pipeline_spec
+
+            return init_pipeline_agents(load_pipeline_spec(name))
+
+        return build
+
+    return {"decompose": decomposer, **{name: pipeline(name) for name in MODEL_PIPELINES}}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Decompose and model many requirement documents")
+    parser.add_argument("source", help="directory of .docx/.jsonl documents or a JSON/JSONL manifest")
+    parser.add_argument("--output", help="root of the per-project output directories (default: runtime projects dir)")
+    parser.add_argument("--models", default=",".join(MODEL_PIPELINES), help="comma separated model pipelines")
+    parser.add_argument("--workers", type=int, default=2, help="stages run at the same time")
+    parser.add_argument("--executor", help="pipeline executor (defaults to the pipeline spec)")
+    parser.add_argument("--no-resume", dest="resume", action="store_false")
+    args = parser.parse_args(argv)
+
+    projects = discover_projects(args.source, [model.strip() for model in args.models.split(",") if model.strip()])
+    if not projects:
+        parser.error(f"no requirement documents found in {args.source}")
+    batch = ProjectBatch(args.output, args.workers, args.executor, args.resume)
+    batch.run(projects)
+    print(f"[projects] Report written to: {batch.output_root / REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,33 @@
 # File: workflows/sequence_modeling.py
 """RAG-enhanced Sequence Workflow"""
-import json
 import os
 import glob
-import re
 from datetime import datetime
-from typing import Tuple, List
-import agentscope
-from agentscope.rag import KnowledgeBank
-from agentscope.msghub import msghub
-from agentscope.message import Msg
+from typing import Tuple, Dict, List, Optional, Union
 import utils.util_function as uf
+from utils.model_diff import save_snapshot
+from utils.pipeline import init_pipeline_agents, load_pipeline_spec, run_pipeline
+from utils.runtime import get_runtime
+from utils.parsing import parse_message
+
 
 def run_sequence_workflow(
-        context: str,
-        knowledge_config: str = "../configs/sequence_knowledge.json"
+        context: Union[str, List[Dict]],
+        knowledge_config: str = "sequence_knowledge.json",
+        resume: bool = True,
+        agents: Optional[list] = None
 ) -> Tuple[List[str], List[str], List[str]]:
+    """Sequence modeling workflow: runs the "sequence" pipeline"""
+    agents = agents or _init_sequence_agents(knowledge_config)
+    outputs = run_pipeline("sequence", {"requirements": context}, agents=agents,
+                           knowledge_config=knowledge_config, resume=resume)
+    print(f"\nThe generated results are versioned and saved to a directory: {outputs['version_dir']}")
+    return outputs["objects"], outputs["messages"], outputs["sequence"]
 
-    agents = agentscope.init(
-        model_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\model_configs.json",
-        agent_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\sequence_agent_configs.json"
-    )
-
-    knowledge_bank = KnowledgeBank(configs=knowledge_config)
-
-    knowledge_bank.equip(agents[0], ["object_rules"])  # ObjectIdentifier
-    knowledge_bank.equip(agents[1], ["message_rules"])  # MessageIdentifier
-    knowledge_bank.equip(agents[2], ["sequence_rules"])  # MessageOrderIdentifier
-
-
-    with msghub(agents) as hub:
-        hub.broadcast(Msg("Host", "Start the timing modeling process:", role="system"))
-        hub.broadcast(Msg("Host", f"context:{context}", role="user"))
-
-        objects = agents[0].identify_objects(context)
-        hub.broadcast(Msg("ObjectAgent", json.dumps(objects, ensure_ascii=False), role="assistant"))
 
-        messages = agents[1].identify_messages(objects, context)
-        hub.broadcast(Msg("MessageAgent", json.dumps(messages, ensure_ascii=False), role="assistant"))
-
-        sequence = agents[2].identify_sequence(messages, context)
-        hub.broadcast(Msg("OrderAgent", json.dumps(sequence, ensure_ascii=False), role="assistant"))
-
-
-    version_dir = _save_sequence_results(
-        context=context,
-        objects=objects,
-        messages=messages,
-        sequence=sequence
-    )
-    print(f"\nThe generated results are versioned and saved to a directory: {version_dir}")
-    return objects, messages, sequence
+def _init_sequence_agents(knowledge_config: str) -> list:
+    """Create the three sequence modeling agents and equip their knowledge; reusable across runs"""
+    return init_pipeline_agents(load_pipeline_spec("sequence"), knowledge_config)
 
 
 def _save_sequence_results(
@@ -58,9 +35,10 @@ def _save_sequence_results(
         objects: List[str],
         messages: List[str],
         sequence: List[str],
-        output_base: str = "sequence_versions"
+        output_base: Optional[str] = None
 ) -> str:
 
+    output_base = output_base or get_runtime().model_base("sequence")
     os.makedirs(output_base, exist_ok=True)
     #version num（sequence-date-num）
     today = datetime.now().strftime("%Y-%m-%d")
@@ -83,11 +61,9 @@ def _save_sequence_results(
         f.write("| Sender | receiver | The message content is of the | type |\n")
         f.write("|--------|--------|----------|------|\n")
         for msg in messages:
-            parts = re.split(r"\s*->\s*|\s*:\s*", msg.strip())
-            if len(parts) >= 3:
-                sender, receiver = parts[0], parts[1]
-                content = " : ".join(parts[2:]) if len(parts) > 2 else ""
-                f.write(f"| {sender} | {receiver} | {content} | synchronous messages |\n")
+            message = parse_message(msg)
+            if message:
+                f.write(f"| {message.source} | {message.target} | {message.text} | synchronous messages |\n")
             else:
                 f.write(f"| Unknown | unknown | {msg} | indicates an asynchronous message |\n")
 
@@ -96,30 +72,14 @@ def _save_sequence_results(
         for idx, step in enumerate(sequence, 1):
             f.write(f"{idx}. {step}\n")
 
+    save_snapshot(version_dir, "sequence", objects=objects, messages=messages, flow=sequence)
     return version_dir
 
 
 if __name__ == "__main__":
     # file_path = "../data/sequence_case.docx"
 
-    output_base = "./agents/output"
-    latest_version_dir = uf.get_latest_version_dir()
-    # print(latest_version_dir)
-
-    if latest_version_dir:
-
-        file_path = os.path.join(latest_version_dir, "demands.doc")
-        print(f"Use the history requirements file: {file_path}")
-    else:
-        file_path = "../data/case.docx"
-        print(f"Use the default test file: {file_path}")
-
-    try:
-        test_demand = uf.read_docx(file_path)
-    except FileNotFoundError:
-        raise Exception(f"The input file does not exist: {file_path}")
-
-    test_input = uf.read_docx(file_path)
+    test_input = uf.load_workflow_input(get_runtime().data_path("case.docx"))
 
     objects, messages, sequence = run_sequence_workflow(test_input)
 
@@ -2,69 +2,50 @@
 import json
 import os
 import glob
-import re
 from datetime import datetime
-from typing import Tuple, List
+from typing import Tuple, Dict, List, Optional, Union
 
-import agentscope
-from agentscope.rag import KnowledgeBank
-from agentscope.msghub import msghub
-from agentscope.message import Msg
 from docx import Document  # Import python-docx library
 import utils.util_function as uf
+from utils.model_diff import save_snapshot
+from utils.pipeline import init_pipeline_agents, load_pipeline_spec, run_pipeline
+from utils.runtime import get_runtime
+from utils.parsing import parse_relation
+
 
 def run_use_case_workflow(
-        background: str,
-        knowledge_config: str = "../configs/uc_knowledge.json"
+        background: Union[str, List[Dict]],
+        knowledge_config: str = "uc_knowledge.json",
+        map_reduce: bool = False,
+        group_size: int = 1,
+        max_workers: int = 4,
+        resume: bool = True,
+        agents: Optional[list] = None
 ) -> Tuple[List[str], List[str], List[str]]:
-    """Knowledge-enhanced use case modeling workflow"""
-
-    # Initialize agent
-    agents = agentscope.init(
-        model_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\model_configs.json",
-        agent_configs="G:\\PycharmProjects\\UMLGenerator\\configs\\usecase_agent_configs.json"
-    )
-
-    # Initialize knowledge base
-    knowledge_bank = KnowledgeBank(configs=knowledge_config)
-
-    # Equip knowledge base
-    knowledge_bank.equip(agents[0], ["actor_rules"])
-    knowledge_bank.equip(agents[1], ["uc_rules"])
-    knowledge_bank.equip(agents[2], ["uc_rel_rules"])
+    """Knowledge-enhanced use case modeling workflow (the "use_case" pipeline)
 
-    # Execute collaboration process
-    with msghub(agents) as hub:
-        hub.broadcast(Msg("Host", "Initiate use case modeling process", role="system"))
-        hub.broadcast(Msg("Host", f"Input background: {background}", role="user"))
+    With a structured requirement set and `map_reduce=True`, the
+    "use_case_map_reduce" pipeline identifies actors and use cases per requirement
+    group concurrently and merges them afterwards.
+    """
+    # Initialize agents unless warm ones are passed in
+    agents = agents or _init_use_case_agents(knowledge_config)
 
-        # Actor identification
-        actors = agents[0].identify_actors(background)
-        hub.broadcast(Msg("ActorAgent", json.dumps(actors, ensure_ascii=False), role="assistant"))
+    if map_reduce and isinstance(background, list):
+        name = "use_case_map_reduce"
+        inputs = {"requirements": background, "group_size": group_size, "max_workers": max_workers}
+    else:
+        name, inputs = "use_case", {"requirements": background}
+    outputs = run_pipeline(name, inputs, agents=agents, knowledge_config=knowledge_config, resume=resume)
 
-        # Use case identification
-        use_cases = agents[1].identify_use_cases(background)
-        hub.broadcast(Msg("UseCaseAgent", json.dumps(use_cases, ensure_ascii=False), role="assistant"))
+    print(f"\nGenerated results have been versioned and saved in directory: {outputs['version_dir']}")
 
-        # Relationship identification
-        relationships = agents[2].identify_relationships(
-            use_cases,
-            actors,
-            background
-        )
-        hub.broadcast(Msg("RelAgent", json.dumps(relationships, ensure_ascii=False), role="assistant"))
+    return outputs["actors"], outputs["use_cases"], outputs["relationships"]
 
-    # Structured saving of results
-    version_dir = _save_structured_results(
-        background=background,
-        actors=actors,
-        use_cases=use_cases,
-        relationships=relationships
-    )
 
-    print(f"\nGenerated results have been versioned and saved in directory: {version_dir}")
-
-    return actors, use_cases, relationships
+def _init_use_case_agents(knowledge_config: str) -> list:
+    """Create the three use case agents and equip their knowledge; reusable across runs"""
+    return init_pipeline_agents(load_pipeline_spec("use_case"), knowledge_config)
 
 
 def _save_structured_results(
@@ -72,9 +53,15 @@ def _save_structured_results(
         actors: List[str],
         use_cases: List[str],
         relationships: List[str],
-        output_base: str = "versions"
+        output_base: Optional[str] = None,
+        actor_trace: Optional[Dict[str, List[str]]] = None,
+        use_case_trace: Optional[Dict[str, List[str]]] = None
 ) -> str:
-    """Structured saving of use case model results into versioned Markdown files"""
+    """Structured saving of use case model results into versioned Markdown files
+
+    The requirement ids behind each name (map-reduce runs) go to traceability.json.
+    """
+    output_base = output_base or get_runtime().model_base("use_case")
     # Create base directory
     os.makedirs(output_base, exist_ok=True)
 
@@ -114,26 +101,28 @@ def _save_structured_results(
         f.write("| Subject | Relation Type | Object | Related Requirements |\n")
         f.write("|---------|---------------|--------|----------------------|\n")
         for rel in relationships:
-            # Parse relationship expression (example format: User -> Browse Products)
-            parts = re.split(r"\s*->\s*|\s*-->\s*", rel)
-            if len(parts) == 2:
-                subject, obj = parts
-                f.write(f"| {subject} | Associated | {obj} | {background} |\n")
+            # Parse relationship expression (example format: User --association--> Browse Products)
+            relation = parse_relation(rel)
+            if relation:
+                f.write(f"| {relation.source} | {relation.kind} | {relation.target} | {background} |\n")
             else:
                 f.write(f"| {rel} | Associated | System | {background} |\n")
 
+    if actor_trace is not None or use_case_trace is not None:
+        with open(os.path.join(version_dir, "traceability.json"), 'w', encoding='utf-8') as f:
+            json.dump({"actors": actor_trace, "use_cases": use_case_trace}, f, ensure_ascii=False, indent=2)
+
+    save_snapshot(version_dir, "use_case", actors=actors, use_cases=use_cases, relationships=relationships)
     return version_dir
 
 
 if __name__ == "__main__":
-    file_path = "../data/case.docx"
-
-    test_input = uf.read_docx(file_path)
+    test_input = uf.load_workflow_input(get_runtime().data_path("case.docx"))
 
     print('...........test input............:')
     print(test_input)
 
-    actors, cases, rels = run_use_case_workflow(test_input)
+    actors, cases, rels = run_use_case_workflow(test_input, map_reduce=isinstance(test_input, list))
 
     print("\nFinal generated results:")
     print("Actors:", actors)